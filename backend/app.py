@@ -1,17 +1,31 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import os
+import asyncio
+import uuid
 import tempfile
-import shutil
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional
 import json
 from datetime import datetime
+from functools import partial
 
-from ppt_parser import PPTParser
-from excel_parser import ExcelParser
+from ppt_parser import PPTParser, PARSER_VERSION as PPT_PARSER_VERSION
+from excel_parser import ExcelParser, PARSER_VERSION as EXCEL_PARSER_VERSION
+from formula_graph import GRAPH_VERSION as FORMULA_GRAPH_VERSION
 from matcher import NumberMatcher
-from report_generator import ReportGenerator
+from report_generator import ReportGenerator, PARQUET_AVAILABLE, REPORT_VERSION
+from parse_cache import ParseCache
+from audit_jobs import AuditJobQueue
+from session_store import create_session_store
+from incremental_audit import build_audit_state
+from llm_adjudicator import create_llm_adjudicator
+from upload_spool import SpooledUpload, UploadTooLarge, spool_upload
+from telemetry import (
+    ProfilingMiddleware, profiled_call, requested_profiler, telemetry, traced_call, traced_result
+)
 
 app = FastAPI(title="Deck Auditor API", version="1.0.0")
 
@@ -22,59 +36,106 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Path"],
+)
+
+# Opt-in profiling of requests sent with ?profile=1 or an X-Profile: 1 header (PROFILE_REQUESTS=1);
+# PROFILER=pyinstrument writes HTML reports instead of pstats files when pyinstrument is installed
+if os.getenv("PROFILE_REQUESTS", "false").lower() in ("1", "true", "yes"):
+    app.add_middleware(
+        ProfilingMiddleware,
+        profile_dir=os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "deck_audit_profiles")),
+        profiler=os.getenv("PROFILER", "cprofile").lower()
+    )
+
+# Parsed data and audit results per session, in memory or in SQLite (SESSION_BACKEND)
+session_store = create_session_store()
+
+def require_session(session_id: str) -> None:
+    """Raise a 404 unless the session exists and has not expired"""
+    if not session_store.exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+# Worker processes for CPU-bound parsing, so the event loop stays responsive
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+parse_executor: Optional[ProcessPoolExecutor] = None
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    """Return the shared parsing process pool, creating it on first use"""
+    global parse_executor
+    if parse_executor is None:
+        parse_executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return parse_executor
+
+# Rolled-over uploads up to UPLOAD_MEMORY_BYTES are copied into memory, larger ones to a named temp file;
+# none may exceed MAX_UPLOAD_BYTES
+UPLOAD_MEMORY_BYTES = int(os.getenv("UPLOAD_MEMORY_BYTES", 32 * 1024 * 1024))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 1024 * 1024 * 1024))
+
+# Parsed output of previously uploaded files, keyed by content hash
+parse_cache = ParseCache(
+    os.getenv("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "deck_audit_parse_cache")),
+    int(os.getenv("PARSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
 )
 
-# Global storage for current session
-current_session = {
-    "ppt_data": None,
-    "excel_data": None,
-    "audit_results": None,
-    "session_id": None
+# Optional search for deck figures computed from neighbouring cells (growth rates, totals);
+# CONTEXT_BLOCKING=0 fuzzy-scores every Excel context instead of those sharing a token
+MATCHER_OPTIONS = {
+    "context_blocking": os.getenv("CONTEXT_BLOCKING", "true").lower() in ("1", "true", "yes"),
+    "derived_search": os.getenv("DERIVED_SEARCH", "false").lower() in ("1", "true", "yes"),
+    "derived_time_budget": float(os.getenv("DERIVED_TIME_BUDGET_SECONDS", 2.0))
 }
 
+# Optional LLM review of low-confidence results (LLM_ADJUDICATION=1), with responses in the parse cache
+llm_adjudicator = create_llm_adjudicator(parse_cache)
+
+# Background audits, so matching never runs on the event loop. With a shared session store their
+# progress and results are kept there too, so any API worker process can answer polls.
+audit_jobs = AuditJobQueue(
+    max_workers=int(os.getenv("AUDIT_WORKERS", 2)), matcher_options=MATCHER_OPTIONS, adjudicator=llm_adjudicator,
+    store=session_store
+)
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    """Stop the parsing worker processes and audit workers"""
+    if parse_executor is not None:
+        parse_executor.shutdown(cancel_futures=True)
+    audit_jobs.shutdown()
+
 @app.post("/upload-files")
 async def upload_files(
     ppt_file: UploadFile = File(...),
-    excel_files: List[UploadFile] = File(...)
+    excel_files: List[UploadFile] = File(...),
+    session_id: Optional[str] = Form(None)
 ):
-    """Upload PPT and Excel files for auditing"""
+    """Upload PPT and Excel files for auditing, or re-upload revised files into an existing session"""
     try:
-        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        current_session["session_id"] = session_id
-        
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp()
-        
-        # Save PPT file
-        ppt_path = os.path.join(temp_dir, ppt_file.filename)
-        with open(ppt_path, "wb") as buffer:
-            shutil.copyfileobj(ppt_file.file, buffer)
-        
-        # Save Excel files
-        excel_paths = []
-        for excel_file in excel_files:
-            excel_path = os.path.join(temp_dir, excel_file.filename)
-            with open(excel_path, "wb") as buffer:
-                shutil.copyfileobj(excel_file.file, buffer)
-            excel_paths.append(excel_path)
-        
-        # Parse files
-        ppt_parser = PPTParser()
-        excel_parser = ExcelParser()
-        
-        print(f"Parsing PPT: {ppt_path}")
-        ppt_data = ppt_parser.parse_presentation(ppt_path)
-        current_session["ppt_data"] = ppt_data
+        if session_id:
+            # Re-uploads keep the session's last audit so only changed slides are re-matched
+            require_session(session_id)
+        else:
+            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         
-        print(f"Parsing Excel files: {excel_paths}")
-        excel_data = {}
-        for excel_path in excel_paths:
-            filename = os.path.basename(excel_path)
-            excel_data[filename] = excel_parser.parse_workbook(excel_path)
-        current_session["excel_data"] = excel_data
+        # Each upload is hashed and size-checked in one pass. Starlette's in-memory spools are then
+        # parsed as they are; uploads it rolled over to an unnamed temp file are copied to a named one.
+        uploads = []
+        try:
+            for upload_file in [ppt_file, *excel_files]:
+                with telemetry.span("upload.spool", file=upload_file.filename) as span:
+                    uploads.append(await run_in_threadpool(
+                        spool_upload, upload_file.file, upload_file.filename, UPLOAD_MEMORY_BYTES, MAX_UPLOAD_BYTES
+                    ))
+                    span["bytes"] = uploads[-1].size
+            ppt_data, excel_data = await parse_uploaded_files(uploads[0], uploads[1:])
+        finally:
+            for upload in uploads:
+                upload.close()
         
-        # Clean up temp files
-        shutil.rmtree(temp_dir)
+        await run_in_threadpool(session_store.set, session_id, "ppt_data", ppt_data)
+        await run_in_threadpool(session_store.set, session_id, "excel_data", excel_data)
+        await run_in_threadpool(session_store.set, session_id, "audit_results", None)
+        await run_in_threadpool(session_store.set, session_id, "upload_id", uuid.uuid4().hex)
         
         return {
             "status": "success",
@@ -84,79 +145,346 @@ async def upload_files(
             "message": "Files uploaded and parsed successfully"
         }
         
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         print(f"Error in upload_files: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing files: {str(e)}")
 
+async def parse_uploaded_files(ppt_upload: SpooledUpload, excel_uploads: List[SpooledUpload]):
+    """Parse the deck and workbooks, reusing cached output for previously seen file contents"""
+    loop = asyncio.get_running_loop()
+    executor = get_parse_executor()
+    
+    # Hashes were computed while the uploads were read
+    ppt_key = parse_cache.make_key("ppt", ppt_upload.sha256, PPT_PARSER_VERSION)
+    excel_keys = [parse_cache.make_key("excel", upload.sha256, EXCEL_PARSER_VERSION) for upload in excel_uploads]
+    graph_keys = [parse_cache.make_key("formulas", upload.sha256, FORMULA_GRAPH_VERSION) for upload in excel_uploads]
+    
+    ppt_data = await loop.run_in_executor(None, parse_cache.get, ppt_key)
+    cached_excel = {}
+    for upload, key in zip(excel_uploads, excel_keys):
+        cached = await loop.run_in_executor(None, parse_cache.get, key)
+        if cached is not None:
+            # The same workbook may be re-uploaded under a different name
+            cached["filename"] = upload.filename
+            cached_excel[upload.filename] = cached
+    missing = [upload for upload in excel_uploads if upload.filename not in cached_excel]
+    
+    # Worker processes get small uploads as bytes and larger ones by temp file path
+    sources = {upload.filename: upload.source() for upload in [ppt_upload, *excel_uploads]}
+    
+    # Parse cache misses in worker processes; the deck and the workbooks are parsed concurrently.
+    # Workers return the spans they recorded (and their profiles, for profiled requests) with their results.
+    profiler = requested_profiler()
+    
+    async def parse_ppt():
+        if ppt_data is not None:
+            return ppt_data
+        print(f"Parsing PPT: {ppt_upload.filename}")
+        with telemetry.span("parse.ppt", file=ppt_upload.filename):
+            parse = partial(traced_call, PPTParser().parse_presentation, sources[ppt_upload.filename], profiler=profiler)
+            parsed = traced_result(await loop.run_in_executor(executor, parse))
+        await loop.run_in_executor(None, parse_cache.put, ppt_key, parsed)
+        return parsed
+    
+    async def parse_excel():
+        if not missing:
+            return {}
+        filenames = [upload.filename for upload in missing]
+        print(f"Parsing Excel files: {filenames}")
+        # parse_workbooks only waits on the pool, so a thread is enough to drive it; Starlette's
+        # threadpool passes it the request's context
+        with telemetry.span("parse.excel", files=len(filenames)):
+            parsed = await run_in_threadpool(
+                ExcelParser().parse_workbooks, [sources[name] for name in filenames], executor, filenames
+            )
+        for upload, key in zip(excel_uploads, excel_keys):
+            if upload in missing:
+                await loop.run_in_executor(None, parse_cache.put, key, parsed[upload.filename])
+        return parsed
+    
+    async def parse_formula_graph(upload, key):
+        # Formulas are read in their own pass and cached separately from the values
+        cached = await loop.run_in_executor(None, parse_cache.get, key)
+        if cached is not None:
+            return cached["formula_graph"]
+        graph = traced_result(await loop.run_in_executor(
+            executor, partial(traced_call, ExcelParser().parse_formula_graph, sources[upload.filename], upload.filename,
+                              profiler=profiler)
+        ))
+        await loop.run_in_executor(None, parse_cache.put, key, {"formula_graph": graph})
+        return graph
+    
+    ppt_data, parsed_excel, *formula_graphs = await asyncio.gather(
+        parse_ppt(), parse_excel(), *(parse_formula_graph(upload, key) for upload, key in zip(excel_uploads, graph_keys))
+    )
+    
+    excel_data = {}
+    for upload, formula_graph in zip(excel_uploads, formula_graphs):
+        filename = upload.filename
+        excel_data[filename] = cached_excel.get(filename) or parsed_excel[filename]
+        excel_data[filename]["formula_graph"] = formula_graph
+    
+    return ppt_data, excel_data
+
+def save_audit_results(session_id: str, audit_results: List[dict], audit_state: dict) -> None:
+    """Store a session's audit results under a new audit ID, so reports of earlier audits are not reused"""
+    session_store.set(session_id, "audit_results", audit_results)
+    session_store.set(session_id, "audit_state", audit_state)
+    session_store.set(session_id, "audit_id", uuid.uuid4().hex)
+
+def build_audit_response(audit_results: List[dict], incremental_report: Optional[dict] = None,
+                         llm_report: Optional[dict] = None) -> dict:
+    """Build the /audit response body from audit results"""
+    response = {
+        "status": "success",
+        "audit_results": audit_results,
+        "total_numbers_found": len(audit_results),
+        "matches": len([r for r in audit_results if r["status"] == "Match"]),
+        "mismatches": len([r for r in audit_results if r["status"] == "Mismatch"]),
+        "untraceable": len([r for r in audit_results if r["status"] == "Untraceable"])
+    }
+    if incremental_report is not None:
+        response["incremental_report"] = incremental_report
+    if llm_report is not None:
+        response["llm_report"] = llm_report
+    return response
+
+async def submit_audit_job(session_id: str):
+    """Queue an audit of a session's uploaded files"""
+    require_session(session_id)
+    ppt_data = await run_in_threadpool(session_store.get, session_id, "ppt_data")
+    excel_data = await run_in_threadpool(session_store.get, session_id, "excel_data")
+    if not ppt_data or not excel_data:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    previous_state = await run_in_threadpool(session_store.get, session_id, "audit_state")
+    upload_id = await run_in_threadpool(session_store.get, session_id, "upload_id")
+    
+    def store_results(job):
+        # Ignore results for files that were replaced while the job ran
+        if session_store.get(job.session_id, "upload_id") == upload_id:
+            save_audit_results(job.session_id, job.results, job.audit_state)
+    
+    return audit_jobs.submit(
+        ppt_data, excel_data, session_id=session_id, on_complete=store_results, previous_state=previous_state
+    )
+
 @app.post("/audit")
-async def run_audit():
-    """Run the audit process on uploaded files"""
+async def run_audit(session_id: str):
+    """Run the audit process on a session's uploaded files and wait for the results"""
     try:
-        if not current_session["ppt_data"] or not current_session["excel_data"]:
-            raise HTTPException(status_code=400, detail="No files uploaded")
+        job = await submit_audit_job(session_id)
+        audit_results = await asyncio.wrap_future(job.future)
+        return build_audit_response(audit_results, job.incremental_report, job.llm_report)
         
-        matcher = NumberMatcher()
-        audit_results = matcher.match_numbers(
-            current_session["ppt_data"], 
-            current_session["excel_data"]
-        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in run_audit: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running audit: {str(e)}")
+
+# Running-total keys for each result status in streamed audits
+STATUS_TOTAL_KEYS = {"Match": "matches", "Mismatch": "mismatches", "Untraceable": "untraceable"}
+
+STALE_UPLOAD_DETAIL = "Files were re-uploaded during the audit; its results were discarded"
+
+def format_stream_event(event: dict, stream_format: str) -> str:
+    """Encode an audit stream event as an NDJSON line or a server-sent event"""
+    payload = json.dumps(event)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+def stream_audit_events(session_id: str, ppt_data: List[dict], excel_data: dict, stream_format: str,
+                        upload_id: Optional[str] = None):
+    """Match a session's numbers, yielding each slide's results with running totals.
+    
+    Stops with an error event if the session's files are replaced while the
+    audit streams, so results for the old files never reach the new upload.
+    """
+    totals = {
+        "total_numbers_found": 0,
+        "matches": 0,
+        "mismatches": 0,
+        "untraceable": 0,
+        "slides_completed": 0,
+        "total_slides": len(ppt_data)
+    }
+    audit_results = []
+    
+    def files_replaced() -> bool:
+        return session_store.get(session_id, "upload_id") != upload_id
+    
+    try:
+        for slide, slide_results in NumberMatcher(**MATCHER_OPTIONS).iter_slide_results(ppt_data, excel_data):
+            if files_replaced():
+                yield format_stream_event({"type": "error", "detail": STALE_UPLOAD_DETAIL}, stream_format)
+                return
+            audit_results.extend(slide_results)
+            totals["total_numbers_found"] += len(slide_results)
+            totals["slides_completed"] += 1
+            for result in slide_results:
+                if result["status"] in STATUS_TOTAL_KEYS:
+                    totals[STATUS_TOTAL_KEYS[result["status"]]] += 1
+            
+            yield format_stream_event(
+                {"type": "slide", "slide": slide["slide_number"], "results": slide_results, "totals": totals},
+                stream_format
+            )
         
-        current_session["audit_results"] = audit_results
+        if llm_adjudicator:
+            # Slides are streamed unreviewed; reviewed results follow in one event before completion
+            with telemetry.span("audit.llm_review"):
+                llm_report = llm_adjudicator.adjudicate_sync(audit_results)
+            reviewed = [result for result in audit_results if "llm_verdict" in result]
+            if files_replaced():
+                yield format_stream_event({"type": "error", "detail": STALE_UPLOAD_DETAIL}, stream_format)
+                return
+            yield format_stream_event({"type": "review", "results": reviewed, "llm_report": llm_report}, stream_format)
         
-        return {
-            "status": "success",
-            "audit_results": audit_results,
-            "total_numbers_found": len(audit_results),
-            "matches": len([r for r in audit_results if r["status"] == "Match"]),
-            "mismatches": len([r for r in audit_results if r["status"] == "Mismatch"]),
-            "untraceable": len([r for r in audit_results if r["status"] == "Untraceable"])
-        }
+        if files_replaced():
+            yield format_stream_event({"type": "error", "detail": STALE_UPLOAD_DETAIL}, stream_format)
+            return
+        save_audit_results(session_id, audit_results, build_audit_state(ppt_data, excel_data, audit_results))
+        yield format_stream_event({"type": "complete", "totals": totals}, stream_format)
         
     except Exception as e:
-        print(f"Error in run_audit: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error running audit: {str(e)}")
+        # Headers are already sent, so report the failure in-band
+        print(f"Error in stream_audit: {str(e)}")
+        yield format_stream_event({"type": "error", "detail": f"Error running audit: {str(e)}"}, stream_format)
+
+@app.get("/audit/stream")
+async def stream_audit(session_id: str, format: str = "ndjson"):
+    """Run the audit, streaming results slide by slide as NDJSON or server-sent events"""
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'ndjson' or 'sse'")
+    
+    require_session(session_id)
+    ppt_data = await run_in_threadpool(session_store.get, session_id, "ppt_data")
+    excel_data = await run_in_threadpool(session_store.get, session_id, "excel_data")
+    if not ppt_data or not excel_data:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    upload_id = await run_in_threadpool(session_store.get, session_id, "upload_id")
+    
+    # Starlette iterates a synchronous generator in its threadpool, off the event loop
+    return StreamingResponse(
+        stream_audit_events(session_id, ppt_data, excel_data, format, upload_id),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/audit-jobs")
+async def create_audit_job(session_id: str):
+    """Start an audit in the background and return its job ID"""
+    job = await submit_audit_job(session_id)
+    return {"status": "success", "job": job.to_dict()}
+
+@app.get("/audit-jobs/{job_id}")
+async def get_audit_job(job_id: str):
+    """Get the progress of an audit job"""
+    job = await run_in_threadpool(audit_jobs.status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Audit job not found")
+    
+    return {"status": "success", "job": job}
+
+@app.get("/audit-jobs/{job_id}/result")
+async def get_audit_job_result(job_id: str):
+    """Get the results of a finished audit job, in the /audit response shape"""
+    job = await run_in_threadpool(audit_jobs.status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Audit job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Error running audit: {job['error']}")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Audit job is {job['status']}")
+    
+    result = await run_in_threadpool(audit_jobs.result, job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Audit job results have expired")
+    return build_audit_response(result["results"], result["incremental_report"], result["llm_report"])
 
 @app.get("/audit-results")
-async def get_audit_results():
-    """Get current audit results"""
-    if not current_session["audit_results"]:
+async def get_audit_results(session_id: str):
+    """Get a session's audit results"""
+    require_session(session_id)
+    audit_results = await run_in_threadpool(session_store.get, session_id, "audit_results")
+    if not audit_results:
         raise HTTPException(status_code=400, detail="No audit results available")
     
     return {
         "status": "success",
-        "results": current_session["audit_results"]
+        "results": audit_results
     }
 
+# Media types of the downloadable report formats
+REPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet"
+}
+
 @app.get("/download-report/{format}")
-async def download_report(format: str):
-    """Download audit report in specified format (pdf/csv)"""
+async def download_report(format: str, session_id: str):
+    """Download a session's audit report in specified format (pdf/csv/xlsx/parquet)"""
     try:
-        if not current_session["audit_results"]:
+        format = format.lower()
+        if format not in REPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid format. Use 'pdf', 'csv', 'xlsx' or 'parquet'")
+        if format == "parquet" and not PARQUET_AVAILABLE:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+        
+        require_session(session_id)
+        audit_results = await run_in_threadpool(session_store.get, session_id, "audit_results")
+        if not audit_results:
             raise HTTPException(status_code=400, detail="No audit results available")
         
         report_gen = ReportGenerator()
+        headers = {"Content-Disposition": f'attachment; filename="audit_report_{session_id}.{format}"'}
         
-        if format.lower() == "pdf":
-            file_path = report_gen.generate_pdf_report(current_session["audit_results"])
-            return FileResponse(
-                file_path, 
-                media_type="application/pdf",
-                filename=f"audit_report_{current_session['session_id']}.pdf"
-            )
-        elif format.lower() == "csv":
-            file_path = report_gen.generate_csv_report(current_session["audit_results"])
-            return FileResponse(
-                file_path,
-                media_type="text/csv", 
-                filename=f"audit_report_{current_session['session_id']}.csv"
-            )
+        if format == "csv":
+            # Rows are written into the response as they are formatted, with no file in between
+            return StreamingResponse(report_gen.iter_csv_report(audit_results), media_type="text/csv", headers=headers)
+        
+        # Other reports are cached per audit, so repeated downloads of the same results are not rebuilt
+        generate = {
+            "pdf": report_gen.generate_pdf_report,
+            "xlsx": report_gen.generate_xlsx_report,
+            "parquet": report_gen.generate_parquet_report
+        }[format]
+        audit_id = await run_in_threadpool(session_store.get, session_id, "audit_id")
+        cache_key = parse_cache.make_key(f"report-{format}", f"{session_id}-{audit_id}", REPORT_VERSION) if audit_id else None
+        cached = await run_in_threadpool(parse_cache.get, cache_key) if cache_key else None
+        if cached is not None:
+            report = cached["report"]
         else:
-            raise HTTPException(status_code=400, detail="Invalid format. Use 'pdf' or 'csv'")
+            report = await run_in_threadpool(profiled_call, generate, audit_results)
+            if cache_key:
+                await run_in_threadpool(parse_cache.put, cache_key, {"report": report})
+        return Response(report, media_type=REPORT_MEDIA_TYPES[format], headers=headers)
             
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in download_report: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
+@app.get("/metrics")
+async def get_metrics():
+    """Stage timings, matcher counters and cache statistics in the Prometheus text format"""
+    cache_stats = parse_cache.stats()
+    gauges = {f"parse_cache_{name}": value for name, value in cache_stats.items()}
+    return PlainTextResponse(telemetry.render_prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """Parse cache hit/miss counters"""
+    return {"status": "success", "parse_cache": parse_cache.stats()}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
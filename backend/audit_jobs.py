@@ -0,0 +1,179 @@
+import contextvars
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from matcher import NumberMatcher
+from incremental_audit import run_incremental_audit
+from llm_adjudicator import LLMAdjudicator
+from session_store import SessionStore
+from telemetry import profiled_thread, telemetry
+
+
+class AuditJob:
+    """State of one background audit"""
+
+    def __init__(self, job_id: str, session_id: Optional[str]):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.status = "queued"
+        self.numbers_matched = 0
+        self.total_numbers = 0
+        self.results: Optional[List[Dict[str, Any]]] = None
+        self.audit_state: Optional[Dict[str, Any]] = None  # Fingerprints and results for the next re-audit
+        self.incremental_report: Optional[Dict[str, Any]] = None
+        self.llm_report: Optional[Dict[str, Any]] = None  # Token and latency accounting of LLM review
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.future: Optional[Future] = None
+
+    def update_progress(self, numbers_matched: int, total_numbers: int) -> None:
+        self.numbers_matched = numbers_matched
+        self.total_numbers = total_numbers
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job's progress without its results"""
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "numbers_matched": self.numbers_matched,
+            "total_numbers": self.total_numbers,
+            "progress": self.numbers_matched / self.total_numbers if self.total_numbers else 0.0,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class AuditJobQueue:
+    """Runs audits on a worker pool and tracks their progress by job ID.
+
+    Workers are threads so jobs share the parsed data without copying it and
+    report progress directly; the heavy context scoring in rapidfuzz releases
+    the GIL, and the event loop is never blocked.
+
+    With a store shared between worker processes, each job's progress and
+    results are also written there under its job ID, so any API worker can
+    answer polls for a job another one runs.
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished_jobs: int = 100,
+                 matcher_options: Optional[Dict[str, Any]] = None, adjudicator: Optional[LLMAdjudicator] = None,
+                 store: Optional[SessionStore] = None, progress_interval: float = 0.5):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audit")
+        self.max_finished_jobs = max_finished_jobs
+        self.matcher_options = matcher_options or {}  # Keyword arguments for each job's NumberMatcher
+        self.adjudicator = adjudicator  # Optional LLM review of low-confidence results
+        self.store = store if store is not None and store.shared else None
+        self.progress_interval = progress_interval  # Seconds between progress writes to the store
+        self.jobs: Dict[str, AuditJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, ppt_data: List[Dict], excel_data: Dict, session_id: Optional[str] = None,
+               on_complete: Optional[Callable[[AuditJob], None]] = None,
+               previous_state: Optional[Dict[str, Any]] = None) -> AuditJob:
+        """Queue an audit and return its job; previous_state makes it re-match only what changed"""
+        job = AuditJob(f"job_{uuid.uuid4().hex}", session_id)
+        with self._lock:
+            self._prune_finished_jobs()
+            self.jobs[job.job_id] = job
+        self._publish(job)
+        # Run in a copy of the caller's context, so a profiled request's profile follows the job
+        job.future = self.executor.submit(
+            contextvars.copy_context().run, self._run, job, ppt_data, excel_data, on_complete, previous_state
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[AuditJob]:
+        """Return a job run by this process"""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's progress, whichever worker process runs it; None if unknown"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get(job_id, "job") if self.store else None
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a completed job's results and reports, whichever worker process ran it"""
+        job = self.get(job_id)
+        if job is not None:
+            if job.status != "completed":
+                return None
+            return {"results": job.results, "incremental_report": job.incremental_report, "llm_report": job.llm_report}
+        return self.store.get(job_id, "result") if self.store else None
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: AuditJob, ppt_data: List[Dict], excel_data: Dict,
+             on_complete: Optional[Callable[[AuditJob], None]],
+             previous_state: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        job.status = "running"
+        job.started_at = datetime.now()
+        self._publish(job)
+        published_at = time.monotonic()
+
+        def update_progress(numbers_matched: int, total_numbers: int) -> None:
+            nonlocal published_at
+            job.update_progress(numbers_matched, total_numbers)
+            if self.store and time.monotonic() - published_at >= self.progress_interval:
+                published_at = time.monotonic()
+                self._publish(job)
+
+        try:
+            with profiled_thread(), telemetry.span("audit", slides=len(ppt_data)):
+                job.results, job.audit_state, job.incremental_report = run_incremental_audit(
+                    NumberMatcher(**self.matcher_options), ppt_data, excel_data, previous_state, update_progress
+                )
+                if self.adjudicator:
+                    # Results reused from the previous audit keep their verdicts and are skipped
+                    with telemetry.span("audit.llm_review"):
+                        job.llm_report = self.adjudicator.adjudicate_sync(job.results)
+            # Store results before pollers can see the job as completed
+            if on_complete:
+                on_complete(job)
+            if self.store:
+                self.store.set(job.job_id, "result", {"results": job.results,
+                                                      "incremental_report": job.incremental_report,
+                                                      "llm_report": job.llm_report})
+            job.finished_at = datetime.now()
+            job.status = "completed"
+            self._publish(job)
+            telemetry.increment("audit_jobs", status=job.status)
+            return job.results
+        except Exception as e:
+            print(f"Error in audit job {job.job_id}: {str(e)}")
+            job.error = str(e)
+            job.finished_at = datetime.now()
+            job.status = "failed"
+            self._publish(job)
+            telemetry.increment("audit_jobs", status=job.status)
+            raise
+
+    def _publish(self, job: AuditJob) -> None:
+        """Write a job's progress to the shared store, if any; the store's TTL expires it"""
+        if self.store:
+            try:
+                self.store.set(job.job_id, "job", job.to_dict())
+            except Exception as e:
+                print(f"Error publishing audit job {job.job_id}: {str(e)}")
+
+    def _prune_finished_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond max_finished_jobs"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda job: job.created_at)[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.job_id]
@@ -0,0 +1,244 @@
+"""Audit many decks against the same Excel models from the command line.
+
+The workbooks are parsed once and the matcher's lookup structures are built
+once, then the decks are audited in parallel worker processes that share
+that lookup. Each deck gets its own CSV and JSON report; a summary of every
+deck is written as summary.json and summary.csv.
+
+Usage:
+    python batch_audit.py --excel model.xlsx [model2.xlsx ...] --decks decks/ [q3.pptx ...] \
+        --output-dir reports/ [--workers 4] [--formats csv json] [--cache-dir .cache] [--derived-search]
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+from excel_parser import ExcelParser, PARSER_VERSION as EXCEL_PARSER_VERSION
+from formula_graph import GRAPH_VERSION as FORMULA_GRAPH_VERSION
+from matcher import ExcelLookup, NumberMatcher
+from parse_cache import ParseCache, hash_file
+from ppt_parser import PPTParser, PARSER_VERSION as PPT_PARSER_VERSION
+from report_generator import ReportGenerator
+
+SUMMARY_COLUMNS = ["deck", "status", "slides", "total_numbers_found", "matches", "mismatches", "untraceable",
+                   "match_rate", "seconds", "error"]
+
+# Set in each worker process by _init_worker
+_matcher: Optional[NumberMatcher] = None
+_lookup: Optional[ExcelLookup] = None
+_cache: Optional[ParseCache] = None
+
+
+def _init_worker(matcher_options: Dict[str, Any], lookup: ExcelLookup, cache_dir: Optional[str]) -> None:
+    """Keep the shared lookup in the worker.
+
+    Passed as pool initargs, the lookup reaches each worker once rather than
+    with every deck. With the fork start method (the Linux default) workers
+    inherit it without pickling; with spawn (the macOS and Windows default)
+    it is pickled once per worker.
+    """
+    global _matcher, _lookup, _cache
+    _matcher = NumberMatcher(**matcher_options)
+    _lookup = lookup
+    _cache = ParseCache(cache_dir) if cache_dir else None
+
+
+def collect_decks(paths: List[str]) -> List[str]:
+    """Expand directories into the .pptx files they contain"""
+    decks = []
+    for path in paths:
+        if os.path.isdir(path):
+            decks.extend(sorted(glob.glob(os.path.join(path, "*.pptx"))))
+        else:
+            decks.append(path)
+    return decks
+
+
+def report_names(decks: List[str]) -> Dict[str, str]:
+    """Name each deck's reports after the deck, numbering decks that share a name"""
+    names, seen = {}, {}
+    for deck in decks:
+        stem = os.path.splitext(os.path.basename(deck))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names[deck] = stem if seen[stem] == 1 else f"{stem}_{seen[stem]}"
+    return names
+
+
+def parse_workbooks(excel_paths: List[str], executor: ProcessPoolExecutor,
+                    cache: Optional[ParseCache]) -> Dict[str, Dict[str, Any]]:
+    """Parse the workbooks and their formula graphs, as the upload endpoint does"""
+    parser = ExcelParser()
+    hashes = {path: hash_file(path) for path in excel_paths} if cache else {}
+    excel_data, missing = {}, []
+    for path in excel_paths:
+        cached = cache.get(cache.make_key("excel", hashes[path], EXCEL_PARSER_VERSION)) if cache else None
+        if cached is not None:
+            cached["filename"] = os.path.basename(path)
+            excel_data[cached["filename"]] = cached
+        else:
+            missing.append(path)
+
+    if missing:
+        parsed = parser.parse_workbooks(missing, executor)
+        for path in missing:
+            excel_data[os.path.basename(path)] = parsed[os.path.basename(path)]
+            if cache:
+                cache.put(cache.make_key("excel", hashes[path], EXCEL_PARSER_VERSION), parsed[os.path.basename(path)])
+
+    graph_futures = {}
+    for path in excel_paths:
+        key = cache.make_key("formulas", hashes[path], FORMULA_GRAPH_VERSION) if cache else None
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            excel_data[os.path.basename(path)]["formula_graph"] = cached["formula_graph"]
+        else:
+            graph_futures[path] = (executor.submit(parser.parse_formula_graph, path), key)
+    for path, (future, key) in graph_futures.items():
+        graph = future.result()
+        excel_data[os.path.basename(path)]["formula_graph"] = graph
+        if cache:
+            cache.put(key, {"formula_graph": graph})
+
+    return excel_data
+
+
+def _collect(slides: Iterator[Dict[str, Any]], collected: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Pass slides through, keeping each one"""
+    for slide in slides:
+        collected.append(slide)
+        yield slide
+
+
+def audit_deck(deck_path: str, report_name: str, output_dir: str, formats: List[str]) -> Dict[str, Any]:
+    """Parse and audit one deck in a worker process, writing its reports; returns its summary row"""
+    start = time.perf_counter()
+    summary = {"deck": deck_path, "status": "completed", "error": ""}
+    try:
+        ppt_data = None
+        cache_key = _cache.make_key("ppt", hash_file(deck_path), PPT_PARSER_VERSION) if _cache else None
+        if cache_key:
+            ppt_data = _cache.get(cache_key)
+        if ppt_data is None:
+            # Slides are matched as they are parsed; they are collected for the cache and the summary
+            ppt_data = []
+            results = _matcher.match_numbers(_collect(PPTParser().iter_slides(deck_path), ppt_data), {},
+                                             lookup=_lookup)
+            if cache_key:
+                _cache.put(cache_key, ppt_data)
+        else:
+            results = _matcher.match_numbers(ppt_data, {}, lookup=_lookup)
+
+        report_gen = ReportGenerator()
+        if "csv" in formats:
+            with open(os.path.join(output_dir, f"{report_name}.csv"), "w", newline="", encoding="utf-8") as f:
+                for chunk in report_gen.iter_csv_report(results):
+                    f.write(chunk)
+        if "json" in formats:
+            with open(os.path.join(output_dir, f"{report_name}.json"), "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, default=str)
+
+        counts = {status: sum(1 for r in results if r["status"] == status)
+                  for status in ("Match", "Mismatch", "Untraceable")}
+        summary.update({
+            "slides": len(ppt_data),
+            "total_numbers_found": len(results),
+            "matches": counts["Match"],
+            "mismatches": counts["Mismatch"],
+            "untraceable": counts["Untraceable"],
+            "match_rate": round(counts["Match"] / len(results) * 100, 1) if results else 0.0
+        })
+
+    except Exception as e:
+        print(f"Error auditing {deck_path}: {str(e)}")
+        summary.update({"status": "failed", "error": str(e)})
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def write_summary(summaries: List[Dict[str, Any]], output_dir: str, excel_paths: List[str],
+                  seconds: float) -> Dict[str, Any]:
+    """Write the per-deck summary rows and batch totals as summary.json and summary.csv"""
+    completed = [s for s in summaries if s["status"] == "completed"]
+    totals = {key: sum(s[key] for s in completed)
+              for key in ("slides", "total_numbers_found", "matches", "mismatches", "untraceable")}
+    totals["match_rate"] = round(totals["matches"] / totals["total_numbers_found"] * 100, 1) \
+        if totals["total_numbers_found"] else 0.0
+    summary = {
+        "excel_files": [os.path.basename(path) for path in excel_paths],
+        "decks": len(summaries),
+        "decks_failed": len(summaries) - len(completed),
+        "totals": totals,
+        "seconds": round(seconds, 3),
+        "results": summaries
+    }
+
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(output_dir, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Audit many decks against the same Excel models")
+    parser.add_argument("--excel", nargs="+", required=True, help="Model workbooks shared by every deck")
+    parser.add_argument("--decks", nargs="+", required=True, help="Decks, or directories of .pptx files")
+    parser.add_argument("--output-dir", required=True, help="Directory for per-deck reports and the summary")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--formats", nargs="+", choices=["csv", "json"], default=["csv", "json"],
+                        help="Per-deck report formats")
+    parser.add_argument("--cache-dir", help="Parse cache directory, to reuse parsed files across runs")
+    parser.add_argument("--derived-search", action="store_true",
+                        help="Also match growth rates, ratios and totals of neighbouring cells")
+    parser.add_argument("--no-context-blocking", action="store_true",
+                        help="Fuzzy-score every Excel context, not only those sharing a token with the number")
+    args = parser.parse_args(argv)
+
+    decks = collect_decks(args.decks)
+    if not decks:
+        print("No decks to audit")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    cache = ParseCache(args.cache_dir) if args.cache_dir else None
+    matcher_options = {"derived_search": args.derived_search, "context_blocking": not args.no_context_blocking}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        excel_data = parse_workbooks(args.excel, executor, cache)
+    lookup = NumberMatcher(**matcher_options).build_lookup(excel_data)
+    print(f"Built lookup over {len(lookup.numbers)} Excel numbers in {time.perf_counter() - start:.2f}s")
+
+    # A fresh pool, so workers start with the finished lookup
+    names = report_names(decks)
+    summaries = []
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(decks)), initializer=_init_worker,
+                             initargs=(matcher_options, lookup, args.cache_dir)) as executor:
+        futures = [
+            executor.submit(audit_deck, deck, names[deck], args.output_dir, args.formats) for deck in decks
+        ]
+        for future in as_completed(futures):
+            deck_summary = future.result()
+            summaries.append(deck_summary)
+            print(f"[{len(summaries)}/{len(decks)}] {deck_summary['deck']}: {deck_summary['status']}"
+                  f" ({deck_summary.get('matches', 0)}/{deck_summary.get('total_numbers_found', 0)} matched,"
+                  f" {deck_summary['seconds']:.2f}s)")
+
+    summaries.sort(key=lambda s: decks.index(s["deck"]))
+    summary = write_summary(summaries, args.output_dir, args.excel, time.perf_counter() - start)
+    totals = summary["totals"]
+    print(f"Audited {summary['decks']} decks ({summary['decks_failed']} failed) in {summary['seconds']:.2f}s: "
+          f"{totals['matches']} of {totals['total_numbers_found']} numbers matched")
+    return 1 if summary["decks_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Recall/latency benchmark for context blocking in NumberMatcher.
+
+Runs the audit once with the exhaustive fuzzy context scan and once with
+token blocking, then reports how often blocking picked the same Excel cell
+and how long each run took.
+
+Usage:
+    python benchmarks/context_blocking.py deck.pptx model.xlsx [more.xlsx ...] [--cap 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ppt_parser import PPTParser
+from excel_parser import ExcelParser
+from matcher import NumberMatcher
+
+
+def _result_key(result):
+    return (result["status"], result["excel_file"], result["excel_sheet"], result["cell"])
+
+
+def run(ppt_path, excel_paths, cap):
+    ppt_data = PPTParser().parse_presentation(ppt_path)
+    excel_parser = ExcelParser()
+    excel_data = {os.path.basename(path): excel_parser.parse_workbook(path) for path in excel_paths}
+
+    start = time.perf_counter()
+    exhaustive = NumberMatcher(context_blocking=False).match_numbers(ppt_data, excel_data)
+    exhaustive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocked = NumberMatcher(context_blocking=True, context_candidate_cap=cap).match_numbers(ppt_data, excel_data)
+    blocked_seconds = time.perf_counter() - start
+
+    agreeing = sum(1 for a, b in zip(exhaustive, blocked) if _result_key(a) == _result_key(b))
+    # Recall over the results that the fuzzy fallback actually decided
+    fallback = [(a, b) for a, b in zip(exhaustive, blocked) if a["status"] != "Match"]
+    fallback_agreeing = sum(1 for a, b in fallback if _result_key(a) == _result_key(b))
+
+    print(f"PPT numbers:            {len(exhaustive)}")
+    print(f"Exhaustive scan:        {exhaustive_seconds:.3f}s")
+    print(f"Blocked scan (cap={cap}): {blocked_seconds:.3f}s ({exhaustive_seconds / max(blocked_seconds, 1e-9):.1f}x)")
+    print(f"Overall agreement:      {agreeing}/{len(exhaustive)}")
+    if fallback:
+        print(f"Fallback recall:        {fallback_agreeing}/{len(fallback)} ({fallback_agreeing / len(fallback) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ppt_path")
+    parser.add_argument("excel_paths", nargs="+")
+    parser.add_argument("--cap", type=int, default=500, help="Max contexts fuzzy-scored per PPT number")
+    args = parser.parse_args()
+    run(args.ppt_path, args.excel_paths, args.cap)
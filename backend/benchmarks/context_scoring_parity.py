@@ -0,0 +1,122 @@
+"""Parity check for batched rapidfuzz context scoring in NumberMatcher.
+
+Checks that:
+  * rapidfuzz partial_ratio never scores below fuzzywuzzy partial_ratio on
+    the real context pairs (the bound the exact scoring mode relies on), and
+  * the batched matcher picks the same Excel number, with the same status,
+    as a sequential fuzzywuzzy scan over every number.
+
+Exits with status 1 if either check fails.
+
+Usage:
+    python benchmarks/context_scoring_parity.py deck.pptx model.xlsx [more.xlsx ...] [--pairs 200000]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz as rapid_fuzz, process
+
+from ppt_parser import PPTParser
+from excel_parser import ExcelParser
+from matcher import NumberMatcher
+
+
+def sequential_match(matcher, ppt_numbers, excel_numbers):
+    """Reference implementation: a per-pair fuzzywuzzy scan over the matcher's candidates.
+
+    As in NumberMatcher, numbers within tolerance of the PPT value, either as
+    computed or as written in their cell, are tried first, then any number
+    whose context scores above 60. Returns (status, file, sheet, cell) for
+    each PPT number.
+    """
+    def value_matches(ppt_value, excel_num):
+        return matcher._numbers_match(ppt_value, excel_num["value"]) or (
+            "raw_value" in excel_num and matcher._numbers_match(ppt_value, excel_num["raw_value"]))
+
+    results = []
+    for ppt_number in ppt_numbers:
+        ppt_value = ppt_number["parsed_value"]
+        best_match, best_score = None, -1
+        for excel_num in excel_numbers:
+            if value_matches(ppt_value, excel_num):
+                context_score = matcher._calculate_context_similarity(ppt_number, excel_num)
+                if context_score > best_score:
+                    best_score, best_match = context_score, excel_num
+        if best_match is None:
+            best_score = 60
+            for excel_num in excel_numbers:
+                context_score = matcher._calculate_context_similarity(ppt_number, excel_num)
+                if context_score > best_score:
+                    best_score, best_match = context_score, excel_num
+
+        if best_match is None:
+            results.append(("Untraceable", None, None, None))
+        else:
+            status = "Match" if value_matches(ppt_value, best_match) else "Mismatch"
+            results.append((status, best_match.get("source_file", ""), best_match["sheet_name"],
+                            best_match["cell_reference"]))
+    return results
+
+
+def result_key(result):
+    """The parts of a result that depend on which Excel number was chosen"""
+    return result["status"], result["excel_file"], result["excel_sheet"], result["cell"]
+
+
+def run(ppt_path, excel_paths, max_pairs):
+    ppt_data = PPTParser().parse_presentation(ppt_path)
+    excel_parser = ExcelParser()
+    excel_data = {os.path.basename(path): excel_parser.parse_workbook(path) for path in excel_paths}
+
+    matcher = NumberMatcher(context_blocking=False)
+    lookup = matcher.build_lookup(excel_data)
+    ppt_numbers = [number for slide in ppt_data for number in slide["numbers"]]
+    ppt_contexts = [matcher._ppt_context_text(number) for number in ppt_numbers]
+
+    # Score bound check over a bounded sample of context pairs
+    rows = max(1, min(len(ppt_contexts), max_pairs // max(len(lookup.contexts), 1)))
+    sample = ppt_contexts[:rows]
+    batched = process.cdist(sample, lookup.contexts, scorer=rapid_fuzz.partial_ratio, workers=-1)
+    violations = differing = 0
+    for i, ppt_context in enumerate(sample):
+        for j, excel_context in enumerate(lookup.contexts):
+            reference = fuzz.partial_ratio(ppt_context, excel_context) if ppt_context and excel_context else 0
+            if reference > math.ceil(batched[i, j] + 1e-3):
+                violations += 1
+            if reference != round(batched[i, j]):
+                differing += 1
+    pairs = len(sample) * len(lookup.contexts)
+    print(f"Context pairs checked:  {pairs}")
+    print(f"Differing raw scores:   {differing}")
+    print(f"Bound violations:       {violations}")
+
+    start = time.perf_counter()
+    excel_numbers = [lookup.numbers.record(i) for i in range(len(lookup.numbers))]
+    reference_results = sequential_match(matcher, ppt_numbers, excel_numbers)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched_results = [result_key(matcher._find_best_match(number, lookup)) for number in ppt_numbers]
+    batched_seconds = time.perf_counter() - start
+
+    mismatched = sum(1 for a, b in zip(reference_results, batched_results) if a != b)
+    print(f"Sequential fuzzywuzzy:  {reference_seconds:.3f}s")
+    print(f"Batched cdist:          {batched_seconds:.3f}s")
+    print(f"Differing results:      {mismatched}/{len(ppt_numbers)}")
+
+    return violations == 0 and mismatched == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ppt_path")
+    parser.add_argument("excel_paths", nargs="+")
+    parser.add_argument("--pairs", type=int, default=200000, help="Max context pairs for the score bound check")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.ppt_path, args.excel_paths, args.pairs) else 1)
@@ -0,0 +1,97 @@
+"""Local stand-in for an OpenAI-compatible chat completions server.
+
+Answers every item in an adjudication prompt with a deterministic verdict,
+so LLM review can be exercised without network access or an API key.
+Latency and transient failures can be injected to exercise batching,
+the concurrency limit and retry/backoff.
+
+Usage:
+    python benchmarks/llm_stub_server.py [--port 8765] [--latency 0.2] [--fail-rate 0.2]
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 LLM_ADJUDICATION=1 uvicorn app:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_rate = 0.0
+    requests = 0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(cls.latency)
+            if random.random() < cls.fail_rate:
+                self._send(503, {"error": {"message": "Injected failure", "type": "server_error"}})
+                return
+
+            items = json.loads(body["messages"][-1]["content"])["items"]
+            verdicts = [self._verdict(item) for item in items]
+            prompt_tokens = sum(len(message["content"]) // 4 for message in body["messages"])
+            content = json.dumps({"verdicts": verdicts})
+            self._send(200, {
+                "id": f"chatcmpl-stub-{cls.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                          "total_tokens": prompt_tokens + len(content) // 4}
+            })
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _verdict(self, item):
+        if item.get("excel_value") is None:
+            return {"id": item["id"], "verdict": "untraceable", "explanation": "No Excel figure to compare."}
+        ratio = item["parsed_value"] / item["excel_value"] if item["excel_value"] else 0
+        verdict = "match" if 0.99 <= ratio <= 1.01 else "mismatch"
+        return {"id": item["id"], "verdict": verdict, "explanation": f"Slide/Excel ratio is {ratio:.3f}."}
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, latency, fail_rate):
+    StubHandler.latency = latency
+    StubHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    print(f"Stub OpenAI server on http://127.0.0.1:{port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served {StubHandler.requests} requests, at most {StubHandler.max_in_flight} at once")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with a 503")
+    args = parser.parse_args()
+    serve(args.port, args.latency, args.fail_rate)
@@ -0,0 +1,148 @@
+"""Microbenchmark for PPTParser number extraction.
+
+Compares the single-pass tokenizer in PPTParser against the previous
+five-pattern extractor on a corpus of slide text. By default the corpus is
+a built-in sample of typical finance slide text; pass decks to use their
+real text boxes and table cells instead.
+
+Usage:
+    python benchmarks/number_extraction.py [deck.pptx ...] [--repeat 200]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx import Presentation
+
+from ppt_parser import PPTParser
+
+SAMPLE_CORPUS = [
+    "Revenue grew to ₹5.2 Cr in FY2023, up 12.5% YoY",
+    "EBITDA margin expanded 340 bps to 18.7%",
+    "Net profit of ₹ 45.3 Lacs on revenue of ₹ 2,450 Lacs",
+    "ARR crossed $1.2M with 3,400 paying customers",
+    "Headcount: 1,250 | Attrition: 14%",
+    "Cash and equivalents of $45.6 Mn as of Q3 FY24",
+    "Gross merchandise value ₹1,200 Cr (+35% YoY), take rate 9.5%",
+    "Capex of 12.5 Cr planned for FY25 across 3 new plants",
+    "Customer acquisition cost fell from $420 to $310",
+    "Market size estimated at $4.5B, growing at 22% CAGR through 2030",
+    "Q1 2024 Q2 2024 Q3 2024 Q4 2024",
+    "Opex 1,234.56 2,345.67 3,456.78 4,567.89",
+]
+
+LEGACY_PATTERNS = [
+    r'₹\s*[\d,]+\.?\d*\s*[KkMmBbCrLacslacs]*',
+    r'\$\s*[\d,]+\.?\d*\s*[KkMmBb]*',
+    r'[\d,]+\.?\d*\s*%',
+    r'[\d,]+\.?\d*\s*[KkMmBbCrLacslacs]+',
+    r'[\d,]+\.?\d*',
+]
+
+
+def legacy_parse_number(number_text):
+    try:
+        clean_text = re.sub(r'[₹$\s]', '', number_text)
+        multiplier = 1
+        if re.search(r'[Cc]r', clean_text, re.IGNORECASE):
+            multiplier = 10000000
+            clean_text = re.sub(r'[Cc]r.*', '', clean_text, flags=re.IGNORECASE)
+        elif re.search(r'[Ll]ac', clean_text, re.IGNORECASE):
+            multiplier = 100000
+            clean_text = re.sub(r'[Ll]ac.*', '', clean_text, flags=re.IGNORECASE)
+        elif re.search(r'[Kk]', clean_text):
+            multiplier = 1000
+            clean_text = re.sub(r'[Kk].*', '', clean_text)
+        elif re.search(r'[Mm]', clean_text):
+            multiplier = 1000000
+            clean_text = re.sub(r'[Mm].*', '', clean_text)
+        elif re.search(r'[Bb]', clean_text):
+            multiplier = 1000000000
+            clean_text = re.sub(r'[Bb].*', '', clean_text)
+        clean_text = clean_text.replace('%', '').replace(',', '')
+        return float(clean_text) * multiplier
+    except (ValueError, AttributeError):
+        return None
+
+
+def legacy_classify(number_text):
+    if '₹' in number_text or '$' in number_text:
+        return "currency"
+    elif '%' in number_text:
+        return "percentage"
+    elif re.search(r'[KkMmBbCrLac]', number_text, re.IGNORECASE):
+        return "metric"
+    return "number"
+
+
+def legacy_extract(text):
+    """The extractor PPTParser used before the single-pass tokenizer"""
+    numbers = []
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            number_text = match.group().strip()
+            start = max(0, match.start() - 50)
+            end = min(len(text), match.end() + 50)
+            parsed_number = legacy_parse_number(number_text)
+            if parsed_number is not None:
+                numbers.append({
+                    "raw_text": number_text,
+                    "parsed_value": parsed_number,
+                    "context": text[start:end].strip(),
+                    "position": match.start(),
+                    "type": legacy_classify(number_text)
+                })
+    return numbers
+
+
+def load_corpus(ppt_paths):
+    corpus = []
+    for ppt_path in ppt_paths:
+        for slide in Presentation(ppt_path).slides:
+            for shape in slide.shapes:
+                if hasattr(shape, "text") and shape.text.strip():
+                    corpus.append(shape.text.strip())
+                if shape.has_table:
+                    for row in shape.table.rows:
+                        corpus.extend(cell.text for cell in row.cells if cell.text.strip())
+    return corpus
+
+
+def time_extractor(extract, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            extract(text)
+    return time.perf_counter() - start
+
+
+def run(ppt_paths, repeat):
+    corpus = load_corpus(ppt_paths) if ppt_paths else SAMPLE_CORPUS
+    corpus_bytes = sum(len(text.encode("utf-8")) for text in corpus) * repeat
+    parser = PPTParser()
+
+    legacy_seconds = time_extractor(legacy_extract, corpus, repeat)
+    tokenizer_seconds = time_extractor(parser._extract_numbers_from_text, corpus, repeat)
+
+    legacy_count = sum(len(legacy_extract(text)) for text in corpus)
+    legacy_spans = sum(len({n["position"] for n in legacy_extract(text)}) for text in corpus)
+    tokenizer_count = sum(len(parser._extract_numbers_from_text(text)) for text in corpus)
+
+    print(f"Corpus:            {len(corpus)} texts x {repeat} repeats ({corpus_bytes / 1e6:.2f} MB)")
+    print(f"Legacy extractor:  {legacy_seconds:.3f}s ({corpus_bytes / 1e6 / legacy_seconds:.2f} MB/s), "
+          f"{legacy_count} numbers from {legacy_spans} distinct start positions")
+    print(f"Tokenizer:         {tokenizer_seconds:.3f}s ({corpus_bytes / 1e6 / tokenizer_seconds:.2f} MB/s), "
+          f"{tokenizer_count} numbers")
+    print(f"Speedup:           {legacy_seconds / tokenizer_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ppt_paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.ppt_paths, args.repeat)
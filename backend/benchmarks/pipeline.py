@@ -0,0 +1,211 @@
+"""End-to-end benchmark of the parse -> match -> report path on synthetic files.
+
+For each size (slides x workbook cells) a seeded deck and workbook are
+generated with benchmarks/synthetic_files.py, then each stage is timed:
+PPTParser.parse_presentation, ExcelParser.parse_workbook (.xlsx, and .xls
+with --xls), NumberMatcher.match_numbers, and the PDF and CSV reports.
+Peak memory per stage is measured with tracemalloc in a separate run, so it
+does not slow the timed runs. tracemalloc sees Python and numpy allocations,
+not lxml's, so the parsers' XML trees are not counted.
+
+Results can be saved as a baseline JSON and later runs compared against it.
+A stage regresses when it is slower, or uses more memory, than the baseline
+by more than the tolerance. As the files are seeded, the audit's result
+counts must match the baseline exactly. Exits with status 1 on any
+regression.
+
+Usage:
+    python benchmarks/pipeline.py [--preset quick|default|full] [--size 100x100000 ...] [--xls] [--repeat 5]
+        [--data-dir /tmp/deck_audit_bench] [--output results.json]
+        [--save-baseline benchmarks/pipeline_baseline.json | --baseline benchmarks/pipeline_baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ppt_parser import PPTParser
+from excel_parser import ExcelParser
+from matcher import NumberMatcher
+from report_generator import ReportGenerator
+from synthetic_files import XLS_AVAILABLE, generate
+
+# (slides, workbook cells) per run
+PRESETS = {
+    "quick": [(10, 1000)],
+    "default": [(10, 1000), (100, 100000)],
+    "full": [(10, 1000), (100, 100000), (500, 1000000)],
+}
+
+# A stage must also be this much slower in absolute terms to regress, as sub-100ms timings are noisy
+MIN_REGRESSION_SECONDS = 0.1
+
+
+def measure(function: Callable[[], Any], repeat: int, memory: bool) -> Tuple[Any, Dict[str, float]]:
+    """Median wall time over ``repeat`` runs, then peak traced memory from one more run"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    stats = {"seconds": round(statistics.median(timings), 4)}
+
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+
+def run_size(slides: int, cells: int, data_dir: str, seed: int, repeat: int, memory: bool, xls: bool) -> Dict[str, Any]:
+    """Generate (or reuse) the files for one size and benchmark each stage on them"""
+    paths = generate(data_dir, slides, cells, seed, xls)
+    stages = {}
+
+    ppt_data, stages["parse_presentation"] = measure(lambda: PPTParser().parse_presentation(paths["deck"]),
+                                                     repeat, memory)
+    excel_result, stages["parse_workbook_xlsx"] = measure(lambda: ExcelParser().parse_workbook(paths["xlsx"]),
+                                                          repeat, memory)
+    if xls:
+        _, stages["parse_workbook_xls"] = measure(lambda: ExcelParser().parse_workbook(paths["xls"]), repeat, memory)
+
+    excel_data = {excel_result["filename"]: excel_result}
+    results, stages["match_numbers"] = measure(lambda: NumberMatcher().match_numbers(ppt_data, excel_data),
+                                               repeat, memory)
+    pdf, stages["pdf_report"] = measure(lambda: ReportGenerator().generate_pdf_report(results), repeat, memory)
+    csv_text, stages["csv_report"] = measure(lambda: "".join(ReportGenerator().iter_csv_report(results)),
+                                             repeat, memory)
+
+    statuses = Counter(result["status"] for result in results)
+    return {
+        "size": f"{slides}x{cells}",
+        "slides": slides,
+        "cells": cells,
+        "stages": stages,
+        "results": {
+            "ppt_numbers": len(results),
+            "excel_numbers": len(excel_result["numbers"]),
+            "matches": statuses["Match"],
+            "mismatches": statuses["Mismatch"],
+            "untraceable": statuses["Untraceable"],
+            "csv_bytes": len(csv_text.encode("utf-8"))
+        },
+        "pdf_bytes": len(pdf)
+    }
+
+
+def compare(runs: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """Return a description of every regression against the baseline"""
+    regressions = []
+    baseline_runs = {run["size"]: run for run in baseline["runs"]}
+    for run in runs:
+        previous = baseline_runs.get(run["size"])
+        if previous is None:
+            print(f"{run['size']}: not in baseline")
+            continue
+        if run["results"] != previous["results"]:
+            regressions.append(f"{run['size']}: results changed from {previous['results']} to {run['results']}")
+
+        for stage, stats in run["stages"].items():
+            before = previous["stages"].get(stage)
+            if before is None:
+                continue
+            change = stats["seconds"] / max(before["seconds"], 1e-9) - 1
+            line = f"  {run['size']:>14} {stage:<20} {before['seconds']:>9.3f}s -> {stats['seconds']:>9.3f}s {change:>+7.1%}"
+            if change > tolerance and stats["seconds"] - before["seconds"] > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{run['size']} {stage}: {change:+.1%} time")
+                line += "  SLOWER"
+            if "peak_mb" in stats and "peak_mb" in before:
+                memory_change = stats["peak_mb"] / max(before["peak_mb"], 1e-9) - 1
+                line += f" | {before['peak_mb']:>8.1f}MB -> {stats['peak_mb']:>8.1f}MB {memory_change:>+7.1%}"
+                if memory_change > memory_tolerance and stats["peak_mb"] - before["peak_mb"] > 1:
+                    regressions.append(f"{run['size']} {stage}: {memory_change:+.1%} peak memory")
+                    line += "  MORE MEMORY"
+            print(line)
+    return regressions
+
+
+def print_run(run: Dict[str, Any]) -> None:
+    results = run["results"]
+    print(f"{run['size']}: {results['ppt_numbers']} PPT numbers, {results['excel_numbers']} Excel numbers, "
+          f"{results['matches']} matches, {results['mismatches']} mismatches, {results['untraceable']} untraceable")
+    for stage, stats in run["stages"].items():
+        memory = f"  peak {stats['peak_mb']:.1f}MB" if "peak_mb" in stats else ""
+        print(f"  {stage:<20} {stats['seconds']:>9.3f}s{memory}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default", help="Sizes to run")
+    parser.add_argument("--size", action="append", help="SLIDESxCELLS, such as 100x100000; replaces the preset")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic files")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage; the median is kept")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory runs")
+    parser.add_argument("--xls", action="store_true", help="Also benchmark .xls parsing (needs xlwt)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "deck_audit_bench"),
+                        help="Where synthetic files are generated and reused")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per stage (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed peak memory growth per stage")
+    args = parser.parse_args(argv)
+
+    if args.xls and not XLS_AVAILABLE:
+        parser.error("--xls needs xlwt to write .xls workbooks")
+    sizes = [tuple(int(part) for part in size.lower().split("x")) for size in args.size] if args.size \
+        else PRESETS[args.preset]
+
+    runs = []
+    for slides, cells in sizes:
+        run = run_size(slides, cells, args.data_dir, args.seed, args.repeat, not args.no_memory, args.xls)
+        print_run(run)
+        runs.append(run)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count()
+        },
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "runs": runs
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with baseline from {baseline['created_at']} ({baseline['environment']['platform']}):")
+        regressions = compare(runs, baseline, args.tolerance, args.memory_tolerance)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
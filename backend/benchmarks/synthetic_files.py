@@ -0,0 +1,218 @@
+"""Seeded generators for synthetic decks and workbooks of any size.
+
+The workbook holds line items by fiscal year on sheets declaring their units
+in a title row (₹ Crore, USD Million, %, ₹ Lacs), like real models. The deck
+quotes those figures in text boxes ("₹1,234 Cr", "$12.5M", "45.2%",
+"₹3.4 Lac") and in plain-number tables, with a share of misquoted and
+made-up figures so audits see matches, mismatches and untraceable numbers.
+The same seed always produces the same files.
+
+Usage:
+    python benchmarks/synthetic_files.py --slides 100 --cells 100000 --output-dir /tmp/synthetic [--xls] [--seed 0]
+"""
+import argparse
+import math
+import os
+import random
+from typing import List, Optional
+
+from openpyxl import Workbook
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+try:
+    import xlwt
+except ImportError:  # Only needed for .xls workbooks
+    xlwt = None
+
+XLS_AVAILABLE = xlwt is not None
+
+# Sheet kinds: name, unit title row, unit scale, how decks quote the figures, decimals, value range
+SHEET_KINDS = [
+    ("P&L", "All figures in ₹ Crore", 10000000, "₹{:,.0f} Cr", 0, (50, 50000)),
+    ("Segments", "USD Million", 1000000, "${:,.1f}M", 1, (1, 5000)),
+    ("Ratios", "Margins and growth (%)", 1, "{:.1f}%", 1, (0.5, 95)),
+    ("Branches", "₹ in Lacs", 100000, "₹{:,.1f} Lac", 1, (1, 9000)),
+]
+
+LINE_ITEMS = [
+    "Revenue", "Gross profit", "EBITDA", "Operating expenses", "Net profit", "Capital expenditure",
+    "Deposits", "Advances", "Employee cost", "Marketing spend", "Free cash flow", "Working capital",
+]
+
+# Line items are broken down by region and product; labels carry no digits, which would be parsed as numbers
+REGIONS = ["North", "South", "East", "West", "Central", "Coastal", "Metro", "Rural", "Overseas", "Online"]
+PRODUCTS = ["retail", "wholesale", "enterprise", "services", "lending", "payments", "insurance", "wealth"]
+
+SENTENCES = [
+    "{label} for FY{year} came in at {value}, against {other_value} for {other_label}.",
+    "{label} reached {value} in FY{year} while {other_label} stood at {other_value}.",
+    "In FY{year}, {label} was {value} and {other_label} was {other_value}.",
+]
+
+FOOTNOTES = [
+    "Peer benchmark: market capitalisation touched {value} at the close.",
+    "Industry estimate of the addressable opportunity is {value} by the decade end.",
+]
+
+# xlwt's .xls sheets hold at most 65,536 rows
+MAX_ROWS_PER_SHEET = 50000
+
+
+class SyntheticWorkbook:
+    """A model of about ``cells`` numbers, spread over sheets of each kind"""
+
+    def __init__(self, cells: int, seed: int = 0, years: int = 12):
+        rng = random.Random(seed)
+        self.years = list(range(2025 - years + 1, 2026))
+        rows_needed = max(1, math.ceil(cells / years))
+        sheet_count = max(len(SHEET_KINDS), math.ceil(rows_needed / MAX_ROWS_PER_SHEET))
+        self.sheets = []
+        for index in range(sheet_count):
+            name, title, scale, quote_format, decimals, (low, high) = SHEET_KINDS[index % len(SHEET_KINDS)]
+            row_count = rows_needed // sheet_count + (1 if index < rows_needed % sheet_count else 0)
+            rows = [
+                (self._label(row), [round(rng.uniform(low, high), decimals) for _ in self.years])
+                for row in range(row_count)
+            ]
+            sheet_name = name if sheet_count == len(SHEET_KINDS) else f"{name} {index // len(SHEET_KINDS) + 1}"
+            self.sheets.append({"name": sheet_name, "title": title, "scale": scale, "quote_format": quote_format,
+                                "rows": rows})
+        # Figures above this are in no cell, whether read in absolute units or as written
+        self.max_value = max(kind[2] * kind[5][1] for kind in SHEET_KINDS)
+
+    def _label(self, row: int) -> str:
+        item = LINE_ITEMS[row % len(LINE_ITEMS)]
+        region = REGIONS[row // len(LINE_ITEMS) % len(REGIONS)]
+        product = PRODUCTS[row // (len(LINE_ITEMS) * len(REGIONS)) % len(PRODUCTS)]
+        return f"{item} - {region} {product}"
+
+    @property
+    def cells(self) -> int:
+        return sum(len(sheet["rows"]) for sheet in self.sheets) * len(self.years)
+
+    def sheet_rows(self, sheet: dict) -> List[list]:
+        """The sheet as written: unit title, year header, then one row per line item"""
+        return [
+            [sheet["title"]],
+            ["Line item", *(f"FY{year}" for year in self.years)],
+            *([label, *values] for label, values in sheet["rows"])
+        ]
+
+    def write_xlsx(self, path: str) -> str:
+        # Write-only mode streams rows to disk, so million-cell models stay cheap to generate
+        wb = Workbook(write_only=True)
+        for sheet in self.sheets:
+            ws = wb.create_sheet(sheet["name"])
+            for row in self.sheet_rows(sheet):
+                ws.append(row)
+        wb.save(path)
+        return path
+
+    def write_xls(self, path: str) -> str:
+        if xlwt is None:
+            raise Exception("Writing .xls workbooks requires xlwt")
+        wb = xlwt.Workbook()
+        for sheet in self.sheets:
+            ws = wb.add_sheet(sheet["name"])
+            for row_index, row in enumerate(self.sheet_rows(sheet)):
+                for column_index, value in enumerate(row):
+                    ws.write(row_index, column_index, value)
+        wb.save(path)
+        return path
+
+
+def write_deck(workbook: SyntheticWorkbook, path: str, slides: int, seed: int = 0,
+               mismatch_rate: float = 0.1, footnote_rate: float = 0.2) -> str:
+    """Write a deck quoting figures from the workbook, two text boxes and a table per slide.
+
+    ``mismatch_rate`` of the quoted figures are wrong, and ``footnote_rate`` of
+    the slides add a figure found nowhere in the model.
+    """
+    rng = random.Random(seed)
+    prs = Presentation()
+    layout = prs.slide_layouts[5]  # Title only
+
+    def out_of_model(sheet):
+        # Near misses would still be within the matcher's tolerance of some other cell
+        return workbook.max_value * rng.uniform(2, 9) / sheet["scale"]
+
+    def quote(sheet, value):
+        # Some figures are misquoted; their labels still lead to the right rows
+        if rng.random() < mismatch_rate:
+            value = out_of_model(sheet)
+        return sheet["quote_format"].format(value)
+
+    for slide_index in range(slides):
+        sheet = workbook.sheets[slide_index % len(workbook.sheets)]
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"{sheet['name']} review"
+
+        for box in range(2):
+            (label, values), (other_label, other_values) = rng.choice(sheet["rows"]), rng.choice(sheet["rows"])
+            year_index = rng.randrange(len(workbook.years))
+            text = rng.choice(SENTENCES).format(
+                label=label, year=workbook.years[year_index], value=quote(sheet, values[year_index]),
+                other_label=other_label, other_value=quote(sheet, other_values[year_index])
+            )
+            textbox = slide.shapes.add_textbox(Inches(0.5), Inches(1.5 + box * 0.9), Inches(9), Inches(0.8))
+            textbox.text_frame.word_wrap = True
+            textbox.text_frame.text = text
+            textbox.text_frame.paragraphs[0].font.size = Pt(14)
+
+        # Some slides carry a footnote figure that has nothing to do with the model
+        if rng.random() < footnote_rate:
+            textbox = slide.shapes.add_textbox(Inches(0.5), Inches(6.5), Inches(9), Inches(0.5))
+            textbox.text_frame.text = rng.choice(FOOTNOTES).format(value=sheet["quote_format"].format(out_of_model(sheet)))
+
+        # Tables quote the model's own units, as plain numbers
+        rows = rng.sample(sheet["rows"], min(4, len(sheet["rows"])))
+        year_indexes = sorted(rng.sample(range(len(workbook.years)), 3))
+        table = slide.shapes.add_table(len(rows) + 1, 4, Inches(0.5), Inches(3.5), Inches(9), Inches(2.5)).table
+        table.cell(0, 0).text = "Line item"
+        for column, year_index in enumerate(year_indexes, start=1):
+            table.cell(0, column).text = f"FY{workbook.years[year_index]}"
+        for row, (label, values) in enumerate(rows, start=1):
+            table.cell(row, 0).text = label
+            for column, year_index in enumerate(year_indexes, start=1):
+                value = out_of_model(sheet) if rng.random() < mismatch_rate else values[year_index]
+                table.cell(row, column).text = f"{value:,.1f}"
+
+    prs.save(path)
+    return path
+
+
+def generate(output_dir: str, slides: int, cells: int, seed: int = 0, xls: bool = False) -> dict:
+    """Write a deck and its workbook(s) for one size, reusing files already generated with the same seed"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "deck": os.path.join(output_dir, f"deck_{slides}_slides_{cells}_cells_seed{seed}.pptx"),
+        "xlsx": os.path.join(output_dir, f"model_{cells}_cells_seed{seed}.xlsx"),
+    }
+    if xls:
+        paths["xls"] = os.path.join(output_dir, f"model_{cells}_cells_seed{seed}.xls")
+
+    workbook: Optional[SyntheticWorkbook] = None
+    for kind, path in paths.items():
+        if os.path.exists(path):
+            continue
+        workbook = workbook or SyntheticWorkbook(cells, seed)
+        if kind == "deck":
+            write_deck(workbook, path, slides, seed)
+        elif kind == "xlsx":
+            workbook.write_xlsx(path)
+        else:
+            workbook.write_xls(path)
+        print(f"Generated {path}")
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=100, help="Slides in the deck")
+    parser.add_argument("--cells", type=int, default=100000, help="Numeric cells in the workbook")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--xls", action="store_true", help="Also write the workbook as .xls (needs xlwt)")
+    args = parser.parse_args()
+    generate(args.output_dir, args.slides, args.cells, args.seed, args.xls)
@@ -0,0 +1,42 @@
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+
+class ContextIndex:
+    """Inverted token index over normalized Excel contexts for candidate blocking"""
+
+    def __init__(self, contexts: Sequence[str], max_candidates: Optional[int] = 500):
+        self.max_candidates = max_candidates
+        self.size = len(contexts)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        for position, context in enumerate(contexts):
+            for token in set(context.split()):
+                self.postings[token].append(position)
+
+    def candidates(self, context: str) -> List[int]:
+        """Return positions of contexts sharing at least one token with the given context.
+
+        When more than ``max_candidates`` contexts qualify, the ones sharing
+        the most tokens are kept, each token weighted by its rarity (IDF), so
+        a context sharing one rare label is not crowded out by many contexts
+        sharing common words. Positions are returned in original order so the
+        scoring loop breaks ties exactly like an exhaustive scan.
+        """
+        shared_weights: Dict[int, float] = defaultdict(float)
+        for token in set(context.split()):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            weight = math.log(self.size / len(postings)) + 1  # A token in every context still counts once
+            for position in postings:
+                shared_weights[position] += weight
+
+        positions = list(shared_weights)
+        if self.max_candidates is not None and len(positions) > self.max_candidates:
+            positions.sort(key=lambda position: (-shared_weights[position], position))
+            positions = positions[:self.max_candidates]
+
+        positions.sort()
+        return positions
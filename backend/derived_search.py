@@ -0,0 +1,147 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from number_table import NumberTable
+from value_index import ValueIndex
+
+# Derivation kinds; percentages are only compared against growth rates and ratios
+DIFFERENCE, GROWTH, RATIO, SUM = range(4)
+KIND_NAMES = ("difference", "growth", "ratio", "sum")
+PERCENT_KINDS = (GROWTH, RATIO)
+
+
+class DerivedIndex:
+    """Value index over figures derived from neighbouring cells.
+
+    Each sheet's numbers are laid out along rows and along columns. Adjacent
+    cells give differences and growth rates, nearby cells in the same line
+    give ratios, and contiguous runs give segment sums, all computed with
+    array operations. Derived values are sorted once into a ValueIndex, so a
+    lookup is a binary search rather than a scan.
+
+    Construction stops early once ``deadline`` (a perf_counter timestamp)
+    passes, keeping whatever was derived so far.
+    """
+
+    def __init__(self, numbers: NumberTable, tolerance: float, ratio_window: int = 3, max_segment: int = 4,
+                 max_derived: int = 2000000, deadline: Optional[float] = None):
+        self.numbers = numbers
+        self.ratio_window = ratio_window  # Ratios pair each cell with this many following cells in its line
+        self.max_segment = max_segment  # Longest run of adjacent cells summed
+        self.max_derived = max_derived
+        self.complete = True
+
+        parts = []
+        derived_count = 0
+        for sheet_positions in self._sheet_positions():
+            for axis in (0, 1):
+                if deadline is not None and time.perf_counter() > deadline or derived_count >= self.max_derived:
+                    self.complete = False
+                    break
+                for part in self._derive_along(sheet_positions, axis):
+                    parts.append(part)
+                    derived_count += len(part[0])
+
+        if parts:
+            values, kinds, first, second = (np.concatenate(column) for column in zip(*parts))
+        else:
+            values, kinds, first, second = (np.empty(0, dtype=dtype) for dtype in (np.float64, np.int8, np.int32, np.int32))
+        keep = np.isfinite(values) & (values != 0)
+        self.values = values[keep][:self.max_derived]
+        self.kinds = kinds[keep][:self.max_derived]
+        self.first = first[keep][:self.max_derived]  # Position of the earlier (or denominator) cell
+        self.second = second[keep][:self.max_derived]  # Position of the later (or numerator, or run end) cell
+        self.value_index = ValueIndex(self.values, tolerance)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _sheet_positions(self) -> List[np.ndarray]:
+        """Positions of each sheet's plain numeric cells (text cells are skipped)"""
+        numbers = self.numbers
+        plain = np.nonzero(numbers.original_text < 0)[0]
+        keys = numbers.file[plain].astype(np.int64) << 32 | numbers.sheet[plain].astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        plain, keys = plain[order], keys[order]
+        boundaries = np.nonzero(np.diff(keys))[0] + 1
+        return [positions for positions in np.split(plain, boundaries) if len(positions)]
+
+    def _derive_along(self, positions: np.ndarray, axis: int):
+        """Yield (values, kinds, first, second) arrays for one sheet along rows (axis 0) or columns (axis 1)"""
+        numbers = self.numbers
+        line = (numbers.row if axis == 0 else numbers.column)[positions].astype(np.int64)
+        offset = (numbers.column if axis == 0 else numbers.row)[positions].astype(np.int64)
+        order = np.lexsort((offset, line))
+        positions, line, offset = positions[order], line[order], offset[order]
+        values = numbers.value[positions]
+        if len(positions) < 2:
+            return
+
+        # Differences and growth rates between cells next to each other
+        adjacent = (line[1:] == line[:-1]) & (offset[1:] == offset[:-1] + 1)
+        earlier, later = positions[:-1][adjacent], positions[1:][adjacent]
+        before, after = values[:-1][adjacent], values[1:][adjacent]
+        yield after - before, np.full(len(later), DIFFERENCE, np.int8), earlier, later
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (after - before) / np.abs(before) * 100
+        yield growth, np.full(len(later), GROWTH, np.int8), earlier, later
+
+        # Ratios, as percentages, with the next few cells of the same line in both directions
+        for step in range(1, self.ratio_window + 1):
+            same_line = line[step:] == line[:-step]
+            a, b = positions[:-step][same_line], positions[step:][same_line]
+            value_a, value_b = values[:-step][same_line], values[step:][same_line]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                yield value_a / value_b * 100, np.full(len(a), RATIO, np.int8), b, a
+                yield value_b / value_a * 100, np.full(len(a), RATIO, np.int8), a, b
+
+        # Sums of runs of adjacent cells, from prefix sums within each contiguous run
+        run_starts = np.concatenate(([True], ~adjacent))
+        run_id = np.cumsum(run_starts)
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        for length in range(2, self.max_segment + 1):
+            end = np.arange(length - 1, len(positions))
+            start = end - length + 1
+            in_run = run_id[start] == run_id[end]
+            start, end = start[in_run], end[in_run]
+            yield prefix[end + 1] - prefix[start], np.full(len(end), SUM, np.int8), positions[start], positions[end]
+
+    def candidates(self, value: float, percentage: bool) -> List[int]:
+        """Return indexes of derived values near ``value`` whose kind fits the PPT number's type"""
+        indexes = self.value_index.candidates(value)
+        kinds = self.kinds[indexes] if indexes else np.empty(0, dtype=np.int8)
+        wanted = np.isin(kinds, PERCENT_KINDS)
+        if not percentage:
+            wanted = ~wanted
+        return [index for index, keep in zip(indexes, wanted.tolist()) if keep]
+
+    def anchor(self, index: int) -> int:
+        """Position of the cell whose context describes a derived value"""
+        return int(self.second[index])
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Describe a derived value with the cells and formula it came from"""
+        numbers = self.numbers
+        kind = int(self.kinds[index])
+        first, second = int(self.first[index]), int(self.second[index])
+        first_cell, second_cell = numbers.cell_reference(first), numbers.cell_reference(second)
+
+        if kind == DIFFERENCE:
+            formula, cells = f"={second_cell}-{first_cell}", [first_cell, second_cell]
+        elif kind == GROWTH:
+            formula, cells = f"=({second_cell}-{first_cell})/ABS({first_cell})*100", [first_cell, second_cell]
+        elif kind == RATIO:
+            formula, cells = f"={second_cell}/{first_cell}*100", [second_cell, first_cell]
+        else:
+            formula, cells = f"=SUM({first_cell}:{second_cell})", [f"{first_cell}:{second_cell}"]
+
+        return {
+            "kind": KIND_NAMES[kind],
+            "value": float(self.values[index]),
+            "sheet_name": numbers.sheet_names[numbers.sheet[second]],
+            "source_file": numbers.file_names[numbers.file[second]] if numbers.file_names else "",
+            "cells": cells,
+            "formula": formula
+        }
@@ -1,132 +1,328 @@
+import numpy as np
 import pandas as pd
 import openpyxl
-from typing import Dict, List, Any
+from concurrent.futures import Executor
+from io import BytesIO
+from typing import BinaryIO, Dict, List, Any, Optional, Sequence, Tuple, Union
+import hashlib
 import re
 import os
+import time
+
+from number_table import NumberTable, NumberTableBuilder
+from formula_graph import FormulaGraphBuilder
+from units import UNIT_SCALES, SheetUnits, detect_unit
+from telemetry import requested_profiler, telemetry, traced_call, traced_result
+
+# Bump when parser output changes so cached results are not reused
+PARSER_VERSION = "5"
+
+# A workbook to parse: a path, its bytes, or a seekable binary file object
+WorkbookSource = Union[str, bytes, BinaryIO]
 
 class ExcelParser:
-    def __init__(self):
-        self.supported_extensions = ['.xlsx', '.xls', '.xlsm']
+    def __init__(self, streaming: bool = True, sheet_split_bytes: int = 20 * 1024 * 1024, unit_header_rows: int = 10):
+        self.supported_extensions = ['.xlsx', '.xls', '.xlsm', '.csv', '.tsv']
+        self.streaming = streaming  # Read .xlsx/.xlsm row by row in openpyxl read-only mode
+        self.sheet_split_bytes = sheet_split_bytes  # Parse .xlsx/.xlsm files this large one job per sheet
+        self.unit_header_rows = unit_header_rows  # Rows searched for a sheet-wide unit such as "All figures in ₹ Lacs"
+    
+    def parse_workbooks(self, sources: List[WorkbookSource], executor: Optional[Executor] = None,
+                        filenames: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Parse several workbooks, fanning out over an executor by file and, for large files, by sheet.
+        
+        Sources other than paths need their ``filenames``. With a process
+        pool, pass paths or bytes; file objects cannot be sent to workers.
+        """
+        filenames = filenames or [self._source_name(source) for source in sources]
+        if executor is None:
+            return {
+                filename: self.parse_workbook(source, filename=filename)
+                for source, filename in zip(sources, filenames)
+            }
+        
+        # Each workbook maps to one job for the whole file or one job per sheet. Workers send
+        # back the spans they recorded, and their profiles when the request is profiled.
+        profiler = requested_profiler()
+        jobs = []
+        for source, filename in zip(sources, filenames):
+            sheet_names = self._split_sheet_names(source, filename)
+            if sheet_names:
+                futures = [
+                    executor.submit(traced_call, self.parse_workbook, source, [name], filename, profiler=profiler)
+                    for name in sheet_names
+                ]
+            else:
+                futures = [executor.submit(traced_call, self.parse_workbook, source, None, filename, profiler=profiler)]
+            jobs.append((filename, futures))
+        
+        excel_data = {}
+        for filename, futures in jobs:
+            sheets_data = {}
+            tables = []
+            for future in futures:
+                part = traced_result(future.result())
+                sheets_data.update(part["sheets"])
+                tables.append(part["numbers"])
+            numbers = tables[0] if len(tables) == 1 else NumberTable.concat(tables)
+            excel_data[filename] = self._build_workbook_result(filename, sheets_data, numbers)
+        
+        return excel_data
+    
+    def _split_sheet_names(self, source: WorkbookSource, filename: str) -> Optional[List[str]]:
+        """Return the sheet names of a workbook large enough to parse sheet by sheet"""
+        file_extension = os.path.splitext(filename)[1].lower()
+        if file_extension not in ('.xlsx', '.xlsm') or self._source_size(source) < self.sheet_split_bytes:
+            return None
         
-    def parse_workbook(self, excel_path: str) -> Dict[str, Any]:
-        """Parse Excel workbook and extract all data"""
+        # Read-only loading only reads the workbook index, not the sheets
+        wb = openpyxl.load_workbook(self._open_source(source), read_only=True)
         try:
-            file_extension = os.path.splitext(excel_path)[1].lower()
+            sheet_names = wb.sheetnames
+        finally:
+            wb.close()
+        
+        return sheet_names if len(sheet_names) > 1 else None
+        
+    def parse_workbook(self, source: WorkbookSource, sheet_names: Optional[List[str]] = None,
+                       filename: Optional[str] = None) -> Dict[str, Any]:
+        """Parse Excel workbook and extract all data, optionally limited to some sheets.
+        
+        ``source`` is a path, or the workbook's bytes or file object along with its ``filename``.
+        """
+        filename = filename or self._source_name(source)
+        start = time.perf_counter()
+        try:
+            file_extension = os.path.splitext(filename)[1].lower()
             if file_extension not in self.supported_extensions:
                 raise ValueError(f"Unsupported file format: {file_extension}")
             
-            # Read all sheets
+            # Read all sheets; every sheet's numbers go into one columnar table
             sheets_data = {}
+            builder = NumberTableBuilder(filename)
+            workbook = self._open_source(source)
             
             if file_extension == '.xlsx' or file_extension == '.xlsm':
-                wb = openpyxl.load_workbook(excel_path, data_only=True)
+                wb = openpyxl.load_workbook(workbook, data_only=True, read_only=self.streaming)
                 
-                for sheet_name in wb.sheetnames:
-                    sheet = wb[sheet_name]
-                    sheet_data = self._parse_sheet_openpyxl(sheet, sheet_name)
-                    if sheet_data["numbers"]:  # Only include sheets with numbers
-                        sheets_data[sheet_name] = sheet_data
+                try:
+                    for sheet_name in sheet_names or wb.sheetnames:
+                        with telemetry.span("excel.sheet", file=filename, sheet=sheet_name):
+                            sheet = wb[sheet_name]
+                            sheet_data = self._parse_sheet_openpyxl(sheet, sheet_name, builder)
+                        if sheet_data["total_numbers"]:  # Only include sheets with numbers
+                            sheets_data[sheet_name] = sheet_data
+                finally:
+                    wb.close()
                         
+            elif file_extension == '.csv' or file_extension == '.tsv':
+                # A delimited file is a single sheet named after the file
+                sheet_name = os.path.splitext(filename)[0]
+                with telemetry.span("excel.sheet", file=filename, sheet=sheet_name):
+                    df = self._read_delimited(workbook, '\t' if file_extension == '.tsv' else ',')
+                    sheet_data = self._parse_sheet_pandas(df, sheet_name, builder)
+                if sheet_data["total_numbers"]:
+                    sheets_data[sheet_name] = sheet_data
+            
             else:  # .xls files
-                xl_file = pd.ExcelFile(excel_path)
-                for sheet_name in xl_file.sheet_names:
-                    df = pd.read_excel(excel_path, sheet_name=sheet_name, header=None)
-                    sheet_data = self._parse_sheet_pandas(df, sheet_name)
-                    if sheet_data["numbers"]:
-                        sheets_data[sheet_name] = sheet_data
+                # One handle for every sheet, so the workbook is only opened once
+                with pd.ExcelFile(workbook) as xl_file:
+                    for sheet_name in sheet_names or xl_file.sheet_names:
+                        with telemetry.span("excel.sheet", file=filename, sheet=sheet_name):
+                            df = xl_file.parse(sheet_name, header=None)
+                            sheet_data = self._parse_sheet_pandas(df, sheet_name, builder)
+                        if sheet_data["total_numbers"]:
+                            sheets_data[sheet_name] = sheet_data
             
-            print(f"Parsed {len(sheets_data)} sheets from {os.path.basename(excel_path)}")
-            return {
-                "filename": os.path.basename(excel_path),
-                "sheets": sheets_data,
-                "total_numbers": sum(len(sheet["numbers"]) for sheet in sheets_data.values())
-            }
+            print(f"Parsed {len(sheets_data)} sheets from {filename}")
+            telemetry.record_span("excel.workbook", time.perf_counter() - start, file=filename, sheets=len(sheets_data))
+            return self._build_workbook_result(filename, sheets_data, builder.build())
             
         except Exception as e:
-            print(f"Error parsing Excel file {excel_path}: {str(e)}")
+            print(f"Error parsing Excel file {filename}: {str(e)}")
             raise Exception(f"Failed to parse Excel file: {str(e)}")
     
-    def _parse_sheet_openpyxl(self, sheet, sheet_name: str) -> Dict[str, Any]:
-        """Parse sheet using openpyxl"""
-        numbers = []
+    def parse_formula_graph(self, source: WorkbookSource, filename: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Stream a workbook's formulas into a dependency graph; None if it has no formulas.
         
-        for row in sheet.iter_rows():
-            for cell in row:
-                if cell.value is not None:
-                    cell_info = self._extract_cell_info(cell, sheet_name)
-                    if cell_info:
-                        numbers.append(cell_info)
+        A second read-only pass with data_only=False, since the value pass only
+        sees cached results. Rows are read one at a time and only formula and
+        zero cells are kept, so memory grows with those, not the sheet size.
+        """
+        filename = filename or self._source_name(source)
+        file_extension = os.path.splitext(filename)[1].lower()
+        if file_extension not in ('.xlsx', '.xlsm'):
+            return None  # Formulas are only read from OOXML workbooks
         
+        start = time.perf_counter()
+        try:
+            builder = FormulaGraphBuilder()
+            wb = openpyxl.load_workbook(self._open_source(source), data_only=False, read_only=True)
+            try:
+                for sheet in wb.worksheets:
+                    if hasattr(sheet, "reset_dimensions"):
+                        sheet.reset_dimensions()
+                    previous_row = ()
+                    for row_number, row_values in enumerate(sheet.iter_rows(values_only=True), start=1):
+                        # Array formulas come back as objects holding the formula text
+                        formulas = [getattr(value, "text", value) for value in row_values]
+                        # Labels for context are plain text cells, as the value pass sees them
+                        row_values = [
+                            None if isinstance(formula, str) and formula.startswith("=") else value
+                            for formula, value in zip(formulas, row_values)
+                        ]
+                        for column_number, formula in enumerate(formulas, start=1):
+                            if isinstance(formula, str) and formula.startswith("="):
+                                context = self._get_context_openpyxl(column_number, row_values, previous_row)
+                                builder.add(sheet.title, row_number, column_number, formula, context)
+                            elif formula == 0 and isinstance(formula, (int, float)) and not isinstance(formula, bool):
+                                # The value pass skips zeros, but formulas over them still count them
+                                builder.add_zero(sheet.title, row_number, column_number)
+                        previous_row = row_values
+            finally:
+                wb.close()
+            
+            telemetry.record_span("excel.formulas", time.perf_counter() - start, file=filename,
+                                  formulas=len(builder.formulas))
+            if not builder.formulas:
+                return None
+            print(f"Found {len(builder.formulas)} formulas in {filename}")
+            return builder.build().to_dict()
+            
+        except Exception as e:
+            print(f"Error reading formulas from {filename}: {str(e)}")
+            raise Exception(f"Failed to read Excel formulas: {str(e)}")
+    
+    def _build_workbook_result(self, filename: str, sheets_data: Dict[str, Any], numbers: NumberTable) -> Dict[str, Any]:
+        """Assemble the parsed output for a workbook"""
         return {
-            "sheet_name": sheet_name,
+            "filename": filename,
+            "sheets": sheets_data,
             "numbers": numbers,
-            "max_row": sheet.max_row,
-            "max_column": sheet.max_column
+            "total_numbers": len(numbers)
         }
     
-    def _parse_sheet_pandas(self, df: pd.DataFrame, sheet_name: str) -> Dict[str, Any]:
-        """Parse sheet using pandas"""
-        numbers = []
+    def _source_name(self, source: WorkbookSource) -> str:
+        if not isinstance(source, str):
+            raise ValueError("A filename is required to parse a workbook that is not a path")
+        return os.path.basename(source)
+    
+    def _source_size(self, source: WorkbookSource) -> int:
+        if isinstance(source, str):
+            return os.path.getsize(source)
+        if isinstance(source, bytes):
+            return len(source)
+        return source.seek(0, os.SEEK_END)
+    
+    def _open_source(self, source: WorkbookSource) -> Union[str, BinaryIO]:
+        """Return something the readers accept, rewinding file objects that an earlier pass consumed"""
+        if isinstance(source, bytes):
+            return BytesIO(source)
+        if not isinstance(source, str):
+            source.seek(0)
+        return source
+    
+    def _parse_sheet_openpyxl(self, sheet, sheet_name: str, builder: NumberTableBuilder) -> Dict[str, Any]:
+        """Parse sheet using openpyxl, one row of values at a time, appending its numbers to builder"""
+        start = len(builder)
+        sheet_id = builder.sheet_id(sheet_name)
+        
+        if hasattr(sheet, "reset_dimensions"):
+            # Read-only sheets trust the stored dimensions, which some writers get wrong
+            sheet.reset_dimensions()
+        
+        # Only the previous row is kept, so memory grows with sheet width rather than size
+        previous_row = ()
+        max_row = 0
+        max_column = 0
+        units = SheetUnits(self.unit_header_rows)
+        for row_number, row_values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            units.observe_row(row_number, row_values)
+            for column_number, value in enumerate(row_values, start=1):
+                if value is not None:
+                    cell_value = self._extract_cell_value(value)
+                    if cell_value:
+                        number, original_text = cell_value
+                        # Plain numbers are scaled by the unit their headers declare; texts carry their own
+                        unit = units.unit_for(column_number) if original_text is None else None
+                        if unit is not None and UNIT_SCALES[unit] != 1:
+                            number *= UNIT_SCALES[unit]
+                        else:
+                            unit = None
+                        context = self._get_context_openpyxl(column_number, row_values, previous_row)
+                        builder.add(number, row_number, column_number, sheet_id, context, original_text, unit)
+            
+            previous_row = row_values
+            max_row = row_number
+            max_column = max(max_column, len(row_values))
+        
+        return self._sheet_result(sheet_name, builder, start, max_row, max_column)
+    
+    def _read_delimited(self, source: Union[str, BinaryIO], separator: str) -> pd.DataFrame:
+        """Read a CSV/TSV file into a frame of floats for numeric cells and strings for text"""
+        raw = pd.read_csv(source, sep=separator, header=None, dtype=str, keep_default_na=False)
+        
+        # Drop thousands separators from well-formed numbers such as "1,234.5" before converting
+        unformatted = raw.apply(lambda column: column.str.replace(
+            r'^(-?\d{1,3}(?:,\d{3})+(?:\.\d+)?)$', lambda m: m.group(1).replace(',', ''), regex=True
+        ))
+        numeric = unformatted.apply(pd.to_numeric, errors='coerce')
+        text = raw.where(raw != '')
+        return numeric.astype(object).where(numeric.notna(), text)
+    
+    def _parse_sheet_pandas(self, df: pd.DataFrame, sheet_name: str, builder: NumberTableBuilder) -> Dict[str, Any]:
+        """Parse sheet using pandas with whole-frame masks, appending its numbers to builder"""
+        start = len(builder)
+        sheet_id = builder.sheet_id(sheet_name)
         
-        for row_idx, row in df.iterrows():
-            for col_idx, value in row.items():
-                if pd.notna(value) and isinstance(value, (int, float)):
-                    cell_ref = f"{self._col_num_to_letter(col_idx + 1)}{row_idx + 1}"
-                    
-                    # Get context from nearby cells
-                    context = self._get_context_pandas(df, row_idx, col_idx)
-                    
-                    numbers.append({
-                        "value": float(value),
-                        "cell_reference": cell_ref,
-                        "row": row_idx + 1,
-                        "column": col_idx + 1,
-                        "sheet_name": sheet_name,
-                        "context": context,
-                        "data_type": "number"
-                    })
+        rows, columns = np.nonzero(self._numeric_mask(df))
+        if len(rows):
+            values = df.to_numpy(dtype=object)[rows, columns].astype(np.float64)
+            text = self._text_cells(df)
+            units = self._get_units_pandas(df, text, rows, columns)
+            scales = np.array([UNIT_SCALES[unit] if unit is not None else 1 for unit in units], dtype=np.float64)
+            units = [unit if scale != 1 else None for unit, scale in zip(units, scales)]
+            builder.add_many(values * scales, rows + 1, columns + 1, sheet_id,
+                             self._get_contexts_pandas(text, rows, columns), units)
         
+        return self._sheet_result(sheet_name, builder, start, len(df), len(df.columns))
+    
+    def _numeric_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Return a boolean array marking the cells that hold numbers"""
+        mask = np.zeros(df.shape, dtype=bool)
+        for col_idx in range(df.shape[1]):
+            column = df.iloc[:, col_idx]
+            if pd.api.types.is_numeric_dtype(column.dtype):
+                mask[:, col_idx] = column.notna().to_numpy()
+            elif pd.api.types.is_object_dtype(column.dtype):
+                mask[:, col_idx] = column.map(
+                    lambda value: isinstance(value, (int, float, np.number)) and not pd.isna(value)
+                ).to_numpy(dtype=bool)
+        return mask
+    
+    def _sheet_result(self, sheet_name: str, builder: NumberTableBuilder, start: int,
+                      max_row: int, max_column: int) -> Dict[str, Any]:
+        """Summarize a parsed sheet whose numbers were appended to builder from start on"""
         return {
             "sheet_name": sheet_name,
-            "numbers": numbers,
-            "max_row": len(df),
-            "max_column": len(df.columns)
+            "total_numbers": len(builder) - start,
+            "max_row": max_row,
+            "max_column": max_column,
+            # Lets re-uploads tell which sheets changed
+            "fingerprint": hashlib.sha256(builder.fingerprint_since(start)).hexdigest()
         }
     
-    def _extract_cell_info(self, cell, sheet_name: str) -> Dict[str, Any]:
-        """Extract information from a cell"""
+    def _extract_cell_value(self, value) -> Optional[Tuple[float, Optional[str]]]:
+        """Return a cell's number and, for text cells, the original text; None if it holds no number"""
         try:
-            value = cell.value
-            
             if isinstance(value, (int, float)) and value != 0:
-                # Get nearby cell values for context
-                context = self._get_context_openpyxl(cell)
-                
-                return {
-                    "value": float(value),
-                    "cell_reference": cell.coordinate,
-                    "row": cell.row,
-                    "column": cell.column,
-                    "sheet_name": sheet_name,
-                    "context": context,
-                    "data_type": "number"
-                }
+                return float(value), None
             
             elif isinstance(value, str) and value.strip():
                 # Check if string contains numbers
                 numbers_in_text = self._extract_numbers_from_text(value)
                 if numbers_in_text:
-                    context = self._get_context_openpyxl(cell)
-                    return {
-                        "value": numbers_in_text[0],  # Take first number found
-                        "cell_reference": cell.coordinate,
-                        "row": cell.row,
-                        "column": cell.column,
-                        "sheet_name": sheet_name,
-                        "context": context,
-                        "data_type": "text_with_number",
-                        "original_text": value
-                    }
+                    return numbers_in_text[0], value  # Take first number found
             
             return None
             
@@ -134,48 +330,91 @@ class ExcelParser:
             print(f"Error extracting cell info: {str(e)}")
             return None
     
-    def _get_context_openpyxl(self, cell) -> str:
-        """Get context from nearby cells (headers, labels)"""
+    def _get_context_openpyxl(self, column: int, row_values: Sequence, previous_row: Sequence) -> str:
+        """Get context from nearby cells (headers, labels) in the current and previous row"""
         context_parts = []
-        sheet = cell.parent
         
         # Check cell to the left (potential row header)
-        if cell.column > 1:
-            left_cell = sheet.cell(row=cell.row, column=cell.column - 1)
-            if left_cell.value and isinstance(left_cell.value, str):
-                context_parts.append(left_cell.value.strip())
+        if column > 1:
+            left_value = row_values[column - 2]
+            if left_value and isinstance(left_value, str):
+                context_parts.append(left_value.strip())
         
         # Check cell above (potential column header)
-        if cell.row > 1:
-            above_cell = sheet.cell(row=cell.row - 1, column=cell.column)
-            if above_cell.value and isinstance(above_cell.value, str):
-                context_parts.append(above_cell.value.strip())
+        if column <= len(previous_row):
+            above_value = previous_row[column - 1]
+            if above_value and isinstance(above_value, str):
+                context_parts.append(above_value.strip())
         
         # Check top-left for potential section header
-        if cell.row > 1 and cell.column > 1:
-            topleft_cell = sheet.cell(row=cell.row - 1, column=cell.column - 1)
-            if topleft_cell.value and isinstance(topleft_cell.value, str):
-                context_parts.append(topleft_cell.value.strip())
+        if 1 < column <= len(previous_row) + 1:
+            topleft_value = previous_row[column - 2]
+            if topleft_value and isinstance(topleft_value, str):
+                context_parts.append(topleft_value.strip())
         
         return " | ".join(context_parts) if context_parts else ""
     
-    def _get_context_pandas(self, df: pd.DataFrame, row_idx: int, col_idx: int) -> str:
-        """Get context from nearby cells using pandas"""
-        context_parts = []
+    def _is_text_column(self, column: pd.Series) -> bool:
+        """Whether a column can hold strings, i.e. has an object or string dtype"""
+        return pd.api.types.is_object_dtype(column.dtype) or pd.api.types.is_string_dtype(column.dtype)
+    
+    def _text_cells(self, df: pd.DataFrame) -> np.ndarray:
+        """Return the stripped text of string cells, None elsewhere"""
+        text = df.apply(
+            # Object columns may hold only numbers, as in CSVs, where the .str accessor raises
+            lambda column: column.map(lambda value: value.strip() if isinstance(value, str) else None)
+            if self._is_text_column(column)
+            else pd.Series(None, index=column.index, dtype=object)
+        ).to_numpy(dtype=object)
+        return np.where(pd.isna(text), None, text)
+    
+    def _get_units_pandas(self, df: pd.DataFrame, text: np.ndarray, rows: np.ndarray,
+                          columns: np.ndarray) -> List[Optional[str]]:
+        """Get the unit of the given cells, following the same rules as SheetUnits on a whole frame"""
+        unique_texts = pd.unique(text[text != None])  # noqa: E711 - elementwise comparison
+        unit_of = {value: detect_unit(value) for value in unique_texts}
+        labels = pd.DataFrame(np.vectorize(lambda value: unit_of.get(value), otypes=[object])(text))
+        if labels.isna().all(axis=None):
+            return [None] * len(rows)
         
-        # Check cell to the left
-        if col_idx > 0:
-            left_value = df.iloc[row_idx, col_idx - 1]
-            if pd.notna(left_value) and isinstance(left_value, str):
-                context_parts.append(str(left_value).strip())
+        # A unit in a row's only non-empty cell near the top applies to the rest of the sheet
+        filled = df.notna().to_numpy().sum(axis=1) - (text == "").sum(axis=1)
+        title_rows = (labels.notna().sum(axis=1) == 1).to_numpy() & (filled == 1) & \
+            (labels.index < self.unit_header_rows)
+        sheet_units = labels[title_rows].bfill(axis=1).iloc[:, 0].reindex(labels.index).ffill()
+        labels.loc[title_rows] = None
         
-        # Check cell above
-        if row_idx > 0:
-            above_value = df.iloc[row_idx - 1, col_idx]
-            if pd.notna(above_value) and isinstance(above_value, str):
-                context_parts.append(str(above_value).strip())
+        # Text without a unit in a header row (one without numbers) ends the unit above it in its column
+        header_rows = ~np.isin(np.arange(len(labels)), rows) & ~title_rows
+        block_starts = header_rows[:, None] & (text != None) & (text != "") & labels.isna().to_numpy()  # noqa: E711
         
-        return " | ".join(context_parts) if context_parts else ""
+        # Other labels apply down their column and right along their row; the row's label wins
+        column_units = labels.mask(block_starts, "").ffill(axis=0).to_numpy(dtype=object)[rows, columns]
+        row_units = labels.ffill(axis=1).to_numpy(dtype=object)[rows, columns]
+        sheet_units = sheet_units.to_numpy(dtype=object)[rows]
+        return [
+            row_unit if not pd.isna(row_unit) else column_unit if not pd.isna(column_unit) and column_unit
+            else sheet_unit if not pd.isna(sheet_unit) else None
+            for row_unit, column_unit, sheet_unit in zip(row_units, column_units, sheet_units)
+        ]
+    
+    def _get_contexts_pandas(self, text: np.ndarray, rows: np.ndarray, columns: np.ndarray) -> List[str]:
+        """Get context for the given cells from the string cells to their left and above"""
+        left = np.full(len(rows), None, dtype=object)
+        has_left = columns > 0
+        left[has_left] = text[rows[has_left], columns[has_left] - 1]
+        
+        above = np.full(len(rows), None, dtype=object)
+        has_above = rows > 0
+        above[has_above] = text[rows[has_above] - 1, columns[has_above]]
+        
+        return [
+            f"{left_text} | {above_text}" if left_text is not None and above_text is not None
+            else left_text if left_text is not None
+            else above_text if above_text is not None
+            else ""
+            for left_text, above_text in zip(left, above)
+        ]
     
     def _extract_numbers_from_text(self, text: str) -> List[float]:
         """Extract numbers from text string"""
@@ -192,12 +431,3 @@ class ExcelParser:
                 continue
         
         return numbers
-    
-    def _col_num_to_letter(self, col_num: int) -> str:
-        """Convert column number to Excel letter format"""
-        result = ""
-        while col_num > 0:
-            col_num -= 1
-            result = chr(col_num % 26 + ord('A')) + result
-            col_num //= 26
-        return result
\ No newline at end of file
@@ -0,0 +1,462 @@
+import math
+import operator
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from openpyxl.formula import Tokenizer
+from openpyxl.formula.tokenizer import Token
+from openpyxl.utils.cell import range_boundaries
+
+from number_table import NumberTable, NumberTableBuilder, col_num_to_letter
+
+# Bump when graph output changes so cached graphs are not reused
+GRAPH_VERSION = "2"
+
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+
+# Bit offsets of the packed cell keys; rows need 21 bits as MAX_ROW is 2**20
+ROW_SHIFT = 21
+SHEET_SHIFT = 42
+COLUMN_MASK = (1 << ROW_SHIFT) - 1
+
+# Functions the evaluator can compute for formula cells without a cached value
+FUNCTIONS = {
+    "SUM": lambda *args: math.fsum(_flatten(args)),
+    "AVERAGE": lambda *args: math.fsum(_flatten(args)) / len(_flatten(args)),
+    "MIN": lambda *args: min(_flatten(args), default=0.0),
+    "MAX": lambda *args: max(_flatten(args), default=0.0),
+    "COUNT": lambda *args: float(len(_flatten(args))),
+    "ABS": abs,
+    "ROUND": lambda value, digits=0: _round_half_up(value, int(digits)),
+}
+
+# Infix operators by Excel precedence, all left-associative: 2^3^2 is (2^3)^2
+INFIX_OPERATORS = {
+    "+": (1, operator.add),
+    "-": (1, operator.sub),
+    "*": (2, operator.mul),
+    "/": (2, operator.truediv),
+    "^": (3, operator.pow),
+}
+
+
+def _flatten(args: Sequence) -> List[float]:
+    values = []
+    for arg in args:
+        if isinstance(arg, list):
+            values.extend(arg)
+        else:
+            values.append(arg)
+    return values
+
+
+def _round_half_up(value: float, digits: int) -> float:
+    """Round as Excel does: halves away from zero, on the decimal digits shown rather than the binary float"""
+    return float(Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def cell_keys(sheet: np.ndarray, row: np.ndarray, column: np.ndarray) -> np.ndarray:
+    """Pack (sheet, row, column) into sortable int64 keys"""
+    return (sheet.astype(np.int64) << SHEET_SHIFT) | (row.astype(np.int64) << ROW_SHIFT) | column.astype(np.int64)
+
+
+def cell_key(sheet: int, row: int, column: int) -> int:
+    return (sheet << SHEET_SHIFT) | (row << ROW_SHIFT) | column
+
+
+def split_reference(reference: str, default_sheet: str) -> Optional[Tuple[str, int, int, int, int]]:
+    """Resolve a formula operand to (sheet, min_row, min_col, max_row, max_col), or None if it is not a range"""
+    sheet_name = default_sheet
+    if "!" in reference:
+        sheet_name, reference = reference.rsplit("!", 1)
+        if sheet_name.startswith("'"):
+            sheet_name = sheet_name[1:-1].replace("''", "'")
+        if sheet_name.startswith("["):
+            return None  # External workbook
+    try:
+        min_col, min_row, max_col, max_row = range_boundaries(reference.replace("$", ""))
+    except (ValueError, TypeError):
+        return None  # Defined names, structured references and errors
+    # Whole-row and whole-column references leave one side open
+    return sheet_name, min_row or 1, min_col or 1, max_row or MAX_ROW, max_col or MAX_COLUMN
+
+
+class FormulaGraph:
+    """Formula cells of a workbook with their precedent ranges.
+
+    Cells are kept sorted by a packed (sheet, row, column) key, so a cell's
+    formula is found with a binary search. Precedents are stored as ranges
+    rather than expanded cells, in one flat array sliced by per-cell offsets.
+    The keys of numeric cells holding zero are kept too, as the value pass
+    skips them but aggregates such as AVERAGE, COUNT and MIN count them.
+    """
+
+    def __init__(self, sheet_names: List[str], sheet: np.ndarray, row: np.ndarray, column: np.ndarray,
+                 formulas: List[str], contexts: List[str], offsets: np.ndarray, ranges: np.ndarray,
+                 zero_keys: Optional[np.ndarray] = None):
+        self.sheet_names = sheet_names
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+        self.formulas = formulas
+        self.contexts = contexts
+        self.offsets = offsets  # Precedents of cell i are ranges[offsets[i]:offsets[i + 1]]
+        self.ranges = ranges  # (sheet, min_row, min_col, max_row, max_col) per precedent range
+        self.keys = cell_keys(sheet, row, column)
+        self.zero_keys = zero_keys if zero_keys is not None else np.empty(0, dtype=np.int64)  # Sorted
+        self._sheet_ids = {name: i for i, name in enumerate(sheet_names)}
+
+    def __len__(self) -> int:
+        return len(self.formulas)
+
+    def find(self, sheet_name: str, row: int, column: int) -> Optional[int]:
+        """Return the index of a formula cell, or None if the cell holds no formula"""
+        sheet_id = self._sheet_ids.get(sheet_name)
+        if sheet_id is None:
+            return None
+        key = cell_key(sheet_id, row, column)
+        index = int(np.searchsorted(self.keys, key))
+        return index if index < len(self.keys) and self.keys[index] == key else None
+
+    def cells_in_range(self, sheet_id: int, min_row: int, min_col: int, max_row: int, max_col: int) -> np.ndarray:
+        """Return indexes of the formula cells inside a range"""
+        start = np.searchsorted(self.keys, cell_key(sheet_id, min_row, 0))
+        end = np.searchsorted(self.keys, cell_key(sheet_id, max_row, MAX_COLUMN), side="right")
+        columns = self.column[start:end]
+        return start + np.nonzero((columns >= min_col) & (columns <= max_col))[0]
+
+    def format_range(self, sheet_id: int, min_row: int, min_col: int, max_row: int, max_col: int) -> str:
+        reference = f"{col_num_to_letter(min_col)}{min_row}"
+        if (min_row, min_col) != (max_row, max_col):
+            reference += f":{col_num_to_letter(max_col)}{max_row}"
+        return f"{self.sheet_names[sheet_id]}!{reference}"
+
+    def lineage(self, sheet_name: str, row: int, column: int, max_depth: int = 3,
+                max_cells: int = 25) -> List[Dict[str, Any]]:
+        """Walk a cell's precedents breadth first, returning each formula cell reached with its inputs"""
+        index = self.find(sheet_name, row, column)
+        if index is None:
+            return []
+
+        lineage = []
+        seen = {index}
+        frontier = [index]
+        for depth in range(max_depth):
+            next_frontier = []
+            for index in frontier:
+                ranges = self.ranges[self.offsets[index]:self.offsets[index + 1]]
+                lineage.append({
+                    "cell": self.format_range(int(self.sheet[index]), int(self.row[index]), int(self.column[index]),
+                                              int(self.row[index]), int(self.column[index])),
+                    "formula": self.formulas[index],
+                    "precedents": [self.format_range(*map(int, bounds)) for bounds in ranges],
+                    "depth": depth
+                })
+                if len(lineage) >= max_cells:
+                    return lineage
+                for bounds in ranges:
+                    for precedent in self.cells_in_range(*map(int, bounds)).tolist():
+                        if precedent not in seen:
+                            seen.add(precedent)
+                            next_frontier.append(precedent)
+            frontier = next_frontier
+            if not frontier:
+                break
+        return lineage
+
+    def derived_numbers(self, numbers: NumberTable, max_formulas: int = 20000) -> NumberTable:
+        """Evaluate formula cells that have no cached value in ``numbers``.
+
+        Workbooks written by scripts or some exporters store formulas without
+        their computed results, so the value pass never sees those figures.
+        Simple arithmetic and aggregate formulas are computed here from the
+        parsed cell values; anything else is skipped.
+        """
+        evaluator = FormulaEvaluator(self, numbers)
+        builder = NumberTableBuilder()
+        missing = np.nonzero(~np.isin(self.keys, evaluator.number_keys))[0][:max_formulas]
+        for index in missing.tolist():
+            value = evaluator.value_of_formula(index)
+            if value is not None and value != 0:
+                builder.add(value, int(self.row[index]), int(self.column[index]),
+                            builder.sheet_id(self.sheet_names[self.sheet[index]]), self.contexts[index])
+        return builder.build()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to plain types, with each array stored as a bytes buffer"""
+        return {
+            "sheet_names": self.sheet_names,
+            "sheet": self.sheet.astype("<i4").tobytes(),
+            "row": self.row.astype("<i4").tobytes(),
+            "column": self.column.astype("<i4").tobytes(),
+            "formulas": self.formulas,
+            "contexts": self.contexts,
+            "offsets": self.offsets.astype("<i4").tobytes(),
+            "ranges": self.ranges.astype("<i4").tobytes(),
+            "zero_keys": self.zero_keys.astype("<i8").tobytes()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FormulaGraph":
+        return cls(
+            sheet_names=list(data["sheet_names"]),
+            sheet=np.frombuffer(data["sheet"], dtype="<i4"),
+            row=np.frombuffer(data["row"], dtype="<i4"),
+            column=np.frombuffer(data["column"], dtype="<i4"),
+            formulas=list(data["formulas"]),
+            contexts=list(data["contexts"]),
+            offsets=np.frombuffer(data["offsets"], dtype="<i4"),
+            ranges=np.frombuffer(data["ranges"], dtype="<i4").reshape(-1, 5),
+            zero_keys=np.frombuffer(data["zero_keys"], dtype="<i8")
+        )
+
+
+class FormulaGraphBuilder:
+    """Collects formula cells while a workbook is streamed"""
+
+    def __init__(self):
+        self.sheet_names: List[str] = []
+        self._sheet_ids: Dict[str, int] = {}
+        self.cells: List[Tuple[int, int, int]] = []
+        self.formulas: List[str] = []
+        self.contexts: List[str] = []
+        self.precedents: List[List[Tuple[int, int, int, int, int]]] = []
+        self.zero_cells: List[Tuple[int, int, int]] = []
+
+    def sheet_id(self, sheet_name: str) -> int:
+        sheet_id = self._sheet_ids.get(sheet_name)
+        if sheet_id is None:
+            sheet_id = self._sheet_ids[sheet_name] = len(self.sheet_names)
+            self.sheet_names.append(sheet_name)
+        return sheet_id
+
+    def add_zero(self, sheet_name: str, row: int, column: int) -> None:
+        """Record a numeric cell holding zero"""
+        self.zero_cells.append((self.sheet_id(sheet_name), row, column))
+
+    def add(self, sheet_name: str, row: int, column: int, formula: str, context: str) -> None:
+        precedents = []
+        try:
+            tokens = Tokenizer(formula).items
+        except Exception:
+            tokens = []  # Unparseable formulas are kept without precedents
+        for token in tokens:
+            if token.type == Token.OPERAND and token.subtype == Token.RANGE:
+                reference = split_reference(token.value, sheet_name)
+                if reference:
+                    bounds = (self.sheet_id(reference[0]), *reference[1:])
+                    if bounds not in precedents:
+                        precedents.append(bounds)
+
+        self.cells.append((self.sheet_id(sheet_name), row, column))
+        self.formulas.append(formula)
+        self.contexts.append(context)
+        self.precedents.append(precedents)
+
+    def build(self) -> FormulaGraph:
+        order = sorted(range(len(self.cells)), key=lambda i: self.cells[i])
+        cells = np.array([self.cells[i] for i in order], dtype=np.int32).reshape(-1, 3)
+        ranges = [bounds for i in order for bounds in self.precedents[i]]
+        offsets = np.cumsum([0] + [len(self.precedents[i]) for i in order], dtype=np.int64).astype(np.int32)
+        zeros = np.array(self.zero_cells, dtype=np.int64).reshape(-1, 3)
+        return FormulaGraph(
+            sheet_names=list(self.sheet_names),
+            sheet=cells[:, 0].copy(),
+            row=cells[:, 1].copy(),
+            column=cells[:, 2].copy(),
+            formulas=[self.formulas[i] for i in order],
+            contexts=[self.contexts[i] for i in order],
+            offsets=offsets,
+            ranges=np.array(ranges, dtype=np.int32).reshape(-1, 5),
+            zero_keys=np.sort(cell_keys(zeros[:, 0], zeros[:, 1], zeros[:, 2]))
+        )
+
+
+class FormulaEvaluator:
+    """Computes formula cells from parsed values, following precedents through the graph"""
+
+    def __init__(self, graph: FormulaGraph, numbers: NumberTable, max_range_cells: int = 100000):
+        self.graph = graph
+        self.max_range_cells = max_range_cells
+
+        # Plain numeric cells keyed like the graph, so both can be searched the same way
+        graph_sheet = np.array([graph._sheet_ids.get(name, -1) for name in numbers.sheet_names] or [-1], dtype=np.int64)
+        sheet = graph_sheet[numbers.sheet] if len(numbers) else np.empty(0, dtype=np.int64)
+        known = (sheet >= 0) & (numbers.original_text < 0)
+        # Zero cells are absent from the parsed numbers, but ranges must still see them
+        keys = np.concatenate((cell_keys(sheet[known], numbers.row[known], numbers.column[known]), graph.zero_keys))
+        values = np.concatenate((numbers.value[known], np.zeros(len(graph.zero_keys))))
+        order = np.argsort(keys, kind="stable")
+        self.number_keys = keys[order]
+        self.number_values = values[order]
+
+        self._cache: Dict[int, Optional[float]] = {}
+        self._evaluating = set()
+
+    def value_of_formula(self, index: int) -> Optional[float]:
+        """Return a formula cell's value, or None if it cannot be computed"""
+        if index in self._cache:
+            return self._cache[index]
+        if index in self._evaluating:
+            return None  # Circular reference
+        self._evaluating.add(index)
+        try:
+            value = self._evaluate(index)
+        except (ArithmeticError, ValueError, TypeError, KeyError, IndexError):
+            value = None
+        finally:
+            self._evaluating.discard(index)
+        self._cache[index] = value
+        return value
+
+    def _cell_value(self, sheet_id: int, row: int, column: int) -> float:
+        key = cell_key(sheet_id, row, column)
+        position = int(np.searchsorted(self.number_keys, key))
+        if position < len(self.number_keys) and self.number_keys[position] == key:
+            return float(self.number_values[position])
+        index = self.graph.find(self.graph.sheet_names[sheet_id], row, column)
+        if index is not None:
+            value = self.value_of_formula(index)
+            if value is None:
+                raise ValueError("Precedent cannot be evaluated")
+            return value
+        return 0.0  # Blank, zero and text cells
+
+    def _range_values(self, sheet_id: int, min_row: int, min_col: int, max_row: int, max_col: int) -> List[float]:
+        """Return the numbers in a range, zeros included, as aggregate functions see them"""
+        start = np.searchsorted(self.number_keys, cell_key(sheet_id, min_row, 0))
+        end = np.searchsorted(self.number_keys, cell_key(sheet_id, max_row, MAX_COLUMN), side="right")
+        keys = self.number_keys[start:end]
+        columns = keys & COLUMN_MASK
+        inside = (columns >= min_col) & (columns <= max_col)
+        if np.count_nonzero(inside) > self.max_range_cells:
+            raise ValueError("Range too large to evaluate")
+        values = self.number_values[start:end][inside].tolist()
+
+        for index in self.graph.cells_in_range(sheet_id, min_row, min_col, max_row, max_col).tolist():
+            key = self.graph.keys[index]
+            position = int(np.searchsorted(self.number_keys, key))
+            if position < len(self.number_keys) and self.number_keys[position] == key:
+                continue  # Already counted from its cached value
+            value = self.value_of_formula(index)
+            if value is None:
+                raise ValueError("Precedent cannot be evaluated")
+            values.append(value)
+        return values
+
+    def _evaluate(self, index: int) -> Optional[float]:
+        """Compute a formula from its tokens; unsupported syntax raises ValueError"""
+        sheet_name = self.graph.sheet_names[self.graph.sheet[index]]
+        tokens = [token for token in Tokenizer(self.graph.formulas[index]).items if token.type != Token.WSPACE]
+        if not tokens:
+            return None
+        value = _FormulaReader(tokens, lambda reference: self._operand(reference, sheet_name)).read()
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            return None  # Ranges, complex powers and infinities
+        return float(value)
+
+    def _operand(self, reference: str, sheet_name: str) -> Union[float, List[float]]:
+        """Resolve a range operand to a cell's value, or to the numbers in a range"""
+        bounds = split_reference(reference, sheet_name)
+        if bounds is None or bounds[0] not in self.graph._sheet_ids:
+            raise ValueError(f"Unsupported reference {reference}")
+        sheet_id = self.graph._sheet_ids[bounds[0]]
+        min_row, min_col, max_row, max_col = bounds[1:]
+        if (min_row, min_col) == (max_row, max_col):
+            return self._cell_value(sheet_id, min_row, min_col)
+        return self._range_values(sheet_id, min_row, min_col, max_row, max_col)
+
+
+class _FormulaReader:
+    """Evaluates a tokenized formula by precedence climbing, with Excel's operator rules.
+
+    Negation binds tighter than ``^`` (-2^2 is 4), then come postfix ``%``,
+    ``^``, ``*`` and ``/``, then ``+`` and ``-``, all left-associative.
+    """
+
+    def __init__(self, tokens: List[Token], operand: Callable[[str], Union[float, List[float]]]):
+        self.tokens = tokens
+        self.operand = operand
+        self.position = 0
+
+    def read(self) -> Union[float, List[float]]:
+        value = self._expression(1)
+        if self.position != len(self.tokens):
+            raise ValueError("Unexpected token after expression")
+        return value
+
+    def _peek(self) -> Optional[Token]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> Token:
+        token = self._peek()
+        if token is None:
+            raise ValueError("Formula ends early")
+        self.position += 1
+        return token
+
+    def _expression(self, min_precedence: int) -> Union[float, List[float]]:
+        left = self._unary()
+        while True:
+            token = self._peek()
+            if token is None or token.type != Token.OP_IN or token.value not in INFIX_OPERATORS:
+                break
+            precedence, apply = INFIX_OPERATORS[token.value]
+            if precedence < min_precedence:
+                break
+            self.position += 1
+            right = self._expression(precedence + 1)
+            if isinstance(left, list) or isinstance(right, list):
+                raise ValueError("Array arithmetic is not supported")
+            left = apply(left, right)
+        return left
+
+    def _unary(self) -> Union[float, List[float]]:
+        token = self._peek()
+        if token is not None and token.type == Token.OP_PRE and token.value in ("+", "-"):
+            self.position += 1
+            value = self._unary()
+            return -value if token.value == "-" else value
+        value = self._primary()
+        token = self._peek()
+        while token is not None and token.type == Token.OP_POST and token.value == "%":
+            self.position += 1
+            value = value / 100
+            token = self._peek()
+        return value
+
+    def _primary(self) -> Union[float, List[float]]:
+        token = self._next()
+        if token.type == Token.OPERAND and token.subtype == Token.NUMBER:
+            return float(token.value)
+        if token.type == Token.OPERAND and token.subtype == Token.RANGE:
+            return self.operand(token.value)
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            value = self._expression(1)
+            self._expect(Token.PAREN)
+            return value
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            function = FUNCTIONS.get(token.value[:-1].upper())
+            if function is None:
+                raise ValueError(f"Unsupported function {token.value[:-1]}")
+            args = []
+            closing = self._peek()
+            if closing is not None and closing.type == Token.FUNC and closing.subtype == Token.CLOSE:
+                self.position += 1
+                return function()
+            while True:
+                args.append(self._expression(1))
+                separator = self._peek()
+                if separator is not None and separator.type == Token.SEP and separator.subtype == Token.ARG:
+                    self.position += 1
+                    continue
+                self._expect(Token.FUNC)
+                return function(*args)
+        raise ValueError(f"Unsupported token {token.value}")  # Text, comparisons, errors and the like
+
+    def _expect(self, token_type: str) -> None:
+        token = self._next()
+        if token.type != token_type or token.subtype != Token.CLOSE:
+            raise ValueError("Unbalanced parentheses")
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from matcher import NumberMatcher
+from value_index import ValueIndex
+
+
+def sheet_fingerprints(excel_data: Dict) -> Dict[str, Dict[str, str]]:
+    """Return {filename: {sheet_name: fingerprint}} for parsed workbooks"""
+    return {
+        file_data["filename"]: {
+            sheet_name: sheet_data.get("fingerprint", "") for sheet_name, sheet_data in file_data["sheets"].items()
+        }
+        for file_data in excel_data.values()
+    }
+
+
+def build_audit_state(ppt_data: List[Dict], excel_data: Dict, audit_results: List[Dict]) -> Dict[str, Any]:
+    """Record what an audit saw, so a later re-upload can be audited incrementally"""
+    results_by_slide = defaultdict(list)
+    for result in audit_results:
+        results_by_slide[result["slide"]].append(result)
+
+    return {
+        "slide_results": {
+            slide["fingerprint"]: results_by_slide.get(slide["slide_number"], [])
+            for slide in ppt_data if slide.get("fingerprint")
+        },
+        "sheet_fingerprints": sheet_fingerprints(excel_data)
+    }
+
+
+def changed_sheets(previous: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]]) -> Set[Tuple[str, str]]:
+    """Return (filename, sheet_name) pairs that were added, removed or changed"""
+    changed = set()
+    for filename in set(previous) | set(current):
+        previous_sheets = previous.get(filename, {})
+        current_sheets = current.get(filename, {})
+        for sheet_name in set(previous_sheets) | set(current_sheets):
+            if previous_sheets.get(sheet_name) != current_sheets.get(sheet_name):
+                changed.add((filename, sheet_name))
+    return changed
+
+
+def changed_sheet_values(excel_data: Dict, sheets_changed: Set[Tuple[str, str]]) -> np.ndarray:
+    """Return the numbers of the changed sheets, both scaled and as written in their cells"""
+    values = []
+    for file_data in excel_data.values():
+        numbers = file_data["numbers"]
+        sheet_ids = [i for i, name in enumerate(numbers.sheet_names) if (file_data["filename"], name) in sheets_changed]
+        positions = np.nonzero(np.isin(numbers.sheet, sheet_ids))[0]
+        values.append(numbers.value[positions])
+        scaled = positions[numbers.unit[positions] >= 0]
+        if len(scaled):
+            values.append(numbers.raw_values(scaled))
+    return np.concatenate(values) if values else np.empty(0, dtype=np.float64)
+
+
+def run_incremental_audit(matcher: NumberMatcher, ppt_data: List[Dict], excel_data: Dict,
+                          previous_state: Optional[Dict[str, Any]] = None,
+                          progress_callback: Optional[Callable[[int, int], None]] = None
+                          ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+    """Audit a deck, reusing a previous audit's results for slides that cannot have changed.
+
+    A slide is re-matched against the full Excel index when its fingerprint is
+    new, when one of its previous results came from a changed sheet, or when
+    any sheet changed and the slide previously had non-Match results (new
+    cells could now match them). A Match is kept only if no changed sheet
+    holds a number within tolerance of it: the matcher picks the candidate
+    with the best context, so a new candidate could win. Derived matches
+    are always re-matched when a sheet changed. Reused results get the
+    slide's current number, so reordered slides are still reused.
+
+    Returns the results, the state to keep for the next audit, and a report
+    of how much work was skipped.
+    """
+    current_sheets = sheet_fingerprints(excel_data)
+    previous_results = (previous_state or {}).get("slide_results", {})
+    sheets_changed = set()
+    if previous_state is not None:
+        sheets_changed = changed_sheets(previous_state.get("sheet_fingerprints", {}), current_sheets)
+
+    changed_values = changed_sheet_values(excel_data, sheets_changed) if sheets_changed else np.empty(0)
+    changed_index = ValueIndex(changed_values, matcher.tolerance)
+
+    def could_change_match(result: Dict[str, Any]) -> bool:
+        if result.get("derivation"):
+            return True
+        return any(matcher._numbers_match(result["ppt_value"], float(changed_values[i]))
+                   for i in changed_index.candidates(result["ppt_value"]))
+
+    reused = {}
+    for slide in ppt_data:
+        results = previous_results.get(slide.get("fingerprint"))
+        if results is None:
+            continue
+        touches_changed_sheet = any((r["excel_file"], r["excel_sheet"]) in sheets_changed for r in results)
+        could_gain_match = bool(sheets_changed) and any(
+            r["status"] != "Match" or could_change_match(r) for r in results
+        )
+        if not touches_changed_sheet and not could_gain_match:
+            reused[slide["slide_number"]] = [dict(result, slide=slide["slide_number"]) for result in results]
+
+    slides_to_match = [slide for slide in ppt_data if slide["slide_number"] not in reused]
+    matched = {}
+    if slides_to_match:
+        for slide, slide_results in matcher.iter_slide_results(slides_to_match, excel_data, progress_callback):
+            matched[slide["slide_number"]] = slide_results
+    elif progress_callback:
+        progress_callback(0, 0)
+
+    audit_results = []
+    for slide in ppt_data:
+        audit_results.extend(reused.get(slide["slide_number"]) or matched.get(slide["slide_number"], []))
+
+    numbers_total = sum(len(slide["numbers"]) for slide in ppt_data)
+    numbers_rematched = sum(len(slide["numbers"]) for slide in slides_to_match)
+    report = {
+        "incremental": previous_state is not None,
+        "slides_total": len(ppt_data),
+        "slides_rematched": len(slides_to_match),
+        "slides_reused": len(reused),
+        "numbers_total": numbers_total,
+        "numbers_rematched": numbers_rematched,
+        "numbers_reused": numbers_total - numbers_rematched,
+        "changed_sheets": [f"{filename}/{sheet_name}" for filename, sheet_name in sorted(sheets_changed)]
+    }
+    if previous_state is not None:
+        print(f"Incremental audit: re-matched {len(slides_to_match)} of {len(ppt_data)} slides, "
+              f"reused {report['numbers_reused']} of {numbers_total} numbers")
+
+    return audit_results, build_audit_state(ppt_data, excel_data, audit_results), report
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from parse_cache import ParseCache
+
+# Bump when the prompt changes so cached verdicts are not reused
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You audit numbers in a presentation against the Excel model they came from. "
+    "For each item you get the slide text around the number, the number as written, and the "
+    "closest Excel figure found (if any) with its sheet, cell and row/column labels. "
+    "Decide whether the slide number is supported by the Excel figure, allowing for rounding "
+    "and unit conversions (K, Lac, Cr, M, B, %). Reply with JSON: "
+    '{"verdicts": [{"id": <item id>, "verdict": "match" | "mismatch" | "untraceable", '
+    '"explanation": "<one or two sentences>"}]}, with one verdict per item.'
+)
+
+# Errors worth retrying: the request may succeed if sent again later
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError,
+                    openai.InternalServerError)
+
+
+class LLMAdjudicator:
+    """Second opinion from an OpenAI-compatible model on low-confidence audit results.
+
+    Results are sent in batches, several requests at a time up to
+    ``max_concurrency``, with exponential backoff on transient errors.
+    Responses are cached by a hash of the full prompt, so re-auditing the same
+    figures costs nothing. Each call to ``adjudicate`` returns its own token
+    and latency accounting.
+    """
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 batch_size: int = 20, max_concurrency: int = 4, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 timeout_seconds: float = 60.0, confidence_threshold: float = 0.85,
+                 cache: Optional[ParseCache] = None):
+        self.model = model or os.getenv("LLM_MODEL", "gpt-4o-mini")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")  # e.g. a local stub server
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.confidence_threshold = confidence_threshold  # Results below this confidence are adjudicated
+        self.cache = cache
+
+    def needs_review(self, result: Dict[str, Any]) -> bool:
+        return (result["status"] in ("Mismatch", "Untraceable")
+                and result.get("confidence", 0) < self.confidence_threshold
+                and "llm_verdict" not in result)
+
+    def adjudicate_sync(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run ``adjudicate`` from synchronous code, such as an audit worker thread"""
+        return asyncio.run(self.adjudicate(results))
+
+    async def adjudicate(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add an LLM verdict and explanation to each low-confidence result, in place.
+
+        Returns the accounting for this call: requests sent, cache hits, token
+        usage, latency and failures. Failed batches leave their results as they were.
+        """
+        report = {
+            "model": self.model,
+            "results_reviewed": 0,
+            "batches": 0,
+            "requests": 0,
+            "retries": 0,
+            "cache_hits": 0,
+            "failed_batches": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "request_seconds": 0.0,
+            "max_request_seconds": 0.0,
+            "wall_seconds": 0.0
+        }
+        pending = [result for result in results if self.needs_review(result)]
+        if not pending:
+            return report
+
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # The client holds a connection pool bound to this event loop
+        async with AsyncOpenAI(api_key=self.api_key or "not-set", base_url=self.base_url,
+                               timeout=self.timeout_seconds, max_retries=0) as client:
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            await asyncio.gather(*(self._adjudicate_batch(client, semaphore, batch, report) for batch in batches))
+
+        report["results_reviewed"] = len(pending)
+        report["batches"] = len(batches)
+        report["wall_seconds"] = time.perf_counter() - start
+        print(f"LLM adjudication: {len(pending)} results in {len(batches)} batches, "
+              f"{report['cache_hits']} cached, {report['prompt_tokens'] + report['completion_tokens']} tokens, "
+              f"{report['wall_seconds']:.2f}s")
+        return report
+
+    def _build_messages(self, batch: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        items = [
+            {
+                "id": i,
+                "slide": result["slide"],
+                "slide_text": result.get("context", ""),
+                "number": result["text"],
+                "parsed_value": result["ppt_value"],
+                "excel_value": result.get("excel_value"),
+                "excel_location": f"{result['excel_file']}/{result['excel_sheet']}!{result['cell']}"
+                if result.get("excel_sheet") else None,
+                "matcher_status": result["status"]
+            }
+            for i, result in enumerate(batch)
+        ]
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps({"items": items}, ensure_ascii=False)}
+        ]
+
+    async def _adjudicate_batch(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                batch: List[Dict[str, Any]], report: Dict[str, Any]) -> None:
+        messages = self._build_messages(batch)
+        prompt_hash = hashlib.sha256(
+            json.dumps([self.model, messages], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        cache_key = self.cache.make_key("llm", prompt_hash, PROMPT_VERSION) if self.cache else None
+
+        content = None
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                report["cache_hits"] += 1
+                content = cached["content"]
+
+        if content is None:
+            async with semaphore:
+                content = await self._request(client, messages, report)
+            if content is None:
+                report["failed_batches"] += 1
+                return
+
+        try:
+            verdicts = json.loads(content)["verdicts"]
+            by_id = {int(verdict["id"]): verdict for verdict in verdicts}
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Unreadable LLM response: {str(e)}")
+            report["failed_batches"] += 1
+            return
+
+        if self.cache and cache_key:
+            await asyncio.to_thread(self.cache.put, cache_key, {"content": content})
+
+        for i, result in enumerate(batch):
+            verdict = by_id.get(i)
+            if verdict and verdict.get("verdict") in ("match", "mismatch", "untraceable"):
+                result["llm_verdict"] = verdict["verdict"]
+                result["reasoning"] = f"{result['reasoning']}. Reviewer: {verdict.get('explanation', '').strip()}"
+
+    async def _request(self, client: AsyncOpenAI, messages: List[Dict[str, str]],
+                       report: Dict[str, Any]) -> Optional[str]:
+        """Send one chat completion, retrying transient errors with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                report["requests"] += 1
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0,
+                    response_format={"type": "json_object"}
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    print(f"LLM request failed after {attempt + 1} attempts: {str(e)}")
+                    return None
+                report["retries"] += 1
+                await asyncio.sleep(self.backoff_seconds * 2 ** attempt * (0.5 + random.random()))
+                continue
+            except openai.OpenAIError as e:
+                print(f"LLM request failed: {str(e)}")
+                return None
+            finally:
+                elapsed = time.perf_counter() - start
+                report["request_seconds"] += elapsed
+                report["max_request_seconds"] = max(report["max_request_seconds"], elapsed)
+
+            if response.usage:
+                report["prompt_tokens"] += response.usage.prompt_tokens
+                report["completion_tokens"] += response.usage.completion_tokens
+            return response.choices[0].message.content
+        return None
+
+
+def create_llm_adjudicator(cache: Optional[ParseCache] = None) -> Optional[LLMAdjudicator]:
+    """Create the adjudicator if LLM_ADJUDICATION is enabled in the environment"""
+    if os.getenv("LLM_ADJUDICATION", "false").lower() not in ("1", "true", "yes"):
+        return None
+    return LLMAdjudicator(
+        batch_size=int(os.getenv("LLM_BATCH_SIZE", 20)),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 3)),
+        cache=cache
+    )
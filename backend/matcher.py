@@ -1,42 +1,60 @@
-import openai
 from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz as rapid_fuzz, process
+import numpy as np
 import re
-from typing import List, Dict, Any, Optional
-import os
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
 import json
 import math
+import time
+from collections import Counter
+
+from value_index import ValueIndex
+from context_index import ContextIndex
+from number_table import NumberTable
+from formula_graph import FormulaGraph
+from derived_search import DerivedIndex
+from telemetry import telemetry
+
+class ExcelLookup:
+    """Lookup structures over the flattened Excel numbers, built once per audit"""
+    
+    def __init__(self, numbers: NumberTable, contexts: List[str], value_index: ValueIndex,
+                 context_index: Optional[ContextIndex] = None,
+                 formula_graphs: Optional[Dict[str, FormulaGraph]] = None,
+                 derived_index: Optional[DerivedIndex] = None, derived_deadline: Optional[float] = None,
+                 raw_positions: Optional[np.ndarray] = None, raw_value_index: Optional[ValueIndex] = None):
+        self.numbers = numbers
+        self.contexts = contexts  # Cleaned, lowercased context per Excel number
+        self.value_index = value_index
+        self.context_index = context_index
+        self.formula_graphs = formula_graphs or {}  # Formula dependency graph per workbook filename
+        self.derived_index = derived_index
+        self.derived_deadline = derived_deadline  # perf_counter time after which derived search is skipped
+        self.raw_positions = raw_positions  # Positions of unit-scaled numbers, in raw_value_index order
+        self.raw_value_index = raw_value_index  # Those numbers as written in their cells, e.g. 520 under "₹ Lacs"
 
 class NumberMatcher:
-    def __init__(self):
-        # Set your OpenAI API key here or in environment
-        openai.api_key = os.getenv("OPENAI_API_KEY", "your-api-key-here")
+    def __init__(self, context_blocking: bool = True, context_candidate_cap: Optional[int] = 500,
+                 exact_context_scores: bool = True, scorer_workers: int = -1, derived_search: bool = False,
+                 derived_tolerance: float = 0.01, derived_time_budget: float = 2.0):
         self.tolerance = 0.05  # 5% tolerance for number matching
+        self.context_blocking = context_blocking  # Only fuzzy-score Excel contexts sharing a token
+        self.context_candidate_cap = context_candidate_cap  # Max contexts fuzzy-scored per PPT number
+        self.exact_context_scores = exact_context_scores  # Keep fuzzywuzzy-identical context scores
+        self.scorer_workers = scorer_workers  # rapidfuzz cdist threads, -1 uses all cores
+        self.derived_search = derived_search  # Look for sums, differences, growth rates and ratios of cells
+        self.derived_tolerance = derived_tolerance  # Tighter than tolerance, as many derived values are near misses
+        self.derived_time_budget = derived_time_budget  # Seconds per audit for building and searching derived values
+        self.counts = Counter()  # Work done in the current audit, flushed to telemetry when it ends
         
-    def match_numbers(self, ppt_data: List[Dict], excel_data: Dict) -> List[Dict[str, Any]]:
-        """Match numbers from PPT with Excel data"""
+    def match_numbers(self, ppt_data: Iterable[Dict], excel_data: Dict,
+                      progress_callback: Optional[Callable[[int, int], None]] = None,
+                      lookup: Optional[ExcelLookup] = None) -> List[Dict[str, Any]]:
+        """Match numbers from PPT with Excel data, reporting (matched, total) to progress_callback"""
         try:
             audit_results = []
-            
-            # Flatten all numbers from all slides
-            all_ppt_numbers = []
-            for slide in ppt_data:
-                for number in slide["numbers"]:
-                    all_ppt_numbers.append(number)
-            
-            # Flatten all numbers from all Excel sheets
-            all_excel_numbers = []
-            for file_data in excel_data.values():
-                for sheet_data in file_data["sheets"].values():
-                    for number in sheet_data["numbers"]:
-                        number["source_file"] = file_data["filename"]
-                        all_excel_numbers.append(number)
-            
-            print(f"Matching {len(all_ppt_numbers)} PPT numbers against {len(all_excel_numbers)} Excel numbers")
-            
-            # Match each PPT number
-            for ppt_number in all_ppt_numbers:
-                match_result = self._find_best_match(ppt_number, all_excel_numbers)
-                audit_results.append(match_result)
+            for _, slide_results in self.iter_slide_results(ppt_data, excel_data, progress_callback, lookup):
+                audit_results.extend(slide_results)
             
             return audit_results
             
@@ -44,48 +62,252 @@ class NumberMatcher:
             print(f"Error in matching process: {str(e)}")
             raise Exception(f"Matching failed: {str(e)}")
     
-    def _find_best_match(self, ppt_number: Dict, excel_numbers: List[Dict]) -> Dict[str, Any]:
+    def iter_slide_results(self, ppt_data: Iterable[Dict], excel_data: Dict,
+                           progress_callback: Optional[Callable[[int, int], None]] = None,
+                           lookup: Optional[ExcelLookup] = None) -> Iterator[Tuple[Dict, List[Dict[str, Any]]]]:
+        """Match numbers slide by slide, yielding each slide with its results as soon as they are ready.
+        
+        A ``lookup`` from ``build_lookup`` can be passed to audit several decks
+        against the same workbooks; ``excel_data`` is then not read. Slides may
+        also come from a generator such as ``PPTParser.iter_slides``, to match
+        them while the deck is still being parsed; progress is then reported
+        against the numbers seen so far, as the total is not known up front.
+        """
+        self.counts = Counter()
+        match_seconds = 0.0
+        slides_matched = 0
+        start = time.perf_counter()
+        try:
+            if lookup is None:
+                lookup = self.build_lookup(excel_data)
+            elif lookup.derived_index is not None:
+                # A shared lookup was built earlier, so each audit gets its own derived search budget
+                lookup.derived_deadline = time.perf_counter() + self.derived_time_budget
+            total_numbers = sum(len(slide["numbers"]) for slide in ppt_data) if isinstance(ppt_data, list) else None
+            
+            print(f"Matching {total_numbers if total_numbers is not None else 'streamed'} PPT numbers "
+                  f"against {len(lookup.numbers)} Excel numbers")
+            
+            # Repeated figures with the same context are matched once
+            match_cache = {}
+            numbers_seen = numbers_matched = 0
+            if progress_callback and total_numbers is not None:
+                progress_callback(0, total_numbers)
+            match_seconds += time.perf_counter() - start
+            
+            for slide in ppt_data:
+                # Spans leave out time the caller spends between slides, such as streaming or parsing them
+                start = time.perf_counter()
+                numbers_seen += len(slide["numbers"])
+                slide_results = []
+                for ppt_number in slide["numbers"]:
+                    slide_results.append(self._find_best_match(ppt_number, lookup, match_cache))
+                    numbers_matched += 1
+                    if progress_callback:
+                        progress_callback(numbers_matched, total_numbers if total_numbers is not None else numbers_seen)
+                slide_seconds = time.perf_counter() - start
+                match_seconds += slide_seconds
+                slides_matched += 1
+                telemetry.record_span("match.slide", slide_seconds, slide=slide["slide_number"],
+                                      numbers=len(slide_results))
+                yield slide, slide_results
+            
+            if len(match_cache) < numbers_matched:
+                print(f"Reused matches for {numbers_matched - len(match_cache)} repeated PPT numbers")
+            self.counts["reused_matches"] += numbers_matched - len(match_cache)
+        finally:
+            # Also reached when a streamed audit is abandoned part way
+            telemetry.record_span("match", match_seconds, slides=slides_matched)
+            for name, value in self.counts.items():
+                telemetry.increment(f"matcher_{name}", value)
+    
+    def build_lookup(self, excel_data: Dict) -> ExcelLookup:
+        """Join the workbooks' number tables and build the value and context indexes"""
+        with telemetry.span("match.build_lookup", files=len(excel_data)):
+            return self._build_lookup(excel_data)
+    
+    def _build_lookup(self, excel_data: Dict) -> ExcelLookup:
+        tables, file_names, formula_graphs = [], [], {}
+        for file_data in excel_data.values():
+            tables.append(file_data["numbers"])
+            file_names.append(file_data["filename"])
+            
+            if file_data.get("formula_graph"):
+                graph = FormulaGraph.from_dict(file_data["formula_graph"])
+                formula_graphs[file_data["filename"]] = graph
+                # Formula cells saved without a cached result are computed from their precedents
+                derived = graph.derived_numbers(file_data["numbers"])
+                if len(derived):
+                    print(f"Computed {len(derived)} uncached formula values in {file_data['filename']}")
+                    tables.append(derived)
+                    file_names.append(file_data["filename"])
+        
+        numbers = NumberTable.concat(tables, file_names=file_names)
+        
+        # Normalize each distinct (context, original text) pair once instead of once per PPT number
+        normalized = {}
+        contexts = []
+        for context_id, text_id in zip(numbers.context.tolist(), numbers.original_text.tolist()):
+            key = (context_id, text_id)
+            if key not in normalized:
+                original_text = numbers.strings[text_id] if text_id >= 0 else ""
+                normalized[key] = self._clean_context(f"{numbers.strings[context_id]} {original_text}").lower()
+            contexts.append(normalized[key])
+        
+        value_index = ValueIndex(numbers.value, self.tolerance)
+        # Decks may also quote a figure in the model's own units, so scaled cells stay findable as written
+        raw_positions = np.nonzero(numbers.unit >= 0)[0]
+        raw_value_index = ValueIndex(numbers.raw_values(raw_positions), self.tolerance) if len(raw_positions) else None
+        context_index = ContextIndex(contexts, self.context_candidate_cap) if self.context_blocking else None
+        
+        derived_index = derived_deadline = None
+        if self.derived_search:
+            derived_deadline = time.perf_counter() + self.derived_time_budget
+            derived_index = DerivedIndex(numbers, self.derived_tolerance, deadline=derived_deadline)
+            print(f"Indexed {len(derived_index)} derived values"
+                  f"{'' if derived_index.complete else ' (stopped at the time budget)'}")
+        
+        return ExcelLookup(numbers, contexts, value_index, context_index, formula_graphs,
+                           derived_index, derived_deadline, raw_positions, raw_value_index)
+    
+    def _find_best_match(self, ppt_number: Dict, lookup: ExcelLookup,
+                         match_cache: Optional[Dict] = None) -> Dict[str, Any]:
         """Find the best match for a PPT number in Excel data"""
         try:
-            best_match = None
-            best_score = 0
+            ppt_context = self._ppt_context_text(ppt_number)
             
-            # First, try exact numerical match
-            for excel_num in excel_numbers:
-                if self._numbers_match(ppt_number["parsed_value"], excel_num["value"]):
-                    # Check context similarity
-                    context_score = self._calculate_context_similarity(ppt_number, excel_num)
-                    total_score = 0.7 + (0.3 * context_score / 100)  # 70% number, 30% context
-                    
-                    if total_score > best_score:
-                        best_score = total_score
-                        best_match = excel_num
+            # The best match depends only on the value, the normalized context and whether it is a percentage
+            percentage = ppt_number.get("type") == "percentage"
+            cache_key = (ppt_number["parsed_value"], ppt_context, percentage)
+            if match_cache is not None and cache_key in match_cache:
+                best_position, derived_position = match_cache[cache_key]
+            else:
+                best_position, derived_position = self._find_best_position(
+                    ppt_number["parsed_value"], ppt_context, lookup, percentage
+                )
+                if match_cache is not None:
+                    match_cache[cache_key] = (best_position, derived_position)
             
-            # If no exact match, try fuzzy matching with context
-            if best_match is None:
-                for excel_num in excel_numbers:
-                    context_score = self._calculate_context_similarity(ppt_number, excel_num)
-                    
-                    # Lower threshold for context-based matching
-                    if context_score > 60:
-                        total_score = context_score / 100
-                        if total_score > best_score:
-                            best_score = total_score
-                            best_match = excel_num
+            if derived_position is not None:
+                return self._create_derived_result(ppt_number, lookup.derived_index.record(derived_position))
+            
+            # Only the chosen Excel number is materialized as a dict
+            best_match = lookup.numbers.record(best_position) if best_position is not None else None
             
             # Determine status and create result
             if best_match is None:
                 return self._create_untraceable_result(ppt_number)
             elif self._numbers_match(ppt_number["parsed_value"], best_match["value"]):
-                return self._create_match_result(ppt_number, best_match)
+                result = self._create_match_result(ppt_number, best_match)
+            elif "raw_value" in best_match and self._numbers_match(ppt_number["parsed_value"], best_match["raw_value"]):
+                # The slide quotes the figure in the model's own units
+                result = self._create_match_result(ppt_number, dict(best_match, value=best_match["raw_value"]))
             else:
-                return self._create_mismatch_result(ppt_number, best_match)
+                result = self._create_mismatch_result(ppt_number, best_match)
+            if "unit" in best_match:
+                result["reasoning"] += f" (cell reads {best_match['raw_value']:g}, in {best_match['unit']}s)"
+            
+            # Formula cells report how they were computed
+            graph = lookup.formula_graphs.get(best_match["source_file"])
+            lineage = graph.lineage(best_match["sheet_name"], best_match["row"], best_match["column"]) if graph else []
+            if lineage:
+                result["lineage"] = lineage
+            return result
                 
         except Exception as e:
             print(f"Error finding match for number: {str(e)}")
             return self._create_error_result(ppt_number, str(e))
     
-    def _numbers_match(self, ppt_value: float, excel_value: float) -> bool:
+    def _find_best_position(self, ppt_value: float, ppt_context: str, lookup: ExcelLookup,
+                            percentage: bool = False) -> Tuple[Optional[int], Optional[int]]:
+        """Return (Excel number position, derived value index) of the best match; both None if untraceable"""
+        excel_values = lookup.numbers.value
+        self.counts["searches"] += 1
+        
+        # First, try exact numerical match within the tolerance window; 70% number, 30% context,
+        # so the candidate with the best context score wins
+        indexed_candidates = lookup.value_index.candidates(ppt_value)
+        self.counts["value_comparisons"] += len(indexed_candidates)
+        value_candidates = [
+            i for i in indexed_candidates
+            if self._numbers_match(ppt_value, float(excel_values[i]))
+        ]
+        if lookup.raw_value_index is not None:
+            raw_candidates = [int(lookup.raw_positions[i]) for i in lookup.raw_value_index.candidates(ppt_value)]
+            self.counts["value_comparisons"] += len(raw_candidates)
+            value_candidates = sorted(value_candidates + [
+                i for i in raw_candidates if self._numbers_match(ppt_value, lookup.numbers.raw_value(i))
+            ])
+        if value_candidates:
+            best_position, _ = self._best_context_candidate(ppt_context, value_candidates, lookup, -1)
+            return best_position, None
+        
+        # Then figures computed from neighbouring cells, while the audit's time budget lasts
+        derived_index = lookup.derived_index
+        if derived_index is not None and time.perf_counter() < lookup.derived_deadline:
+            indexed_candidates = derived_index.candidates(ppt_value, percentage)
+            self.counts["derived_comparisons"] += len(indexed_candidates)
+            derived_candidates = [
+                i for i in indexed_candidates
+                if self._numbers_match(ppt_value, float(derived_index.values[i]), self.derived_tolerance)
+            ]
+            if derived_candidates:
+                contexts = [lookup.contexts[derived_index.anchor(i)] for i in derived_candidates]
+                derived_position, _ = self._best_context_candidate(ppt_context, derived_candidates, lookup, -1, contexts)
+                return None, derived_position
+        
+        # If no exact match, try fuzzy matching with context
+        if lookup.context_index is not None:
+            context_candidates = lookup.context_index.candidates(ppt_context)
+        else:
+            context_candidates = list(range(len(excel_values)))
+        
+        # Lower threshold for context-based matching
+        best_position, _ = self._best_context_candidate(ppt_context, context_candidates, lookup, 60)
+        return best_position, None
+    
+    def _best_context_candidate(self, ppt_context: str, positions: Sequence[int], lookup: ExcelLookup,
+                                min_score: float, contexts: Optional[List[str]] = None) -> Tuple[Optional[int], float]:
+        """Return the candidate with the highest context score above min_score.
+        
+        All candidates are scored in one batched rapidfuzz cdist call. Ties go to
+        the earliest position, matching a sequential scan with a strict comparison.
+        Contexts default to the Excel numbers' own contexts at those positions.
+        """
+        if not positions:
+            return None, 0
+        
+        if contexts is None:
+            contexts = [lookup.contexts[i] for i in positions]
+        positions = np.asarray(positions)
+        if ppt_context:
+            scores = process.cdist([ppt_context], contexts, scorer=rapid_fuzz.partial_ratio,
+                                   workers=self.scorer_workers)[0]
+            self.counts["fuzzy_batches"] += 1
+            self.counts["fuzzy_scores"] += len(contexts)
+        else:
+            scores = np.zeros(len(contexts), dtype=np.float32)
+        
+        if not self.exact_context_scores:
+            scores = np.rint(scores)
+            best = int(np.argmax(scores))
+            return (int(positions[best]), float(scores[best])) if scores[best] > min_score else (None, 0)
+        
+        # rapidfuzz finds the optimal alignment, so its score bounds fuzzywuzzy's from above.
+        # Rescore with fuzzywuzzy in descending bound order until no candidate can win.
+        bounds = np.ceil(scores + 1e-3)
+        best_position, best_score = None, min_score
+        for k in np.lexsort((positions, -bounds)):
+            if bounds[k] <= min_score or bounds[k] < best_score:
+                break
+            score = fuzz.partial_ratio(ppt_context, contexts[k]) if ppt_context and contexts[k] else 0
+            self.counts["fuzzy_rescores"] += 1
+            if score > best_score or (score == best_score and best_position is not None and positions[k] < best_position):
+                best_position, best_score = int(positions[k]), score
+        
+        return best_position, best_score
+    
+    def _numbers_match(self, ppt_value: float, excel_value: float, tolerance: Optional[float] = None) -> bool:
         """Check if two numbers match within tolerance"""
         if ppt_value == 0 and excel_value == 0:
             return True
@@ -94,24 +316,30 @@ class NumberMatcher:
         
         # Calculate relative difference
         diff = abs(ppt_value - excel_value) / max(abs(ppt_value), abs(excel_value))
-        return diff <= self.tolerance
+        return diff <= (self.tolerance if tolerance is None else tolerance)
     
     def _calculate_context_similarity(self, ppt_number: Dict, excel_number: Dict) -> float:
         """Calculate similarity between contexts using fuzzy matching"""
-        ppt_context = f"{ppt_number.get('context', '')} {ppt_number.get('raw_text', '')}"
-        excel_context = f"{excel_number.get('context', '')} {excel_number.get('original_text', '')}"
-        
-        # Clean and normalize contexts
-        ppt_context = self._clean_context(ppt_context)
-        excel_context = self._clean_context(excel_context)
+        ppt_context = self._ppt_context_text(ppt_number)
+        excel_context = self._excel_context_text(excel_number)
         
         if not ppt_context or not excel_context:
             return 0
         
         # Use fuzzy matching
-        similarity = fuzz.partial_ratio(ppt_context.lower(), excel_context.lower())
+        similarity = fuzz.partial_ratio(ppt_context, excel_context)
         return similarity
     
+    def _ppt_context_text(self, ppt_number: Dict) -> str:
+        """Build the cleaned, lowercased context used to compare a PPT number"""
+        context = f"{ppt_number.get('context', '')} {ppt_number.get('raw_text', '')}"
+        return self._clean_context(context).lower()
+    
+    def _excel_context_text(self, excel_number: Dict) -> str:
+        """Build the cleaned, lowercased context used to compare an Excel number"""
+        context = f"{excel_number.get('context', '')} {excel_number.get('original_text', '')}"
+        return self._clean_context(context).lower()
+    
     def _clean_context(self, context: str) -> str:
         """Clean and normalize context text"""
         # Remove special characters and extra spaces
@@ -156,6 +384,25 @@ class NumberMatcher:
             "confidence": 0.80
         }
     
+    def _create_derived_result(self, ppt_number: Dict, derived: Dict) -> Dict[str, Any]:
+        """Create result for a number matching a figure computed from Excel cells"""
+        return {
+            "slide": ppt_number["slide_number"],
+            "text": ppt_number["raw_text"],
+            "status": "Match",
+            "ppt_value": ppt_number["parsed_value"],
+            "excel_value": derived["value"],
+            "suggested_fix": None,
+            "excel_sheet": derived["sheet_name"],
+            "excel_file": derived["source_file"],
+            "cell": ", ".join(derived["cells"]),
+            "reasoning": f"Value matches the {derived['kind']} {derived['formula']} within tolerance. "
+                         f"PPT: {ppt_number['parsed_value']}, Excel: {derived['value']}",
+            "context": ppt_number.get("context", ""),
+            "confidence": 0.70,
+            "derivation": {"kind": derived["kind"], "formula": derived["formula"], "cells": derived["cells"]}
+        }
+    
     def _create_untraceable_result(self, ppt_number: Dict) -> Dict[str, Any]:
         """Create result for untraceable numbers"""
         return {
@@ -0,0 +1,245 @@
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+import msgpack
+import numpy as np
+
+from units import UNIT_SCALES
+
+# msgpack extension type code for serialized NumberTables
+MSGPACK_EXT_CODE = 1
+
+# Integer columns, serialized as raw little-endian buffers
+INT_COLUMNS = ("row", "column", "sheet", "file", "context", "original_text", "unit")
+
+
+def col_num_to_letter(col_num: int) -> str:
+    """Convert column number to Excel letter format"""
+    result = ""
+    while col_num > 0:
+        col_num -= 1
+        result = chr(col_num % 26 + ord('A')) + result
+        col_num //= 26
+    return result
+
+
+class NumberTable:
+    """Columnar store of extracted Excel numbers.
+
+    Values, rows and columns are NumPy arrays; sheet and file names, contexts
+    original cell texts and units are interned into string tables and
+    referenced by index (-1 for a missing original text or unit). Values are
+    absolute: a cell read under a "₹ Lacs" header is stored multiplied out,
+    with "lakh" as its unit. Dicts are only built on demand by
+    ``record`` for the numbers that end up in audit results.
+    """
+
+    def __init__(self, value: np.ndarray, row: np.ndarray, column: np.ndarray, sheet: np.ndarray,
+                 file: np.ndarray, context: np.ndarray, original_text: np.ndarray, unit: np.ndarray,
+                 sheet_names: List[str], file_names: List[str], strings: List[str]):
+        self.value = value
+        self.row = row
+        self.column = column
+        self.sheet = sheet
+        self.file = file
+        self.context = context
+        self.original_text = original_text
+        self.unit = unit
+        self.sheet_names = sheet_names
+        self.file_names = file_names
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and string tables"""
+        arrays = self.value.nbytes + sum(getattr(self, name).nbytes for name in INT_COLUMNS)
+        return arrays + sum(len(text) for text in self.strings)
+
+    def cell_reference(self, position: int) -> str:
+        return f"{col_num_to_letter(int(self.column[position]))}{int(self.row[position])}"
+
+    def raw_values(self, positions: np.ndarray) -> np.ndarray:
+        """Return numbers as written in their cells, before unit scaling"""
+        units = self.unit[positions]
+        scales = np.ones(len(positions), dtype=np.float64)
+        for unit in np.unique(units[units >= 0]).tolist():
+            scales[units == unit] = UNIT_SCALES[self.strings[unit]]
+        return self.value[positions] / scales
+
+    def raw_value(self, position: int) -> float:
+        """Return a number as written in its cell, before unit scaling"""
+        unit = int(self.unit[position])
+        value = float(self.value[position])
+        return value / UNIT_SCALES[self.strings[unit]] if unit >= 0 else value
+
+    def record(self, position: int) -> Dict[str, Any]:
+        """Return one number as the dict the matcher's result builders expect"""
+        original_text = int(self.original_text[position])
+        record = {
+            "value": float(self.value[position]),
+            "cell_reference": self.cell_reference(position),
+            "row": int(self.row[position]),
+            "column": int(self.column[position]),
+            "sheet_name": self.sheet_names[self.sheet[position]],
+            "context": self.strings[self.context[position]],
+            "data_type": "number" if original_text < 0 else "text_with_number",
+            "source_file": self.file_names[self.file[position]] if self.file_names else ""
+        }
+        if original_text >= 0:
+            record["original_text"] = self.strings[original_text]
+        unit = int(self.unit[position])
+        if unit >= 0:
+            record["unit"] = self.strings[unit]
+            record["raw_value"] = self.raw_value(position)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to plain types, with each array stored as a bytes buffer"""
+        data = {name: getattr(self, name).astype("<i4").tobytes() for name in INT_COLUMNS}
+        data["value"] = self.value.astype("<f8").tobytes()
+        data["sheet_names"] = self.sheet_names
+        data["file_names"] = self.file_names
+        data["strings"] = self.strings
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NumberTable":
+        columns = {name: np.frombuffer(data[name], dtype="<i4") for name in INT_COLUMNS if name in data}
+        # Tables stored before units were tracked have none
+        columns.setdefault("unit", np.full(len(columns["row"]), -1, dtype="<i4"))
+        return cls(value=np.frombuffer(data["value"], dtype="<f8"), sheet_names=list(data["sheet_names"]),
+                   file_names=list(data["file_names"]), strings=list(data["strings"]), **columns)
+
+    @classmethod
+    def concat(cls, tables: Sequence["NumberTable"], file_names: Optional[List[str]] = None) -> "NumberTable":
+        """Join tables, re-interning their string tables.
+
+        With ``file_names``, every number of ``tables[i]`` is attributed to
+        ``file_names[i]``; otherwise each table keeps its own file names.
+        """
+        builder = NumberTableBuilder()
+        parts = {name: [] for name in ("value", *INT_COLUMNS)}
+        for i, table in enumerate(tables):
+            string_ids = np.array([builder.intern(text) for text in table.strings], dtype=np.int32)
+            sheet_ids = np.array([builder.sheet_id(name) for name in table.sheet_names], dtype=np.int32)
+            if file_names is not None:
+                file_ids = np.full(len(table), builder.file_id(file_names[i]), dtype=np.int32)
+            else:
+                file_ids = np.array([builder.file_id(name) for name in table.file_names], dtype=np.int32)[table.file]
+
+            parts["value"].append(table.value)
+            parts["row"].append(table.row)
+            parts["column"].append(table.column)
+            parts["sheet"].append(sheet_ids[table.sheet])
+            parts["file"].append(file_ids)
+            parts["context"].append(string_ids[table.context])
+            # -1 marks a missing original text or unit, so map them through a shifted lookup
+            shifted_ids = np.concatenate(([-1], string_ids)).astype(np.int32)
+            parts["original_text"].append(shifted_ids[table.original_text + 1])
+            parts["unit"].append(shifted_ids[table.unit + 1])
+
+        columns = {
+            name: np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64 if name == "value" else np.int32)
+            for name, arrays in parts.items()
+        }
+        return cls(sheet_names=builder.sheet_names, file_names=builder.file_names, strings=builder.strings, **columns)
+
+
+class NumberTableBuilder:
+    """Appends numbers one cell at a time into compact typed arrays"""
+
+    def __init__(self, file_name: Optional[str] = None):
+        self.values = array("d")
+        self.columns = {name: array("i") for name in INT_COLUMNS}
+        self.strings: List[str] = []
+        self.sheet_names: List[str] = []
+        self.file_names: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._sheet_ids: Dict[str, int] = {}
+        self._file_ids: Dict[str, int] = {}
+        self._file = self.file_id(file_name) if file_name is not None else 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def sheet_id(self, sheet_name: str) -> int:
+        sheet_id = self._sheet_ids.get(sheet_name)
+        if sheet_id is None:
+            sheet_id = self._sheet_ids[sheet_name] = len(self.sheet_names)
+            self.sheet_names.append(sheet_name)
+        return sheet_id
+
+    def file_id(self, file_name: str) -> int:
+        file_id = self._file_ids.get(file_name)
+        if file_id is None:
+            file_id = self._file_ids[file_name] = len(self.file_names)
+            self.file_names.append(file_name)
+        return file_id
+
+    def add(self, value: float, row: int, column: int, sheet_id: int, context: str,
+            original_text: Optional[str] = None, unit: Optional[str] = None) -> None:
+        self.values.append(value)
+        self.columns["row"].append(row)
+        self.columns["column"].append(column)
+        self.columns["sheet"].append(sheet_id)
+        self.columns["file"].append(self._file)
+        self.columns["context"].append(self.intern(context))
+        self.columns["original_text"].append(self.intern(original_text) if original_text is not None else -1)
+        self.columns["unit"].append(self.intern(unit) if unit is not None else -1)
+
+    def add_many(self, values: np.ndarray, rows: np.ndarray, columns: np.ndarray, sheet_id: int,
+                 contexts: Sequence[str], units: Optional[Sequence[Optional[str]]] = None) -> None:
+        """Append a batch of numbers without original texts from parallel arrays"""
+        count = len(values)
+        self.values.frombytes(np.asarray(values, dtype=np.float64).tobytes())
+        self.columns["row"].frombytes(np.asarray(rows, dtype=np.int32).tobytes())
+        self.columns["column"].frombytes(np.asarray(columns, dtype=np.int32).tobytes())
+        self.columns["sheet"].frombytes(np.full(count, sheet_id, dtype=np.int32).tobytes())
+        self.columns["file"].frombytes(np.full(count, self._file, dtype=np.int32).tobytes())
+        self.columns["context"].extend(self.intern(context) for context in contexts)
+        self.columns["original_text"].frombytes(np.full(count, -1, dtype=np.int32).tobytes())
+        if units is None:
+            self.columns["unit"].frombytes(np.full(count, -1, dtype=np.int32).tobytes())
+        else:
+            self.columns["unit"].extend(self.intern(unit) if unit is not None else -1 for unit in units)
+
+    def fingerprint_since(self, start: int) -> bytes:
+        """Return the bytes describing numbers added from ``start`` on, for hashing a sheet"""
+        rows = [
+            self.values[start:].tobytes(),
+            self.columns["row"][start:].tobytes(),
+            self.columns["column"][start:].tobytes()
+        ]
+        texts = [self.strings[i] for i in self.columns["context"][start:]]
+        texts += [self.strings[i] if i >= 0 else "" for i in self.columns["original_text"][start:]]
+        return b"".join(rows) + "\x1f".join(texts).encode("utf-8")
+
+    def build(self) -> NumberTable:
+        columns = {name: np.frombuffer(values, dtype=np.int32).copy() for name, values in self.columns.items()}
+        return NumberTable(value=np.frombuffer(self.values, dtype=np.float64).copy(),
+                           sheet_names=list(self.sheet_names), file_names=list(self.file_names),
+                           strings=list(self.strings), **columns)
+
+
+def msgpack_default(obj: Any) -> Any:
+    """msgpack ``default`` hook that packs NumberTables as an extension type"""
+    if isinstance(obj, NumberTable):
+        return msgpack.ExtType(MSGPACK_EXT_CODE, msgpack.packb(obj.to_dict(), use_bin_type=True))
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """msgpack ``ext_hook`` that restores NumberTables"""
+    if code == MSGPACK_EXT_CODE:
+        return NumberTable.from_dict(msgpack.unpackb(data, raw=False))
+    return msgpack.ExtType(code, data)
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import msgpack
+
+from number_table import msgpack_default, msgpack_ext_hook
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parser output keyed by content hash, with size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(
+            os.path.getsize(os.path.join(cache_dir, name))
+            for name in os.listdir(cache_dir) if name.endswith(".msgpack")
+        )
+
+    def make_key(self, kind: str, content_hash: str, version: str) -> str:
+        """Build a cache key from the parser kind, content hash and parser version"""
+        return f"{kind}-v{version}-{content_hash}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = msgpack.unpackb(f.read(), raw=False, strict_map_key=False, ext_hook=msgpack_ext_hook)
+            # Touch the entry so eviction treats it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except ValueError as e:
+            # msgpack raises ValueError subclasses for truncated or corrupt payloads
+            print(f"Discarding unreadable cache entry {key}: {str(e)}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting least recently used entries beyond the size limit"""
+        payload = msgpack.packb(value, use_bin_type=True, default=msgpack_default)
+        if len(payload) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            # Atomic rename so concurrent readers never see a partial entry
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self.writes += 1
+            self._total_bytes += len(payload) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its size limit"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".msgpack"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Resync with the directory in case another process wrote to it
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.msgpack")
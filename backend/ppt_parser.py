@@ -1,164 +1,240 @@
 from pptx import Presentation
+from pptx.shapes.group import GroupShape
+import hashlib
+import json
 import re
-from typing import List, Dict, Any
+from decimal import Decimal
+from io import BytesIO
+from typing import BinaryIO, Iterator, List, Dict, Any, Union
 import os
+import time
+
+from telemetry import telemetry
+
+# Bump when parser output changes so cached results are not reused
+PARSER_VERSION = "6"
+
+# Single tokenizer for every number format: optional currency, the number itself,
+# then an optional percent sign or scale unit. Each numeric span matches once.
+NUMBER_TOKEN_PATTERN = re.compile(r"""
+    (?:(?P<currency>[₹$]|\bRs\.?|\bINR)\s*)?
+    (?P<number>\d+(?:,\d+)*(?:\.\d+)?|\.\d+)
+    (?:
+        \s*(?P<percent>%)
+      | \s*(?P<unit>crores?|crs?|lakhs?|lacs?|lac|millions?|mn|billions?|bn|thousands?|[kmb])(?![a-z])
+    )?
+""", re.IGNORECASE | re.VERBOSE)
+
+# Multipliers keyed by the lowercased unit with any plural "s" removed
+UNIT_MULTIPLIERS = {
+    "crore": 10000000,  # 1 Crore = 10 Million
+    "cr": 10000000,
+    "lakh": 100000,  # 1 Lakh = 100,000
+    "lac": 100000,
+    "thousand": 1000,
+    "k": 1000,
+    "million": 1000000,
+    "mn": 1000000,
+    "m": 1000000,
+    "billion": 1000000000,
+    "bn": 1000000000,
+    "b": 1000000000,
+}
 
 class PPTParser:
-    def __init__(self):
-        # Regex patterns for different number formats
-        self.number_patterns = [
-            r'₹\s*[\d,]+\.?\d*\s*[KkMmBbCrLacslacs]*',  # Indian currency
-            r'\$\s*[\d,]+\.?\d*\s*[KkMmBb]*',  # USD
-            r'[\d,]+\.?\d*\s*%',  # Percentages
-            r'[\d,]+\.?\d*\s*[KkMmBbCrLacslacs]+',  # Numbers with units
-            r'[\d,]+\.?\d*',  # Plain numbers
-        ]
+    def __init__(self, include_charts: bool = True, include_notes: bool = True):
+        self.number_pattern = NUMBER_TOKEN_PATTERN
+        self.include_charts = include_charts  # Audit the data points behind charts
+        self.include_notes = include_notes  # Audit figures quoted in speaker notes
         
-    def parse_presentation(self, ppt_path: str) -> List[Dict[str, Any]]:
-        """Parse PowerPoint presentation and extract slides with numbers"""
+    def parse_presentation(self, source: Union[str, bytes, BinaryIO]) -> List[Dict[str, Any]]:
+        """Parse PowerPoint presentation from a path, its bytes or a file object, and extract slides with numbers"""
+        slides_data = list(self.iter_slides(source))
+        print(f"Parsed {len(slides_data)} slides from presentation")
+        return slides_data
+    
+    def iter_slides(self, source: Union[str, bytes, BinaryIO]) -> Iterator[Dict[str, Any]]:
+        """Yield each slide with its numbers as soon as it is parsed.
+        
+        Slides are read one at a time, so a large deck can be matched while it
+        is still being parsed instead of after every slide is in memory.
+        """
         try:
-            prs = Presentation(ppt_path)
-            slides_data = []
-            
+            prs = Presentation(BytesIO(source) if isinstance(source, bytes) else source)
             for slide_idx, slide in enumerate(prs.slides):
-                slide_data = {
-                    "slide_number": slide_idx + 1,
-                    "title": self._extract_slide_title(slide),
-                    "numbers": [],
-                    "text_content": []
-                }
-                
-                # Extract text from all shapes
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text_content = shape.text.strip()
-                        slide_data["text_content"].append(text_content)
-                        
-                        # Find numbers in text
-                        numbers = self._extract_numbers_from_text(text_content)
-                        for number_info in numbers:
-                            number_info["slide_number"] = slide_idx + 1
-                            number_info["context"] = text_content[:100] + "..." if len(text_content) > 100 else text_content
-                            slide_data["numbers"].append(number_info)
-                
-                # Extract from tables if present
-                table_numbers = self._extract_from_tables(slide, slide_idx + 1)
-                slide_data["numbers"].extend(table_numbers)
-                
-                slides_data.append(slide_data)
-            
-            print(f"Parsed {len(slides_data)} slides from presentation")
-            return slides_data
+                start = time.perf_counter()
+                slide_data = self._parse_slide(slide, slide_idx + 1)
+                telemetry.record_span("ppt.slide", time.perf_counter() - start, slide=slide_idx + 1)
+                yield slide_data
             
         except Exception as e:
             print(f"Error parsing presentation: {str(e)}")
             raise Exception(f"Failed to parse presentation: {str(e)}")
     
-    def _extract_slide_title(self, slide) -> str:
-        """Extract title from slide"""
-        for shape in slide.shapes:
-            if hasattr(shape, "text") and shape.text.strip():
-                # Assume first text shape is title
-                return shape.text.strip()
-        return f"Slide {slide.slide_id}"
+    def _parse_slide(self, slide, slide_number: int) -> Dict[str, Any]:
+        """Extract a slide's numbers in one walk over its shapes, descending into groups.
+        
+        Numbers keep the order of the previous separate passes: text shapes,
+        then tables, then charts and the speaker notes.
+        """
+        slide_data = {"slide_number": slide_number, "title": None, "numbers": [], "text_content": []}
+        table_numbers, chart_numbers = [], []
+        # A text repeated in several shapes yields the same spans, so each is parsed once
+        seen_texts = set()
+        
+        for shape in self._iter_shapes(slide.shapes):
+            if shape.has_text_frame:
+                text_content = shape.text_frame.text.strip()  # Read once; every access rebuilds it from XML
+                if not text_content:
+                    continue
+                if slide_data["title"] is None:
+                    slide_data["title"] = text_content  # Assume first text shape is title
+                self._add_text_numbers(text_content, slide_number, slide_data, seen_texts)
+            elif shape.has_table:
+                table_numbers.extend(self._extract_from_table(shape.table, slide_number))
+            elif shape.has_chart and self.include_charts:
+                chart_numbers.extend(self._extract_from_chart(shape.chart, slide_number))
+        
+        slide_data["numbers"].extend(table_numbers)
+        slide_data["numbers"].extend(chart_numbers)
+        
+        if self.include_notes and slide.has_notes_slide:
+            notes_frame = slide.notes_slide.notes_text_frame
+            notes_text = notes_frame.text.strip() if notes_frame is not None else ""
+            if notes_text:
+                for number_info in self._add_text_numbers(notes_text, slide_number, slide_data, seen_texts):
+                    number_info["speaker_notes"] = True
+        
+        if slide_data["title"] is None:
+            slide_data["title"] = f"Slide {slide.slide_id}"
+        slide_data["fingerprint"] = self._slide_fingerprint(slide_data["numbers"])
+        return slide_data
+    
+    def _iter_shapes(self, shapes) -> Iterator[Any]:
+        """Yield every shape once, with the members of group shapes in place of the group"""
+        for shape in shapes:
+            # shape_type raises on autoshapes without a preset geometry, so groups are told by class
+            if isinstance(shape, GroupShape):
+                yield from self._iter_shapes(shape.shapes)
+            else:
+                yield shape
+    
+    def _slide_fingerprint(self, numbers: List[Dict[str, Any]]) -> str:
+        """Hash everything matching depends on, so unchanged slides can reuse earlier results"""
+        content = [
+            [n["raw_text"], n["parsed_value"], n["context"], n["type"], n.get("table_position"),
+             n.get("chart_position"), n.get("speaker_notes", False)]
+            for n in numbers
+        ]
+        return hashlib.sha256(json.dumps(content).encode("utf-8")).hexdigest()
+    
+    def _add_text_numbers(self, text_content: str, slide_number: int, slide_data: Dict[str, Any],
+                          seen_texts: set) -> List[Dict[str, Any]]:
+        """Add a text's numbers to the slide, unless the slide already has the same text"""
+        if text_content in seen_texts:
+            return []
+        seen_texts.add(text_content)
+        slide_data["text_content"].append(text_content)
+        
+        numbers = self._extract_numbers_from_text(text_content)
+        context = text_content[:100] + "..." if len(text_content) > 100 else text_content
+        for number_info in numbers:
+            number_info["slide_number"] = slide_number
+            number_info["context"] = context
+        slide_data["numbers"].extend(numbers)
+        return numbers
     
     def _extract_numbers_from_text(self, text: str) -> List[Dict[str, Any]]:
-        """Extract numbers and their context from text"""
+        """Extract numbers and their context from text in a single tokenizer pass"""
         numbers = []
         
-        for pattern in self.number_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                number_text = match.group().strip()
-                
-                # Get surrounding context
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end].strip()
-                
-                # Parse the number
-                parsed_number = self._parse_number(number_text)
-                
-                if parsed_number is not None:
-                    numbers.append({
-                        "raw_text": number_text,
-                        "parsed_value": parsed_number,
-                        "context": context,
-                        "position": match.start(),
-                        "type": self._classify_number_type(number_text)
-                    })
+        for match in self.number_pattern.finditer(text):
+            # Get surrounding context
+            start = max(0, match.start() - 50)
+            end = min(len(text), match.end() + 50)
+            context = text[start:end].strip()
+            
+            numbers.append({
+                "raw_text": match.group(),
+                "parsed_value": self._token_value(match),
+                "context": context,
+                "position": match.start(),
+                "type": self._token_type(match)
+            })
         
         return numbers
     
-    def _extract_from_tables(self, slide, slide_number: int) -> List[Dict[str, Any]]:
-        """Extract numbers from tables in slide"""
+    def _extract_from_table(self, table, slide_number: int) -> List[Dict[str, Any]]:
+        """Extract numbers from a table's cells"""
         numbers = []
         
-        for shape in slide.shapes:
-            if shape.has_table:
-                table = shape.table
-                for row_idx, row in enumerate(table.rows):
-                    for col_idx, cell in enumerate(row.cells):
-                        if cell.text.strip():
-                            cell_numbers = self._extract_numbers_from_text(cell.text)
-                            for number_info in cell_numbers:
-                                number_info["slide_number"] = slide_number
-                                number_info["table_position"] = f"Row {row_idx + 1}, Col {col_idx + 1}"
-                                numbers.append(number_info)
+        for row_idx, row in enumerate(table.rows):
+            for col_idx, cell in enumerate(row.cells):
+                cell_text = cell.text
+                if cell_text.strip():
+                    for number_info in self._extract_numbers_from_text(cell_text):
+                        number_info["slide_number"] = slide_number
+                        number_info["table_position"] = f"Row {row_idx + 1}, Col {col_idx + 1}"
+                        numbers.append(number_info)
         
         return numbers
     
-    def _parse_number(self, number_text: str) -> float:
-        """Parse number text to float value"""
-        try:
-            # Remove currency symbols and spaces
-            clean_text = re.sub(r'[₹$\s]', '', number_text)
-            
-            # Handle units
-            multiplier = 1
-            if re.search(r'[Cc]r', clean_text, re.IGNORECASE):
-                multiplier = 10000000  # 1 Crore = 10 Million
-                clean_text = re.sub(r'[Cc]r.*', '', clean_text, flags=re.IGNORECASE)
-            elif re.search(r'[Ll]ac', clean_text, re.IGNORECASE):
-                multiplier = 100000  # 1 Lakh = 100,000
-                clean_text = re.sub(r'[Ll]ac.*', '', clean_text, flags=re.IGNORECASE)
-            elif re.search(r'[Kk]', clean_text):
-                multiplier = 1000
-                clean_text = re.sub(r'[Kk].*', '', clean_text)
-            elif re.search(r'[Mm]', clean_text):
-                multiplier = 1000000
-                clean_text = re.sub(r'[Mm].*', '', clean_text)
-            elif re.search(r'[Bb]', clean_text):
-                multiplier = 1000000000
-                clean_text = re.sub(r'[Bb].*', '', clean_text)
-            
-            # Handle percentage
-            is_percentage = '%' in clean_text
-            clean_text = clean_text.replace('%', '')
-            
-            # Remove commas and parse
-            clean_text = clean_text.replace(',', '')
-            number = float(clean_text)
-            
-            # Apply multiplier
-            number *= multiplier
-            
-            # Convert percentage to decimal if needed for calculations
-            if is_percentage:
-                return number  # Keep as percentage for display
-            
-            return number
-            
-        except (ValueError, AttributeError):
-            return None
+    def _extract_from_chart(self, chart, slide_number: int) -> List[Dict[str, Any]]:
+        """Extract the data points of a chart's series, with the chart title, series and category as context"""
+        numbers = []
+        title = ""
+        if chart.has_title and chart.chart_title.has_text_frame:
+            title = chart.chart_title.text_frame.text.strip()
+        
+        for plot in chart.plots:
+            try:
+                categories = [str(category) for category in plot.categories]
+            except Exception:  # XY and bubble charts have no categories
+                categories = []
+            for series in plot.series:
+                for point_idx, value in enumerate(series.values):
+                    if value is None:
+                        continue
+                    category = categories[point_idx] if point_idx < len(categories) else ""
+                    numbers.append({
+                        "raw_text": self._chart_value_text(value),
+                        "parsed_value": float(value),
+                        "context": " ".join(part for part in (title, series.name, category) if part),
+                        "position": point_idx,
+                        "type": "number",
+                        "slide_number": slide_number,
+                        "chart_position": f"{series.name}, {category or f'Point {point_idx + 1}'}"
+                    })
+        
+        return numbers
+    
+    def _chart_value_text(self, value: float) -> str:
+        """Write a chart value in full, as "1200000" or "12.3456789", never in exponent form"""
+        value = float(value)
+        if value.is_integer():
+            return str(int(value))
+        # The shortest repr keeps every significant digit; Decimal writes it without an exponent
+        return format(Decimal(repr(value)), "f")
+    
+    def _token_value(self, match: re.Match) -> float:
+        """Resolve the absolute value of a tokenizer match, applying its unit"""
+        number = float(match.group("number").replace(",", ""))
+        
+        # Percentages are kept as percentages for display
+        unit = match.group("unit")
+        if unit:
+            unit = unit.lower()
+            number *= UNIT_MULTIPLIERS.get(unit, UNIT_MULTIPLIERS.get(unit[:-1], 1))
+        
+        return number
     
-    def _classify_number_type(self, number_text: str) -> str:
-        """Classify the type of number"""
-        if '₹' in number_text or '$' in number_text:
+    def _token_type(self, match: re.Match) -> str:
+        """Classify the type of number from a tokenizer match"""
+        if match.group("currency"):
             return "currency"
-        elif '%' in number_text:
+        elif match.group("percent"):
             return "percentage"
-        elif re.search(r'[KkMmBbCrLac]', number_text, re.IGNORECASE):
+        elif match.group("unit"):
             return "metric"
         else:
-            return "number"
\ No newline at end of file
+            return "number"
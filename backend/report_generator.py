@@ -1,15 +1,79 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-import pandas as pd
-import tempfile
-import os
-from typing import List, Dict, Any
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.comments import Comment
+from openpyxl.styles import Font, PatternFill
+import csv
+from collections import Counter
+from io import BytesIO, StringIO
+from typing import List, Dict, Any, Iterator
 from datetime import datetime
+import time
+
+from telemetry import telemetry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # In requirements.txt; without it only the Parquet export is unavailable (501)
+    pa = pq = None
+
+PARQUET_AVAILABLE = pq is not None
+
+# Bump when report layout changes so cached reports are not reused
+REPORT_VERSION = "2"
 
 class ReportGenerator:
+    PDF_HEADER = ['Slide', 'PPT Text', 'Status', 'PPT Value', 'Excel Value', 'Suggested Fix', 'Excel Source']
+    SLIDE_SUMMARY_HEADER = ['Slide', 'Numbers', 'Matches', 'Mismatches', 'Untraceable', 'Match Rate']
+    PDF_COLUMN_WIDTHS = [0.5*inch, 1.5*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch, 1.5*inch]
+    
+    # Shared by every results table; status colours are added per table
+    RESULT_TABLE_STYLE = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]
+    
+    STATUS_COLORS = {
+        "Match": colors.lightgreen,
+        "Mismatch": colors.lightcoral,
+        "Untraceable": colors.lightyellow
+    }
+    
+    # Columns of the CSV, Parquet and XLSX exports: (header, result key)
+    EXPORT_COLUMNS = [
+        ('Slide_Number', 'slide'),
+        ('PPT_Text', 'text'),
+        ('Status', 'status'),
+        ('PPT_Value', 'ppt_value'),
+        ('Excel_Value', 'excel_value'),
+        ('Suggested_Fix', 'suggested_fix'),
+        ('Excel_File', 'excel_file'),
+        ('Excel_Sheet', 'excel_sheet'),
+        ('Excel_Cell', 'cell'),
+        ('Reasoning', 'reasoning'),
+        ('Context', 'context'),
+        ('Confidence', 'confidence')
+    ]
+    
+    XLSX_STATUS_FILLS = {
+        status: PatternFill("solid", fgColor=color.hexval()[2:].upper())
+        for status, color in STATUS_COLORS.items()
+    }
+    
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.title_style = ParagraphStyle(
@@ -21,15 +85,17 @@ class ReportGenerator:
             alignment=1  # Center alignment
         )
         
-    def generate_pdf_report(self, audit_results: List[Dict[str, Any]]) -> str:
-        """Generate PDF audit report"""
+    @telemetry.span("report.pdf")
+    def generate_pdf_report(self, audit_results: List[Dict[str, Any]], rows_per_table: int = 200) -> bytes:
+        """Generate PDF audit report and return its bytes.
+        
+        The detailed results are laid out as a series of tables of at most
+        ``rows_per_table`` rows, each repeating the header, so reportlab only
+        ever splits a small table across pages.
+        """
         try:
-            # Create temporary file
-            temp_dir = tempfile.mkdtemp()
-            pdf_path = os.path.join(temp_dir, f"audit_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(pdf_path, pagesize=A4)
+            buffer = BytesIO()
+            doc = SimpleDocTemplate(buffer, pagesize=A4)
             story = []
             
             # Title
@@ -39,16 +105,18 @@ class ReportGenerator:
             
             # Summary statistics
             total_numbers = len(audit_results)
-            matches = len([r for r in audit_results if r["status"] == "Match"])
-            mismatches = len([r for r in audit_results if r["status"] == "Mismatch"])
-            untraceable = len([r for r in audit_results if r["status"] == "Untraceable"])
+            status_counts = Counter(r["status"] for r in audit_results)
+            matches = status_counts["Match"]
+            mismatches = status_counts["Mismatch"]
+            untraceable = status_counts["Untraceable"]
+            percent = lambda count: count / total_numbers * 100 if total_numbers else 0.0
             
             summary_text = f"""
             <b>Summary:</b><br/>
             Total Numbers Analyzed: {total_numbers}<br/>
-            Matches: {matches} ({matches/total_numbers*100:.1f}%)<br/>
-            Mismatches: {mismatches} ({mismatches/total_numbers*100:.1f}%)<br/>
-            Untraceable: {untraceable} ({untraceable/total_numbers*100:.1f}%)<br/>
+            Matches: {matches} ({percent(matches):.1f}%)<br/>
+            Mismatches: {mismatches} ({percent(mismatches):.1f}%)<br/>
+            Untraceable: {untraceable} ({percent(untraceable):.1f}%)<br/>
             Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             """
             
@@ -56,95 +124,181 @@ class ReportGenerator:
             story.append(summary)
             story.append(Spacer(1, 30))
             
-            # Detailed results table
             if audit_results:
-                story.append(Paragraph("Detailed Audit Results", self.styles['Heading2']))
+                story.append(Paragraph("Results by Slide", self.styles['Heading2']))
                 story.append(Spacer(1, 10))
+                story.extend(self._slide_summary_tables(audit_results, rows_per_table))
+                story.append(PageBreak())
                 
-                # Prepare table data
-                table_data = [['Slide', 'PPT Text', 'Status', 'PPT Value', 'Excel Value', 'Suggested Fix', 'Excel Source']]
-                
-                for result in audit_results:
-                    row = [
-                        str(result.get("slide", "")),
-                        result.get("text", "")[:30] + "..." if len(result.get("text", "")) > 30 else result.get("text", ""),
-                        result.get("status", ""),
-                        str(result.get("ppt_value", "")),
-                        str(result.get("excel_value", "")) if result.get("excel_value") is not None else "N/A",
-                        result.get("suggested_fix", "") or "N/A",
-                        f"{result.get('excel_file', '')}/{result.get('excel_sheet', '')}" if result.get('excel_file') else "N/A"
-                    ]
-                    table_data.append(row)
-                
-                # Create table
-                table = Table(table_data, colWidths=[0.5*inch, 1.5*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch, 1.5*inch])
-                
-                # Style the table
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
-                
-                # Color code by status
-                for i, result in enumerate(audit_results, 1):
-                    if result["status"] == "Match":
-                        table.setStyle(TableStyle([('BACKGROUND', (2, i), (2, i), colors.lightgreen)]))
-                    elif result["status"] == "Mismatch":
-                        table.setStyle(TableStyle([('BACKGROUND', (2, i), (2, i), colors.lightcoral)]))
-                    elif result["status"] == "Untraceable":
-                        table.setStyle(TableStyle([('BACKGROUND', (2, i), (2, i), colors.lightyellow)]))
+                # Detailed results, in page-sized tables sharing one style
+                story.append(Paragraph("Detailed Audit Results", self.styles['Heading2']))
+                story.append(Spacer(1, 10))
                 
-                story.append(table)
+                for start in range(0, total_numbers, rows_per_table):
+                    chunk = audit_results[start:start + rows_per_table]
+                    table_data = [self.PDF_HEADER] + [self._pdf_row(result) for result in chunk]
+                    table = Table(table_data, colWidths=self.PDF_COLUMN_WIDTHS, repeatRows=1,
+                                  style=TableStyle(self.RESULT_TABLE_STYLE + self._status_styles(chunk)))
+                    story.append(table)
             
             # Build PDF
             doc.build(story)
-            print(f"PDF report generated: {pdf_path}")
-            return pdf_path
+            pdf = buffer.getvalue()
+            print(f"PDF report generated: {total_numbers} results, {len(pdf)} bytes")
+            return pdf
             
         except Exception as e:
             print(f"Error generating PDF report: {str(e)}")
             raise Exception(f"Failed to generate PDF report: {str(e)}")
     
-    def generate_csv_report(self, audit_results: List[Dict[str, Any]]) -> str:
-        """Generate CSV audit report"""
+    def _pdf_row(self, result: Dict[str, Any]) -> List[str]:
+        """Format one audit result as a row of the detailed results table"""
+        text = result.get("text", "")
+        return [
+            str(result.get("slide", "")),
+            text[:30] + "..." if len(text) > 30 else text,
+            result.get("status", ""),
+            str(result.get("ppt_value", "")),
+            str(result.get("excel_value", "")) if result.get("excel_value") is not None else "N/A",
+            result.get("suggested_fix", "") or "N/A",
+            f"{result.get('excel_file', '')}/{result.get('excel_sheet', '')}" if result.get('excel_file') else "N/A"
+        ]
+    
+    def _status_styles(self, results: List[Dict[str, Any]]) -> List[tuple]:
+        """Background commands for the status column, one per run of rows with the same status"""
+        commands = []
+        run_start = 0
+        for i in range(1, len(results) + 1):
+            if i == len(results) or results[i]["status"] != results[run_start]["status"]:
+                color = self.STATUS_COLORS.get(results[run_start]["status"])
+                if color is not None:
+                    # Row 0 is the header, so result i sits in table row i + 1
+                    commands.append(('BACKGROUND', (2, run_start + 1), (2, i), color))
+                run_start = i
+        return commands
+    
+    def _slide_summary_tables(self, audit_results: List[Dict[str, Any]], rows_per_table: int) -> List[Table]:
+        """Per-slide summary as PDF tables of at most rows_per_table rows"""
+        rows = [[str(value) for value in row] for row in self._slide_summary_rows(audit_results)]
+        return [
+            Table([self.SLIDE_SUMMARY_HEADER] + rows[start:start + rows_per_table], repeatRows=1,
+                  style=TableStyle(self.RESULT_TABLE_STYLE))
+            for start in range(0, len(rows), rows_per_table)
+        ]
+    
+    def _slide_summary_rows(self, audit_results: List[Dict[str, Any]]) -> List[List[Any]]:
+        """Per-slide counts of numbers by status, with each slide's match rate"""
+        slides = {}
+        for result in audit_results:
+            counts = slides.setdefault(result.get("slide", ""), Counter())
+            counts[result["status"]] += 1
+        
+        rows = []
+        for slide, counts in slides.items():
+            total = sum(counts.values())
+            rows.append([
+                slide, total, counts["Match"], counts["Mismatch"], counts["Untraceable"],
+                f"{counts['Match'] / total * 100:.1f}%"
+            ])
+        return rows
+    
+    def iter_csv_report(self, audit_results: List[Dict[str, Any]], rows_per_chunk: int = 1000) -> Iterator[str]:
+        """Generate CSV audit report as chunks of text, for streaming straight into a response"""
+        # The span leaves out time spent sending chunks between rows
+        seconds, start = 0.0, time.perf_counter()
         try:
-            # Create temporary file
-            temp_dir = tempfile.mkdtemp()
-            csv_path = os.path.join(temp_dir, f"audit_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            buffer = StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow([header for header, _ in self.EXPORT_COLUMNS])
             
-            # Convert to DataFrame
-            df_data = []
-            for result in audit_results:
-                df_data.append({
-                    'Slide_Number': result.get("slide", ""),
-                    'PPT_Text': result.get("text", ""),
-                    'Status': result.get("status", ""),
-                    'PPT_Value': result.get("ppt_value", ""),
-                    'Excel_Value': result.get("excel_value", ""),
-                    'Suggested_Fix': result.get("suggested_fix", ""),
-                    'Excel_File': result.get("excel_file", ""),
-                    'Excel_Sheet': result.get("excel_sheet", ""),
-                    'Excel_Cell': result.get("cell", ""),
-                    'Reasoning': result.get("reasoning", ""),
-                    'Context': result.get("context", ""),
-                    'Confidence': result.get("confidence", "")
-                })
-            
-            df = pd.DataFrame(df_data)
-            df.to_csv(csv_path, index=False)
-            
-            print(f"CSV report generated: {csv_path}")
-            return csv_path
+            for i, result in enumerate(audit_results, 1):
+                writer.writerow(self._export_row(result))
+                if i % rows_per_chunk == 0:
+                    chunk = buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    seconds += time.perf_counter() - start
+                    yield chunk
+                    start = time.perf_counter()
+            
+            chunk = buffer.getvalue()
+            seconds += time.perf_counter() - start
+            yield chunk
+            print(f"CSV report generated: {len(audit_results)} results")
             
         except Exception as e:
             print(f"Error generating CSV report: {str(e)}")
-            raise Exception(f"Failed to generate CSV report: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to generate CSV report: {str(e)}")
+        finally:
+            telemetry.record_span("report.csv", seconds, rows=len(audit_results))
+    
+    @telemetry.span("report.parquet")
+    def generate_parquet_report(self, audit_results: List[Dict[str, Any]]) -> bytes:
+        """Generate Parquet audit report and return its bytes; needs pyarrow"""
+        if pq is None:
+            raise Exception("Parquet export requires pyarrow")
+        try:
+            types = {
+                'slide': pa.int32(), 'ppt_value': pa.float64(), 'excel_value': pa.float64(), 'confidence': pa.float64()
+            }
+            columns = {
+                header: pa.array([result.get(key) for result in audit_results], type=types.get(key, pa.string()))
+                for header, key in self.EXPORT_COLUMNS
+            }
+            sink = pa.BufferOutputStream()
+            pq.write_table(pa.table(columns), sink)
+            
+            parquet = sink.getvalue().to_pybytes()
+            print(f"Parquet report generated: {len(audit_results)} results, {len(parquet)} bytes")
+            return parquet
+            
+        except Exception as e:
+            print(f"Error generating Parquet report: {str(e)}")
+            raise Exception(f"Failed to generate Parquet report: {str(e)}")
+    
+    @telemetry.span("report.xlsx")
+    def generate_xlsx_report(self, audit_results: List[Dict[str, Any]]) -> bytes:
+        """Generate XLSX audit report with colour-coded statuses and the reasoning as cell comments"""
+        try:
+            # Write-only mode streams rows to the archive instead of keeping every cell object
+            workbook = Workbook(write_only=True)
+            header_font = Font(bold=True)
+            status_column = [key for _, key in self.EXPORT_COLUMNS].index('status')
+            
+            sheet = workbook.create_sheet("Audit Results")
+            sheet.freeze_panes = "A2"
+            sheet.append([self._xlsx_header_cell(sheet, header, header_font) for header, _ in self.EXPORT_COLUMNS])
+            for result in audit_results:
+                row = self._export_row(result)
+                status_cell = WriteOnlyCell(sheet, value=row[status_column])
+                fill = self.XLSX_STATUS_FILLS.get(result.get("status"))
+                if fill is not None:
+                    status_cell.fill = fill
+                if result.get("status") != "Match" and result.get("reasoning"):
+                    # Only results needing attention are annotated, keeping the comment parts small
+                    status_cell.comment = Comment(result["reasoning"], "Deck Audit")
+                row[status_column] = status_cell
+                sheet.append(row)
+            
+            summary = workbook.create_sheet("Slide Summary")
+            summary.append([self._xlsx_header_cell(summary, header, header_font) for header in self.SLIDE_SUMMARY_HEADER])
+            for row in self._slide_summary_rows(audit_results):
+                summary.append(row)
+            
+            buffer = BytesIO()
+            workbook.save(buffer)
+            xlsx = buffer.getvalue()
+            print(f"XLSX report generated: {len(audit_results)} results, {len(xlsx)} bytes")
+            return xlsx
+            
+        except Exception as e:
+            print(f"Error generating XLSX report: {str(e)}")
+            raise Exception(f"Failed to generate XLSX report: {str(e)}")
+    
+    def _export_row(self, result: Dict[str, Any]) -> List[Any]:
+        return [result.get(key, "") for _, key in self.EXPORT_COLUMNS]
+    
+    def _xlsx_header_cell(self, sheet, header: str, font: Font) -> WriteOnlyCell:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = font
+        return cell
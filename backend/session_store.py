@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import msgpack
+
+from number_table import msgpack_default, msgpack_ext_hook
+
+
+def _pack(value: Any) -> bytes:
+    """Serialize a session field to compressed msgpack"""
+    return zlib.compress(msgpack.packb(value, use_bin_type=True, default=msgpack_default), 1)
+
+
+def _unpack(payload: bytes) -> Any:
+    return msgpack.unpackb(zlib.decompress(payload), raw=False, strict_map_key=False, ext_hook=msgpack_ext_hook)
+
+
+class SessionStore(ABC):
+    """Per-session storage of parsed data and audit results, one serialized value per field"""
+
+    # Whether other worker processes see the same data
+    shared = False
+
+    @abstractmethod
+    def exists(self, session_id: str) -> bool:
+        """Whether the session is live; checking also marks it recently used"""
+
+    @abstractmethod
+    def get(self, session_id: str, field: str) -> Optional[Any]:
+        """Return a session field, or None if the session or field is missing"""
+
+    @abstractmethod
+    def set(self, session_id: str, field: str, value: Any) -> None:
+        """Store a session field, creating the session if needed"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove a session and all its fields"""
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU session store with a time-to-live"""
+
+    def __init__(self, max_sessions: int = 100, ttl_seconds: float = 24 * 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            return self._touch(session_id) is not None
+
+    def get(self, session_id: str, field: str) -> Optional[Any]:
+        with self._lock:
+            session = self._touch(session_id)
+            payload = session["fields"].get(field) if session else None
+        return _unpack(payload) if payload is not None else None
+
+    def set(self, session_id: str, field: str, value: Any) -> None:
+        payload = _pack(value)
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                session = {"fields": {}, "last_access": time.time()}
+                self._sessions[session_id] = session
+            session["fields"][field] = payload
+
+            # Evict least recently used sessions beyond the limit
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return a live session and mark it recently used, dropping it if expired"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.time()
+        if now - session["last_access"] > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        session["last_access"] = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a local SQLite file, shared by every worker process on the host"""
+
+    shared = True
+
+    def __init__(self, db_path: str, ttl_seconds: float = 24 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_fields ("
+                "session_id TEXT NOT NULL, field TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (session_id, field))"
+            )
+
+    def exists(self, session_id: str) -> bool:
+        with self._connect() as conn:
+            return self._touch(conn, session_id)
+
+    def get(self, session_id: str, field: str) -> Optional[Any]:
+        with self._connect() as conn:
+            if not self._touch(conn, session_id):
+                return None
+            row = conn.execute(
+                "SELECT data FROM session_fields WHERE session_id = ? AND field = ?", (session_id, field)
+            ).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def set(self, session_id: str, field: str, value: Any) -> None:
+        payload = _pack(value)
+        with self._connect() as conn:
+            self._expire(conn)
+            conn.execute(
+                "INSERT INTO sessions (session_id, last_access) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access",
+                (session_id, time.time())
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO session_fields (session_id, field, data) VALUES (?, ?, ?)",
+                (session_id, field, payload)
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _touch(self, conn: sqlite3.Connection, session_id: str) -> bool:
+        """Mark a live session recently used; return False if it is missing or expired"""
+        now = time.time()
+        updated = conn.execute(
+            "UPDATE sessions SET last_access = ? WHERE session_id = ? AND last_access >= ?",
+            (now, session_id, now - self.ttl_seconds)
+        ).rowcount
+        return updated > 0
+
+    def _expire(self, conn: sqlite3.Connection) -> None:
+        """Delete sessions idle for longer than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        conn.execute(
+            "DELETE FROM session_fields WHERE session_id IN "
+            "(SELECT session_id FROM sessions WHERE last_access < ?)", (cutoff,)
+        )
+        conn.execute("DELETE FROM sessions WHERE last_access < ?", (cutoff,))
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store configured by the SESSION_BACKEND environment variable"""
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", 24 * 3600))
+
+    if backend == "memory":
+        return MemorySessionStore(int(os.getenv("SESSION_MAX_ENTRIES", 100)), ttl_seconds)
+    elif backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", "sessions.db"), ttl_seconds)
+    else:
+        raise ValueError(f"Unsupported session backend: {backend}")
@@ -0,0 +1,379 @@
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    from pyinstrument.renderers import HTMLRenderer
+    from pyinstrument.session import Session as PyinstrumentSession
+except ImportError:  # Request profiles fall back to cProfile
+    PyinstrumentProfiler = HTMLRenderer = PyinstrumentSession = None
+
+PYINSTRUMENT_AVAILABLE = PyinstrumentProfiler is not None
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "deck_audit"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+class Telemetry:
+    """Timing spans and counters for the audit pipeline, exported in the Prometheus text format.
+
+    Spans are aggregated per stage into a count, total and maximum duration.
+    The most recent spans are also kept with their attributes (file, sheet,
+    slide) for inspection. Work done in worker processes is recorded there
+    under ``capture`` and merged back into the parent with ``merge``.
+    """
+
+    def __init__(self, max_recent_spans: int = 500):
+        self.max_recent_spans = max_recent_spans
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset_data()
+
+    def _reset_data(self) -> None:
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.timings: Dict[str, List[float]] = {}  # Stage -> [count, total seconds, max seconds]
+        self.recent_spans = deque(maxlen=self.max_recent_spans)
+
+    def _sink(self) -> "Telemetry":
+        # Inside capture(), this thread records into the capturing instance instead
+        return getattr(self._local, "sink", None) or self
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add to a counter; exported as <prefix>_<name>_total"""
+        sink = self._sink()
+        key = (name, _label_key(labels))
+        with sink._lock:
+            sink.counters[key] = sink.counters.get(key, 0) + value
+
+    def record_span(self, stage: str, seconds: float, **attributes: Any) -> None:
+        sink = self._sink()
+        with sink._lock:
+            timing = sink.timings.setdefault(stage, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+            sink.recent_spans.append({"stage": stage, "seconds": round(seconds, 6), "ended_at": time.time(),
+                                      **attributes})
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block as one span of a stage; attributes may be added to the yielded dict inside it"""
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.record_span(stage, time.perf_counter() - start, **attributes)
+
+    @contextmanager
+    def capture(self) -> Iterator["Telemetry"]:
+        """Record this thread's spans and counters into a fresh instance instead of this one"""
+        captured = Telemetry(self.max_recent_spans)
+        previous = getattr(self._local, "sink", None)
+        self._local.sink = captured
+        try:
+            yield captured
+        finally:
+            self._local.sink = previous
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain, picklable copy of everything recorded"""
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "timings": {stage: list(timing) for stage, timing in self.timings.items()},
+                "recent_spans": list(self.recent_spans)
+            }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add a snapshot taken elsewhere, such as in a worker process"""
+        sink = self._sink()
+        with sink._lock:
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                sink.counters[key] = sink.counters.get(key, 0) + value
+            for stage, (count, total, longest) in snapshot["timings"].items():
+                timing = sink.timings.setdefault(stage, [0, 0.0, 0.0])
+                timing[0] += count
+                timing[1] += total
+                timing[2] = max(timing[2], longest)
+            sink.recent_spans.extend(snapshot["recent_spans"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_data()
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render counters, stage timings and the given gauges in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timings = sorted(self.timings.items())
+
+        lines = []
+        by_name: Dict[str, List[Tuple[LabelKey, float]]] = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+        if timings:
+            metric = f"{METRIC_PREFIX}_stage_seconds"
+            lines.append(f"# HELP {metric} Time spent in each pipeline stage")
+            lines.append(f"# TYPE {metric} summary")
+            for stage, (count, total, _) in timings:
+                labels = _format_labels((("stage", stage),))
+                lines.append(f"{metric}_count{labels} {count}")
+                lines.append(f"{metric}_sum{labels} {total:.6f}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            lines.extend(f"{metric}_max{_format_labels((('stage', stage),))} {longest:.6f}"
+                         for stage, (_, _, longest) in timings)
+
+        for name, value in (gauges or {}).items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide instance used by the parsers, matcher, report generator and API
+telemetry = Telemetry()
+
+
+# The profile of the request being handled, if it asked for one
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# (process, thread) pairs with a profiler running; a thread holds at most one. Keyed by process
+# too, as a worker forked from a profiled thread inherits the set and that thread's ident.
+_profiled_threads = set()
+_profiled_threads_lock = threading.Lock()
+
+
+class _ProfileStats:
+    """cProfile results received from another process, in the shape pstats.Stats loads"""
+
+    def __init__(self, stats: Dict):
+        self.stats = dict(stats)
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _start_profiler(profiler: str, async_mode: bool = False) -> Optional[Any]:
+    """Start profiling the current thread; None if it is already being profiled"""
+    thread_id = (os.getpid(), threading.get_ident())
+    with _profiled_threads_lock:
+        if thread_id in _profiled_threads:
+            return None
+        _profiled_threads.add(thread_id)
+    try:
+        if profiler == "pyinstrument":
+            # On the event loop, async mode only samples the awaiting request's own task
+            running = PyinstrumentProfiler(async_mode="enabled" if async_mode else "disabled")
+            running.start()
+        else:
+            running = cProfile.Profile()
+            running.enable()
+        return running
+    except (RuntimeError, ValueError) as e:  # Another profiling tool is active
+        print(f"Could not start {profiler} profiler: {str(e)}")
+        with _profiled_threads_lock:
+            _profiled_threads.discard(thread_id)
+        return None
+
+
+def _stop_profiler(profiler: str, running: Any) -> Any:
+    """Stop a profiler started on this thread and return its picklable results"""
+    try:
+        if profiler == "pyinstrument":
+            return running.stop().to_json()
+        running.disable()
+        running.create_stats()
+        return running.stats
+    finally:
+        with _profiled_threads_lock:
+            _profiled_threads.discard((os.getpid(), threading.get_ident()))
+
+
+class RequestProfile:
+    """Profiles of every thread and worker process that worked on one request, dumped to one file.
+
+    cProfile results are merged into a pstats file (``.prof``); pyinstrument
+    sessions are combined into an HTML report. Results arriving after the
+    request finished, such as a background audit job's, update the file.
+    """
+
+    def __init__(self, path: str, profiler: str = "cprofile"):
+        self.path = path
+        self.profiler = profiler
+        self.results: List[Any] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, results: Any) -> None:
+        with self._lock:
+            self.results.append(results)
+            if self.closed:
+                self._dump()
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._dump()
+
+    def _dump(self) -> None:
+        if not self.results:
+            return
+        try:
+            if self.profiler == "pyinstrument":
+                session = reduce(PyinstrumentSession.combine, map(PyinstrumentSession.from_json, self.results))
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write(HTMLRenderer().render(session))
+            else:
+                stats = pstats.Stats(_ProfileStats(self.results[0]))
+                for results in self.results[1:]:
+                    stats.add(_ProfileStats(results))
+                stats.dump_stats(self.path)
+        except Exception as e:
+            print(f"Error writing profile {self.path}: {str(e)}")
+
+
+def requested_profiler() -> Optional[str]:
+    """The profiler the current request asked for, to pass to ``traced_call`` in worker processes"""
+    request_profile = current_profile.get()
+    return request_profile.profiler if request_profile else None
+
+
+@contextmanager
+def profiled_thread() -> Iterator[None]:
+    """Profile the current thread for the duration of the block if the current request asked for it.
+
+    Worker threads see the request's profile when they run in a copy of its
+    context, as Starlette's threadpool does.
+    """
+    request_profile = current_profile.get()
+    running = _start_profiler(request_profile.profiler) if request_profile else None
+    try:
+        yield
+    finally:
+        if running is not None:
+            request_profile.add(_stop_profiler(request_profile.profiler, running))
+
+
+def profiled_call(function: Callable, *args: Any) -> Any:
+    """Call a function under ``profiled_thread``, for handing to a threadpool"""
+    with profiled_thread():
+        return function(*args)
+
+
+def traced_call(function: Callable, *args: Any, profiler: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Run a function, returning its result with the telemetry it recorded.
+
+    Submit this to a process pool in place of ``function`` and pass the
+    returned pair to ``traced_result`` in the parent, so spans recorded in
+    workers are not lost. With a ``profiler`` the call is also profiled.
+    """
+    running = _start_profiler(profiler) if profiler else None
+    try:
+        with telemetry.capture() as captured:
+            result = function(*args)
+    finally:
+        profile = _stop_profiler(profiler, running) if running is not None else None
+    snapshot = captured.snapshot()
+    if profile is not None:
+        snapshot["profile"] = profile
+    return result, snapshot
+
+
+def traced_result(traced: Tuple[Any, Dict[str, Any]]) -> Any:
+    """Merge what a ``traced_call`` recorded into this process and return the function's result"""
+    result, snapshot = traced
+    telemetry.merge(snapshot)
+    request_profile = current_profile.get()
+    if request_profile is not None and snapshot.get("profile") is not None:
+        request_profile.add(snapshot["profile"])
+    return result
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests asking for it with ``?profile=1`` or an ``X-Profile: 1`` header.
+
+    The event loop thread is profiled while the request is handled, along
+    with the threads and worker processes that run its work. With cProfile,
+    the loop thread's profile includes other requests served at the same
+    time. The dump's path is returned in the ``X-Profile-Path`` header.
+    """
+
+    def __init__(self, app: Callable, profile_dir: str, profiler: str = "cprofile"):
+        self.app = app
+        self.profile_dir = profile_dir
+        if profiler == "pyinstrument" and not PYINSTRUMENT_AVAILABLE:
+            print("pyinstrument is not installed; profiling requests with cProfile")
+            profiler = "cprofile"
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        extension = "html" if self.profiler == "pyinstrument" else "prof"
+        request_profile = RequestProfile(profile_path(self.profile_dir, scope["path"], extension), self.profiler)
+
+        async def send_with_path(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (b"x-profile-path", request_profile.path.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = current_profile.set(request_profile)
+        running = _start_profiler(self.profiler, async_mode=True)
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            if running is not None:
+                request_profile.add(_stop_profiler(self.profiler, running))
+            current_profile.reset(token)
+            request_profile.close()
+            print(f"Wrote request profile {request_profile.path}")
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        query = scope.get("query_string", b"").decode("latin-1")
+        if re.search(r"(?:^|&)profile=(?:1|true)(?:&|$)", query):
+            return True
+        headers = scope.get("headers", [])
+        return any(name == b"x-profile" and value.strip() in (b"1", b"true") for name, value in headers)
+
+
+def profile_path(profile_dir: str, request_path: str, extension: str = "prof") -> str:
+    """A unique dump path for a profile of a request to the given path"""
+    name = re.sub(r"[^\w.-]+", "_", request_path).strip("_") or "root"
+    return os.path.join(profile_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_{name}_{os.urandom(4).hex()}.{extension}")
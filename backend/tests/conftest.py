@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+from io import BytesIO
+
+import openpyxl
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+# The backend modules import each other as top-level modules, as when the API is run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the API's parse cache out of the shared temp directory when app is imported
+os.environ.setdefault("PARSE_CACHE_DIR", tempfile.mkdtemp(prefix="deck_audit_test_cache_"))
+os.environ.setdefault("PARSE_WORKERS", "1")
+
+# Slide texts of the sample deck and the model rows they quote
+SAMPLE_SLIDES = [
+    "Revenue for FY2024 came in at ₹1,250 Cr, up from ₹1,100 Cr",
+    "EBITDA margin improved to 18.5% while net profit reached ₹210 Cr",
+    "Deposits grew to ₹9,999 Cr across 3 regions",
+]
+SAMPLE_ROWS = [
+    ["All figures in ₹ Crore"],
+    ["Line item", "FY2023", "FY2024"],
+    ["Revenue", 1100, 1250],
+    ["EBITDA margin (%)", 16.2, 18.5],
+    ["Net profit", 180, 210],
+    ["Deposits", 8000, 8500],
+]
+
+
+def deck_bytes(texts=SAMPLE_SLIDES) -> bytes:
+    """A deck with one text box per slide"""
+    prs = Presentation()
+    for text in texts:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_textbox(Inches(1), Inches(1), Inches(8), Inches(1)).text_frame.text = text
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def workbook_bytes(rows=SAMPLE_ROWS, sheet_name: str = "P&L") -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = sheet_name
+    for row in rows:
+        ws.append(row)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def sample_files(tmp_path):
+    """Paths of the sample deck and its model on disk"""
+    deck = tmp_path / "deck.pptx"
+    deck.write_bytes(deck_bytes())
+    model = tmp_path / "model.xlsx"
+    model.write_bytes(workbook_bytes())
+    return str(deck), str(model)
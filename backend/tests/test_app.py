@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+pytest.importorskip("httpx")  # Needed by the test client
+from fastapi.testclient import TestClient
+
+import app as api
+from conftest import deck_bytes, workbook_bytes
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager: its shutdown event would stop the shared worker pools
+    return TestClient(api.app)
+
+
+def upload(client, deck=None, workbook=None, session_id=None):
+    files = [
+        ("ppt_file", ("deck.pptx", deck or deck_bytes())),
+        ("excel_files", ("model.xlsx", workbook or workbook_bytes())),
+    ]
+    response = client.post("/upload-files", files=files, data={"session_id": session_id} if session_id else None)
+    assert response.status_code == 200, response.text
+    return response.json()["session_id"]
+
+
+def stream_events(response_text: str, stream_format: str):
+    if stream_format == "sse":
+        return [json.loads(block.split("data: ", 1)[1]) for block in response_text.strip().split("\n\n")]
+    return [json.loads(line) for line in response_text.splitlines()]
+
+
+def test_upload_and_audit(client):
+    session_id = upload(client)
+
+    body = client.post("/audit", params={"session_id": session_id}).json()
+
+    statuses = {result["text"]: result["status"] for result in body["audit_results"]}
+    assert statuses["₹1,250 Cr"] == "Match"
+    assert statuses["₹9,999 Cr"] == "Mismatch"
+    assert body["total_numbers_found"] == len(body["audit_results"])
+
+
+@pytest.mark.parametrize("stream_format", ["ndjson", "sse"])
+def test_stream_audit_saves_results(client, stream_format):
+    session_id = upload(client)
+
+    response = client.get("/audit/stream", params={"session_id": session_id, "format": stream_format})
+    events = stream_events(response.text, stream_format)
+
+    assert [event["type"] for event in events] == ["slide", "slide", "slide", "complete"]
+    saved = client.get("/audit-results", params={"session_id": session_id}).json()["results"]
+    assert len(saved) == events[-1]["totals"]["total_numbers_found"]
+
+
+def test_stream_stops_when_files_are_replaced(client):
+    session_id = upload(client)
+    ppt_data = api.session_store.get(session_id, "ppt_data")
+    excel_data = api.session_store.get(session_id, "excel_data")
+    upload_id = api.session_store.get(session_id, "upload_id")
+
+    events = api.stream_audit_events(session_id, ppt_data, excel_data, "ndjson", upload_id)
+    first = json.loads(next(events))
+    upload(client, deck=deck_bytes(["Revenue was ₹1,250 Cr"]), session_id=session_id)
+    rest = [json.loads(event) for event in events]
+
+    assert first["type"] == "slide"
+    assert [event["type"] for event in rest] == ["error"]
+    assert rest[0]["detail"] == api.STALE_UPLOAD_DETAIL
+    assert api.session_store.get(session_id, "audit_results") is None
+
+
+def test_unknown_session(client):
+    assert client.post("/audit", params={"session_id": "missing"}).status_code == 404
+
+
+def test_audit_job_endpoints(client):
+    session_id = upload(client)
+
+    job = client.post("/audit-jobs", params={"session_id": session_id}).json()["job"]
+    api.audit_jobs.get(job["job_id"]).future.result(timeout=30)
+
+    assert client.get(f"/audit-jobs/{job['job_id']}").json()["job"]["status"] == "completed"
+    result = client.get(f"/audit-jobs/{job['job_id']}/result").json()
+    assert result["total_numbers_found"] == len(result["audit_results"])
+    assert client.get("/audit-jobs/job_missing").status_code == 404
+
+
+def test_pdf_report_is_cached_per_audit(client, monkeypatch):
+    builds = []
+    generate = api.ReportGenerator.generate_pdf_report
+    monkeypatch.setattr(api.ReportGenerator, "generate_pdf_report",
+                        lambda self, results: builds.append(len(results)) or generate(self, results))
+    session_id = upload(client)
+    client.post("/audit", params={"session_id": session_id})
+
+    first = client.get("/download-report/pdf", params={"session_id": session_id})
+    second = client.get("/download-report/pdf", params={"session_id": session_id})
+    client.post("/audit", params={"session_id": session_id})
+    rerun = client.get("/download-report/pdf", params={"session_id": session_id})
+
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.content.startswith(b"%PDF") and second.content == first.content
+    assert rerun.content.startswith(b"%PDF")
+    assert len(builds) == 2  # Once per audit
+
+
+def test_oversized_upload_is_refused(client, monkeypatch):
+    monkeypatch.setattr(api, "MAX_UPLOAD_BYTES", 1000)
+    files = [("ppt_file", ("deck.pptx", deck_bytes())), ("excel_files", ("model.xlsx", workbook_bytes()))]
+
+    response = client.post("/upload-files", files=files)
+
+    assert response.status_code == 413
+    assert "upload limit" in response.json()["detail"]
+
+
+def test_metrics_endpoint(client):
+    session_id = upload(client)
+    client.post("/audit", params={"session_id": session_id})
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'deck_audit_stage_seconds_count{stage="upload.spool"}' in response.text
+    assert "deck_audit_parse_cache_hits " in response.text
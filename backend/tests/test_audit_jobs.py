@@ -0,0 +1,90 @@
+import pytest
+
+from audit_jobs import AuditJobQueue
+from excel_parser import ExcelParser
+from ppt_parser import PPTParser
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def queue():
+    queue = AuditJobQueue(max_workers=1, max_finished_jobs=1)
+    yield queue
+    queue.shutdown()
+
+
+@pytest.fixture
+def parsed(sample_files):
+    deck, model = sample_files
+    return PPTParser().parse_presentation(deck), {"model.xlsx": ExcelParser().parse_workbook(model)}
+
+
+def test_job_completes_with_progress_and_callback(queue, parsed):
+    ppt_data, excel_data = parsed
+    completed = []
+
+    job = queue.submit(ppt_data, excel_data, session_id="s1", on_complete=lambda job: completed.append(job.status))
+    results = job.future.result(timeout=30)
+
+    total = sum(len(slide["numbers"]) for slide in ppt_data)
+    assert len(results) == total
+    assert completed == ["running"]  # Results are stored before pollers see the job as completed
+    assert job.to_dict()["status"] == "completed"
+    assert (job.numbers_matched, job.total_numbers) == (total, total)
+    assert job.to_dict()["progress"] == 1.0
+    assert queue.get(job.job_id) is job
+
+
+def test_failed_job_reports_its_error(queue, parsed):
+    ppt_data, _ = parsed
+
+    job = queue.submit(ppt_data, None)
+    with pytest.raises(Exception):
+        job.future.result(timeout=30)
+
+    assert job.status == "failed"
+    assert job.error
+
+
+def test_oldest_finished_jobs_are_pruned(queue, parsed):
+    ppt_data, excel_data = parsed
+    jobs = [queue.submit(ppt_data, excel_data) for _ in range(3)]
+    for job in jobs:
+        job.future.result(timeout=30)
+
+    queue.submit(ppt_data, excel_data).future.result(timeout=30)
+
+    assert queue.get(jobs[0].job_id) is None
+    assert queue.get(jobs[2].job_id) is jobs[2]
+
+
+def test_jobs_are_visible_to_other_workers_through_a_shared_store(parsed, tmp_path):
+    ppt_data, excel_data = parsed
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    worker, other_worker = AuditJobQueue(max_workers=1, store=store), AuditJobQueue(max_workers=1, store=store)
+
+    job = worker.submit(ppt_data, excel_data, session_id="s1")
+    results = job.future.result(timeout=30)
+
+    assert other_worker.get(job.job_id) is None
+    assert other_worker.status(job.job_id) == job.to_dict()
+    shared = other_worker.result(job.job_id)
+    assert shared["results"] == results
+    assert shared["incremental_report"] == job.incremental_report
+    assert other_worker.status("job_missing") is None
+    worker.shutdown()
+    other_worker.shutdown()
+
+
+def test_jobs_stay_in_process_with_a_memory_store(parsed):
+    ppt_data, excel_data = parsed
+    store = MemorySessionStore()
+    queue = AuditJobQueue(max_workers=1, store=store)
+
+    job = queue.submit(ppt_data, excel_data)
+    job.future.result(timeout=30)
+
+    assert queue.store is None
+    assert store.get(job.job_id, "job") is None
+    assert queue.result(job.job_id)["results"] == job.results
+    queue.shutdown()
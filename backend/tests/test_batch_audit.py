@@ -0,0 +1,54 @@
+import csv
+import json
+
+import batch_audit
+from conftest import deck_bytes
+
+
+def test_batch_writes_reports_and_summary(sample_files, tmp_path):
+    deck, model = sample_files
+    other_dir = tmp_path / "q3"
+    other_dir.mkdir()
+    (other_dir / "deck.pptx").write_bytes(deck_bytes(["Revenue for FY2024 came in at ₹1,250 Cr"]))
+    output_dir = tmp_path / "reports"
+
+    status = batch_audit.main(["--excel", model, "--decks", deck, str(other_dir), "--output-dir", str(output_dir),
+                               "--workers", "2", "--cache-dir", str(tmp_path / "cache")])
+
+    assert status == 0
+    assert sorted(path.name for path in output_dir.iterdir()) == \
+        ["deck.csv", "deck.json", "deck_2.csv", "deck_2.json", "summary.csv", "summary.json"]
+    summary = json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))
+    assert summary["excel_files"] == ["model.xlsx"]
+    assert [(row["slides"], row["matches"]) for row in summary["results"]] == [(3, 5), (1, 2)]
+    assert summary["totals"]["total_numbers_found"] == \
+        len(json.loads((output_dir / "deck.json").read_text(encoding="utf-8"))) + 2
+    with open(output_dir / "summary.csv", encoding="utf-8") as f:
+        assert [row["deck"] for row in csv.DictReader(f)] == [deck, str(other_dir / "deck.pptx")]
+
+
+def test_cached_rerun_gives_the_same_summary(sample_files, tmp_path):
+    deck, model = sample_files
+    runs = []
+    for run in range(2):
+        output_dir = tmp_path / f"run{run}"
+        batch_audit.main(["--excel", model, "--decks", deck, "--output-dir", str(output_dir), "--workers", "1",
+                          "--cache-dir", str(tmp_path / "cache"), "--formats", "json"])
+        runs.append(json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))["totals"])
+
+    assert runs[0] == runs[1]
+    assert not (tmp_path / "run1" / "deck.csv").exists()
+
+
+def test_failed_deck_is_reported_without_stopping_the_batch(sample_files, tmp_path):
+    deck, model = sample_files
+    broken = tmp_path / "broken.pptx"
+    broken.write_bytes(b"not a presentation")
+
+    status = batch_audit.main(["--excel", model, "--decks", str(broken), deck, "--output-dir", str(tmp_path / "out"),
+                               "--workers", "2"])
+
+    summary = json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8"))
+    assert status == 1
+    assert [row["status"] for row in summary["results"]] == ["failed", "completed"]
+    assert summary["decks_failed"] == 1 and summary["totals"]["slides"] == 3
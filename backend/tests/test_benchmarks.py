@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import pipeline
+from synthetic_files import SHEET_KINDS, SyntheticWorkbook, generate
+
+
+def run(seconds, peak_mb=10.0, matches=5):
+    return {"size": "10x1000", "stages": {"match_numbers": {"seconds": seconds, "peak_mb": peak_mb}},
+            "results": {"ppt_numbers": 8, "matches": matches}}
+
+
+def test_synthetic_workbook_is_seeded():
+    first, second, other = SyntheticWorkbook(1000, seed=1), SyntheticWorkbook(1000, seed=1), SyntheticWorkbook(1000, seed=2)
+
+    assert first.sheets == second.sheets
+    assert first.sheets != other.sheets
+    assert [sheet["name"] for sheet in first.sheets] == [kind[0] for kind in SHEET_KINDS]
+    assert 1000 <= first.cells < 1000 + len(first.years) * len(SHEET_KINDS)
+
+
+def test_generated_files_are_reused(tmp_path):
+    paths = generate(str(tmp_path), slides=3, cells=200, seed=0)
+    modified = {kind: os.path.getmtime(path) for kind, path in paths.items()}
+
+    assert generate(str(tmp_path), slides=3, cells=200, seed=0) == paths
+    assert {kind: os.path.getmtime(path) for kind, path in paths.items()} == modified
+
+
+def test_pipeline_results_are_deterministic(tmp_path):
+    runs = [pipeline.run_size(3, 200, str(tmp_path / f"run{i}"), seed=0, repeat=1, memory=False, xls=False)
+            for i in range(2)]
+
+    assert runs[0]["results"] == runs[1]["results"]
+    assert runs[0]["results"]["matches"] > 0
+
+
+def test_compare_ignores_slowdowns_under_the_noise_floor():
+    baseline = {"runs": [run(0.010)]}
+
+    assert pipeline.compare([run(0.030)], baseline, tolerance=0.25, memory_tolerance=0.25) == []
+    assert pipeline.compare([run(0.500)], {"runs": [run(0.300)]}, 0.25, 0.25) == \
+        ["10x1000 match_numbers: +66.7% time"]
+
+
+def test_compare_flags_memory_growth_and_changed_results():
+    regressions = pipeline.compare([run(0.010, peak_mb=20.0, matches=4)], {"runs": [run(0.010)]}, 0.25, 0.25)
+
+    assert regressions == [
+        "10x1000: results changed from {'ppt_numbers': 8, 'matches': 5} to {'ppt_numbers': 8, 'matches': 4}",
+        "10x1000 match_numbers: +100.0% peak memory",
+    ]
@@ -0,0 +1,46 @@
+from context_index import ContextIndex
+from matcher import NumberMatcher
+from number_table import NumberTableBuilder
+
+
+def test_candidates_share_a_token_in_original_order():
+    index = ContextIndex(["revenue north", "ebitda south", "revenue south", "deposits"])
+
+    assert index.candidates("south revenue") == [0, 1, 2]
+    assert index.candidates("advances") == []
+
+
+def test_truncated_postings_keep_a_rare_shared_label():
+    # 2,000 contexts share two common words with the deck; the right cell shares only its rare label
+    contexts = [f"revenue growth segment {i % 10}" for i in range(2000)] + ["zetaland advances"]
+    index = ContextIndex(contexts, max_candidates=50)
+
+    candidates = index.candidates("revenue growth in zetaland")
+
+    assert len(candidates) == 50
+    assert 2000 in candidates
+
+
+def workbook_data(labels):
+    builder = NumberTableBuilder("model.xlsx")
+    sheet_id = builder.sheet_id("Model")
+    for row, label in enumerate(labels, start=1):
+        builder.add(float(row * 1000 + 7), row, 2, sheet_id, label)
+    return {"model.xlsx": {"filename": "model.xlsx", "numbers": builder.build(), "sheets": {}}}
+
+
+def test_blocked_fallback_finds_the_same_cell_as_an_exhaustive_scan():
+    labels = [f"Revenue from {region} retail advances" for region in ("North", "South", "East", "West")] * 400
+    labels.append("Zetaland outstanding")
+    excel_data = workbook_data(labels)
+    # The figure is misquoted, so only the context fallback can place it
+    ppt_data = [{"slide_number": 1, "numbers": [{
+        "raw_text": "₹1 Cr", "parsed_value": 10000000.0, "type": "currency", "slide_number": 1,
+        "context": "Revenue from Zetaland outstanding advances reached ₹1 Cr"
+    }]}]
+
+    exhaustive = NumberMatcher(context_blocking=False).match_numbers(ppt_data, excel_data)
+    blocked = NumberMatcher(context_candidate_cap=100).match_numbers(ppt_data, excel_data)
+
+    assert exhaustive[0]["cell"] == f"B{len(labels)}"
+    assert [(r["status"], r["cell"]) for r in blocked] == [(r["status"], r["cell"]) for r in exhaustive]
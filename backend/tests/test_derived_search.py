@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from derived_search import DerivedIndex
+from matcher import NumberMatcher
+from number_table import NumberTableBuilder
+
+# Revenue by year along row 3, and a second line item below it
+ROWS = {3: ("Revenue", [1100, 1250, 1400]), 4: ("Net profit", [180, 210, 240])}
+
+
+def model(filename="model.xlsx"):
+    builder = NumberTableBuilder(filename)
+    sheet_id = builder.sheet_id("P&L")
+    for row, (label, values) in ROWS.items():
+        for column, value in enumerate(values, start=2):
+            builder.add(float(value), row, column, sheet_id, f"{label} | FY{2021 + column}")
+    return builder.build()
+
+
+def ppt_number(value, raw_text, number_type="number"):
+    return {"raw_text": raw_text, "parsed_value": float(value), "context": f"Revenue {raw_text}",
+            "type": number_type, "slide_number": 1}
+
+
+def derived_records(index, value, percentage=False):
+    return [index.record(i) for i in index.candidates(value, percentage)]
+
+
+def test_index_derives_differences_growth_ratios_and_sums():
+    index = DerivedIndex(model(), tolerance=0.001)
+
+    assert {"kind": "difference", "value": 150.0, "sheet_name": "P&L", "source_file": "model.xlsx",
+            "cells": ["B3", "C3"], "formula": "=C3-B3"} in derived_records(index, 150)
+    assert [(r["kind"], r["formula"]) for r in derived_records(index, 1250 / 1100 * 100 - 100, True)] == \
+        [("growth", "=(C3-B3)/ABS(B3)*100")]
+    assert ("ratio", "=B4/B3*100", ["B4", "B3"]) in \
+        [(r["kind"], r["formula"], r["cells"]) for r in derived_records(index, 180 / 1100 * 100, True)]
+    assert [(r["kind"], r["cells"]) for r in derived_records(index, 3750)] == [("sum", ["B3:D3"])]
+
+
+def test_percentages_only_meet_growth_rates_and_ratios():
+    index = DerivedIndex(model(), tolerance=0.001)
+    growth = 1250 / 1100 * 100 - 100
+
+    assert derived_records(index, growth, percentage=False) == []
+    assert all(r["kind"] in ("growth", "ratio") for r in derived_records(index, growth, percentage=True))
+    assert derived_records(index, 2350, percentage=True) == []
+
+
+def test_index_stops_at_its_deadline():
+    index = DerivedIndex(model(), tolerance=0.001, deadline=time.perf_counter() - 1)
+
+    assert not index.complete
+    assert len(index) == 0
+
+
+@pytest.mark.parametrize("number, derivation", [
+    (ppt_number(13.64, "13.64%", "percentage"),
+     {"kind": "growth", "formula": "=(C3-B3)/ABS(B3)*100", "cells": ["B3", "C3"]}),
+    (ppt_number(2650, "2,650"), {"kind": "sum", "formula": "=SUM(C3:D3)", "cells": ["C3:D3"]}),
+])
+def test_matcher_matches_derived_figures_when_enabled(number, derivation):
+    excel_data = {"model.xlsx": {"filename": "model.xlsx", "numbers": model(), "sheets": {}}}
+    ppt_data = [{"slide_number": 1, "numbers": [number]}]
+
+    result = NumberMatcher(derived_search=True).match_numbers(ppt_data, excel_data)[0]
+
+    assert result["status"] == "Match"
+    assert result["derivation"] == derivation
+    assert result["cell"] == ", ".join(derivation["cells"])
+    assert "derivation" not in NumberMatcher().match_numbers(ppt_data, excel_data)[0]
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pandas as pd
+
+from conftest import SAMPLE_ROWS, workbook_bytes
+from excel_parser import ExcelParser
+from number_table import NumberTableBuilder
+
+
+def records(result):
+    numbers = result["numbers"]
+    return [numbers.record(position) for position in range(len(numbers))]
+
+
+def test_csv_with_numeric_header_columns(tmp_path):
+    path = tmp_path / "model.csv"
+    path.write_text('Metric,2023,2024\nRevenue,"1,200",1350\nEBITDA,300,410.5\n', encoding="utf-8")
+
+    parsed = {number["cell_reference"]: number for number in records(ExcelParser().parse_workbook(str(path)))}
+
+    assert parsed["B2"]["value"] == 1200.0
+    assert parsed["C3"]["value"] == 410.5
+    assert parsed["B2"]["context"] == "Revenue"
+
+
+def test_all_numeric_tsv(tmp_path):
+    path = tmp_path / "values.tsv"
+    path.write_text("1\t2\n3\t4\n", encoding="utf-8")
+
+    values = [number["value"] for number in records(ExcelParser().parse_workbook(str(path)))]
+
+    assert values == [1.0, 2.0, 3.0, 4.0]
+
+
+def multi_sheet_workbook(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "P&L"
+    ws.append(["Line item", "Prior year", "Current year"])
+    ws.append(["Revenue", 1100, 1250.5])
+    ws.append(["EBITDA", 300, None, "note", 12])
+    ws = wb.create_sheet("Ratios")
+    ws.append(["Margin (%)", 18.5])
+    ws.append(["Text only"])
+    wb.create_sheet("Empty")
+    wb.save(path)
+    return str(path)
+
+
+def test_streaming_matches_full_load(tmp_path):
+    path = multi_sheet_workbook(tmp_path / "model.xlsx")
+
+    streamed = ExcelParser(streaming=True).parse_workbook(path)
+    loaded = ExcelParser(streaming=False).parse_workbook(path)
+
+    assert records(streamed) == records(loaded)
+    assert list(streamed["sheets"]) == ["P&L", "Ratios"]
+    by_cell = {number["cell_reference"]: number for number in records(streamed)}
+    assert by_cell["B2"]["context"] == "Revenue | Prior year | Line item"
+    assert by_cell["C2"]["context"] == "Current year | Prior year"
+    assert by_cell["E3"]["context"] == "note"
+
+
+def test_process_pool_parse_matches_sequential(tmp_path):
+    paths = [multi_sheet_workbook(tmp_path / "model.xlsx")]
+    csv_path = tmp_path / "extra.csv"
+    csv_path.write_text("Deposits,4500\n", encoding="utf-8")
+    paths.append(str(csv_path))
+
+    sequential = ExcelParser().parse_workbooks(paths)
+    # A zero split size parses every multi-sheet workbook one job per sheet
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = ExcelParser(sheet_split_bytes=0).parse_workbooks(paths, executor)
+
+    assert list(pooled) == ["model.xlsx", "extra.csv"]
+    for filename in sequential:
+        assert records(pooled[filename]) == records(sequential[filename])
+        assert pooled[filename]["sheets"].keys() == sequential[filename]["sheets"].keys()
+
+
+def test_pandas_path_matches_openpyxl_path():
+    # .xls and delimited sheets go through the vectorized pandas path, .xlsx through openpyxl;
+    # only the latter reads numbers out of text cells such as "FY2024"
+    streamed = [number for number in records(ExcelParser().parse_workbook(workbook_bytes(), filename="model.xlsx"))
+                if number["data_type"] == "number"]
+    builder = NumberTableBuilder("model.xlsx")
+    ExcelParser()._parse_sheet_pandas(pd.DataFrame(SAMPLE_ROWS), "P&L", builder)
+
+    vectorized = records({"numbers": builder.build()})
+    # Only openpyxl adds the top-left label to the context
+    for pandas_number, openpyxl_number in zip(vectorized, streamed):
+        assert openpyxl_number.pop("context").startswith(pandas_number.pop("context"))
+    assert vectorized == streamed
+    assert {number["cell_reference"]: number.get("unit") for number in streamed}["C3"] == "crore"
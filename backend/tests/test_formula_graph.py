@@ -0,0 +1,88 @@
+import openpyxl
+import pytest
+
+from excel_parser import ExcelParser
+from formula_graph import FormulaGraph
+
+
+def derived_values(tmp_path, sheets):
+    """Write formulas without cached results and return the values computed for them, by cell"""
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, cells in sheets.items():
+        ws = wb.create_sheet(name)
+        for reference, value in cells.items():
+            ws[reference] = value
+    path = str(tmp_path / "model.xlsx")
+    wb.save(path)
+
+    parser = ExcelParser()
+    numbers = parser.parse_workbook(path)["numbers"]
+    graph = FormulaGraph.from_dict(parser.parse_formula_graph(path))
+    derived = graph.derived_numbers(numbers)
+    return {f"{derived.sheet_names[derived.sheet[i]]}!{derived.cell_reference(i)}": float(derived.value[i])
+            for i in range(len(derived))}
+
+
+def test_whole_column_reference_on_any_sheet(tmp_path):
+    values = derived_values(tmp_path, {
+        "First": {"A1": 1, "A2": 2, "C1": "=SUM(A:A)"},
+        "Second": {"B1": 10, "B2": 20, "B3": 30, "D1": "=SUM(B:B)", "D2": "=MAX(B1:B1048576)"},
+    })
+
+    assert values["First!C1"] == 3
+    assert values["Second!D1"] == 60
+    assert values["Second!D2"] == 30
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("=-B1^2", 100),
+    ("=2^3^2", 64),
+    ("=2^-1", 0.5),
+    ("=1-B1^2", -99),
+    ("=B1+2*3", 16),
+    ("=(B1+2)*3", 36),
+    ("=50%*B1", 5),
+    ("=-B1%", -0.1),
+    ("=1--B1", 11),
+    ("=SUM(B1, 2*B2) / 2", 15),
+    ("=ROUND(B1/3, 2)", 3.33),
+    ("=AVERAGE(B1:B2)^2", 100),
+])
+def test_excel_operator_precedence(tmp_path, formula, expected):
+    values = derived_values(tmp_path, {"Model": {"B1": 10, "B2": 10, "C1": formula}})
+
+    assert values["Model!C1"] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("formula", ['="a"&"b"', "=B1>2", "=(B1+2", "=B1:B2+1", "=NPV(0.1, B1:B2)"])
+def test_unsupported_formulas_are_skipped(tmp_path, formula):
+    values = derived_values(tmp_path, {"Model": {"B1": 10, "B2": 20, "C1": formula}})
+
+    assert "Model!C1" not in values
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("=AVERAGE(B1:B3)", 2),
+    ("=COUNT(B1:B4)", 3),
+    ("=MIN(B1:B3)+1", 1),  # Zero results are not indexed, like zero cells
+    ("=SUM(B1:B4)/COUNT(B1:B4)", 2),
+    ("=MAX(B2:B3)-MAX(B2, -1)", 4),
+])
+def test_zero_cells_count_in_ranges_and_blanks_do_not(tmp_path, formula, expected):
+    values = derived_values(tmp_path, {"Model": {"B1": 2, "B2": 0, "B3": 4, "C1": formula}})
+
+    assert values["Model!C1"] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("=ROUND(2.5, 0)", 3),
+    ("=ROUND(-2.5, 0)", -3),
+    ("=ROUND(0.285, 2)", 0.29),
+    ("=ROUND(1.005, 2)", 1.01),
+    ("=ROUND(1250, -2)", 1300),
+])
+def test_round_halves_away_from_zero_on_decimal_digits(tmp_path, formula, expected):
+    values = derived_values(tmp_path, {"Model": {"C1": formula}})
+
+    assert values["Model!C1"] == expected
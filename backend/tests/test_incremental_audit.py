@@ -0,0 +1,79 @@
+import openpyxl
+
+from conftest import SAMPLE_ROWS, SAMPLE_SLIDES, deck_bytes, workbook_bytes
+from excel_parser import ExcelParser
+from incremental_audit import run_incremental_audit
+from matcher import NumberMatcher
+from ppt_parser import PPTParser
+
+
+def parse(slides, rows):
+    excel = ExcelParser().parse_workbook(workbook_bytes(rows), filename="model.xlsx")
+    return PPTParser().parse_presentation(deck_bytes(slides)), {"model.xlsx": excel}
+
+
+def audit(ppt_data, excel_data, previous_state=None):
+    return run_incremental_audit(NumberMatcher(), ppt_data, excel_data, previous_state)
+
+
+def test_unchanged_files_reuse_every_slide():
+    ppt_data, excel_data = parse(SAMPLE_SLIDES, SAMPLE_ROWS)
+    results, state, report = audit(ppt_data, excel_data)
+
+    again, _, report = audit(ppt_data, excel_data, state)
+
+    assert again == results
+    assert report["slides_rematched"] == 0 and report["numbers_reused"] == len(results)
+
+
+def test_only_edited_and_reordered_slides_are_handled():
+    ppt_data, excel_data = parse(SAMPLE_SLIDES, SAMPLE_ROWS)
+    _, state, _ = audit(ppt_data, excel_data)
+    edited = [SAMPLE_SLIDES[1], "Revenue for FY2024 came in at ₹1,300 Cr", SAMPLE_SLIDES[2]]
+
+    ppt_data, _ = parse(edited, SAMPLE_ROWS)
+    results, _, report = audit(ppt_data, excel_data, state)
+
+    assert report["slides_rematched"] == 1 and report["slides_reused"] == 2
+    assert [(r["slide"], r["text"]) for r in results][:2] == [(1, "18.5%"), (1, "₹210 Cr")]
+    assert results == audit(ppt_data, excel_data)[0]
+
+
+def test_changed_sheet_rematches_slides_that_could_gain_a_match():
+    ppt_data, excel_data = parse(SAMPLE_SLIDES, SAMPLE_ROWS)
+    _, state, _ = audit(ppt_data, excel_data)
+    rows = [row if row[0] != "Deposits" else ["Deposits", 8000, 9999] for row in SAMPLE_ROWS]
+
+    _, excel_data = parse(SAMPLE_SLIDES, rows)
+    results, _, report = audit(ppt_data, excel_data, state)
+
+    assert report["changed_sheets"] == ["model.xlsx/P&L"]
+    assert report["slides_rematched"] == 3  # Every slide had a non-Match result or a result from the sheet
+    assert {r["text"]: r["status"] for r in results}["₹9,999 Cr"] == "Match"
+
+
+def test_match_is_rematched_when_a_changed_sheet_adds_a_better_candidate(tmp_path):
+    ppt_data = PPTParser().parse_presentation(deck_bytes(["Net profit reached ₹210 Cr"]))
+    sheets = {"P&L": [["All figures in ₹ Crore"], ["Line item", "Q3"], ["Other income", 210]]}
+
+    def workbook(sheets):
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for name, rows in sheets.items():
+            ws = wb.create_sheet(name)
+            for row in rows:
+                ws.append(row)
+        path = tmp_path / f"model_{len(sheets)}.xlsx"
+        wb.save(path)
+        return {"model.xlsx": ExcelParser().parse_workbook(str(path), filename="model.xlsx")}
+
+    results, state, _ = audit(ppt_data, workbook(sheets))
+    assert (results[0]["status"], results[0]["excel_sheet"]) == ("Match", "P&L")
+
+    sheets["Summary"] = [["All figures in ₹ Crore"], ["Line item", "FY2024"], ["Net profit reached", 210]]
+    excel_data = workbook(sheets)
+    results, _, report = audit(ppt_data, excel_data, state)
+
+    assert report["slides_rematched"] == 1
+    assert results == audit(ppt_data, excel_data)[0]
+    assert results[0]["excel_sheet"] == "Summary"
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from llm_adjudicator import LLMAdjudicator, create_llm_adjudicator
+from llm_stub_server import StubHandler
+from parse_cache import ParseCache
+
+
+@pytest.fixture
+def stub_url():
+    """The stub OpenAI server on a free local port, its counters reset"""
+    StubHandler.latency, StubHandler.fail_rate = 0.0, 0.0
+    StubHandler.requests, StubHandler.in_flight, StubHandler.max_in_flight = 0, 0, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def audit_results():
+    """Five low-confidence results to review and one confident match to leave alone"""
+    results = [
+        {"slide": slide, "text": f"{value:,}", "status": status, "ppt_value": float(value),
+         "excel_value": excel_value, "excel_file": "model.xlsx" if excel_value else None,
+         "excel_sheet": "P&L" if excel_value else None, "cell": f"B{slide}" if excel_value else None,
+         "reasoning": "Closest figure by context", "context": "Revenue", "confidence": 0.5}
+        for slide, (value, status, excel_value) in enumerate([
+            (1250, "Mismatch", 1251.0), (900, "Mismatch", 1200.0), (77, "Untraceable", None),
+            (410, "Mismatch", 409.0), (5, "Untraceable", None)
+        ], start=1)
+    ]
+    results.append(dict(results[0], slide=6, status="Match", confidence=0.95))
+    return results
+
+
+def adjudicator(url, **options):
+    return LLMAdjudicator(model="stub", api_key="test", base_url=url, backoff_seconds=0, **options)
+
+
+def test_low_confidence_results_are_reviewed_in_batches(stub_url):
+    results = audit_results()
+
+    report = adjudicator(stub_url, batch_size=2, max_concurrency=2).adjudicate_sync(results)
+
+    assert [result.get("llm_verdict") for result in results] == \
+        ["match", "mismatch", "untraceable", "match", "untraceable", None]
+    assert results[0]["reasoning"] == "Closest figure by context. Reviewer: Slide/Excel ratio is 0.999."
+    assert (report["results_reviewed"], report["batches"], report["requests"], report["failed_batches"]) == (5, 3, 3, 0)
+    assert report["prompt_tokens"] > 0 and report["completion_tokens"] > 0
+    assert StubHandler.max_in_flight <= 2
+    assert adjudicator(stub_url).adjudicate_sync(results)["results_reviewed"] == 0
+
+
+def test_cached_verdicts_skip_the_model(stub_url, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    adjudicator(stub_url, batch_size=2, cache=cache).adjudicate_sync(audit_results())
+    results = audit_results()
+
+    report = adjudicator(stub_url, batch_size=2, cache=cache).adjudicate_sync(results)
+
+    assert (report["cache_hits"], report["requests"]) == (3, 0)
+    assert StubHandler.requests == 3
+    assert results[1]["llm_verdict"] == "mismatch"
+
+
+def test_failed_batches_are_retried_then_left_as_they_were(stub_url):
+    StubHandler.fail_rate = 1.0
+    results = audit_results()
+
+    report = adjudicator(stub_url, batch_size=5, max_retries=2).adjudicate_sync(results)
+
+    assert (report["requests"], report["retries"], report["failed_batches"]) == (3, 2, 1)
+    assert results == audit_results()
+
+
+def test_adjudication_is_enabled_from_the_environment(monkeypatch):
+    monkeypatch.delenv("LLM_ADJUDICATION", raising=False)
+    assert create_llm_adjudicator() is None
+
+    monkeypatch.setenv("LLM_ADJUDICATION", "true")
+    monkeypatch.setenv("LLM_BATCH_SIZE", "7")
+    created = create_llm_adjudicator()
+    assert (created.batch_size, created.max_concurrency) == (7, 4)
@@ -0,0 +1,58 @@
+import random
+
+from fuzzywuzzy import fuzz
+
+from matcher import NumberMatcher
+from number_table import NumberTableBuilder
+
+WORDS = ["revenue", "ebitda", "north", "south", "retail", "margin", "net", "profit", "deposits", "growth", "fy24"]
+
+
+def excel_data(rows, filename="model.xlsx", sheet_name="Model"):
+    """Workbook data with one (value, context) per row, in column B"""
+    builder = NumberTableBuilder(filename)
+    sheet_id = builder.sheet_id(sheet_name)
+    for row, (value, context) in enumerate(rows, start=1):
+        builder.add(float(value), row, 2, sheet_id, context)
+    return {filename: {"filename": filename, "numbers": builder.build(), "sheets": {}}}
+
+
+def ppt_number(value, context, raw_text=None, number_type="number", slide=1):
+    return {"raw_text": raw_text or f"{value:g}", "parsed_value": float(value), "context": context,
+            "type": number_type, "slide_number": slide}
+
+
+def test_batched_context_scores_pick_the_sequential_fuzzywuzzy_winner():
+    rng = random.Random(0)
+    contexts = [" ".join(rng.sample(WORDS, 3)) for _ in range(300)]
+    matcher = NumberMatcher(context_blocking=False)
+    lookup = matcher.build_lookup(excel_data([(1, context) for context in contexts]))
+
+    for _ in range(50):
+        ppt_context = " ".join(rng.sample(WORDS, 4))
+        best_position, best_score = None, 60
+        for position, context in enumerate(lookup.contexts):
+            score = fuzz.partial_ratio(ppt_context, context)
+            if score > best_score:
+                best_position, best_score = position, score
+
+        assert matcher._best_context_candidate(ppt_context, list(range(len(contexts))), lookup, 60) == \
+            (best_position, best_score if best_position is not None else 0)
+
+
+def test_repeated_numbers_reuse_their_match():
+    data = excel_data([(1250, "Revenue FY2024"), (210, "Net profit FY2024"), (1300, "Revenue FY2025")])
+    repeated = ppt_number(1250, "Revenue FY2024 was 1,250", "1,250")
+    ppt_data = [
+        {"slide_number": 1, "numbers": [repeated, ppt_number(999, "Unrelated figure")]},
+        {"slide_number": 2, "numbers": [dict(repeated, slide_number=2)]},
+    ]
+    matcher = NumberMatcher()
+
+    results = matcher.match_numbers(ppt_data, data)
+
+    assert [(r["slide"], r["status"], r["cell"]) for r in results] == [
+        (1, "Match", "B1"), (1, "Untraceable", None), (2, "Match", "B1")
+    ]
+    assert matcher.counts["reused_matches"] == 1
+    assert matcher.counts["searches"] == 2
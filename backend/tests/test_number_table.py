@@ -0,0 +1,63 @@
+import msgpack
+import numpy as np
+
+from number_table import NumberTable, NumberTableBuilder, col_num_to_letter, msgpack_default, msgpack_ext_hook
+
+
+def table(file_name, rows):
+    builder = NumberTableBuilder(file_name)
+    for sheet_name, value, row, column, context, original_text, unit in rows:
+        builder.add(value, row, column, builder.sheet_id(sheet_name), context, original_text, unit)
+    return builder.build()
+
+
+def all_records(numbers):
+    return [numbers.record(position) for position in range(len(numbers))]
+
+
+def test_record_shapes():
+    numbers = table("model.xlsx", [
+        ("P&L", 1250.0, 3, 2, "Revenue", None, None),
+        ("P&L", 5.2, 4, 28, "Growth", "5.2% growth", None),
+        ("Branches", 52000000.0, 2, 3, "Deposits", None, "lakh"),
+    ])
+
+    plain, text, scaled = all_records(numbers)
+    assert plain == {"value": 1250.0, "cell_reference": "B3", "row": 3, "column": 2, "sheet_name": "P&L",
+                     "context": "Revenue", "data_type": "number", "source_file": "model.xlsx"}
+    assert (text["cell_reference"], text["data_type"], text["original_text"]) == ("AB4", "text_with_number",
+                                                                                "5.2% growth")
+    assert (scaled["unit"], scaled["raw_value"]) == ("lakh", 520.0)
+    np.testing.assert_array_equal(numbers.raw_values(np.arange(3)), [1250.0, 5.2, 520.0])
+
+
+def test_concat_reinterns_strings_and_files():
+    first = table("a.xlsx", [("P&L", 1.0, 1, 1, "Revenue", None, "crore")])
+    second = table("b.xlsx", [("Ratios", 2.0, 2, 2, "Margin", "2%", None), ("P&L", 3.0, 3, 3, "Revenue", None, None)])
+
+    joined = NumberTable.concat([first, second])
+    renamed = NumberTable.concat([first, second], file_names=["x.xlsx", "y.xlsx"])
+
+    assert all_records(joined) == all_records(first) + all_records(second)
+    assert [record["source_file"] for record in all_records(renamed)] == ["x.xlsx", "y.xlsx", "y.xlsx"]
+    assert joined.strings.count("Revenue") == 1
+
+
+def test_msgpack_round_trip():
+    numbers = table("model.xlsx", [("P&L", 1.5, 1, 1, "Revenue", "₹1.5 Cr", "crore")])
+
+    packed = msgpack.packb({"numbers": numbers}, use_bin_type=True, default=msgpack_default)
+    restored = msgpack.unpackb(packed, raw=False, ext_hook=msgpack_ext_hook)["numbers"]
+
+    assert all_records(restored) == all_records(numbers)
+
+
+def test_tables_without_units_load():
+    data = table("model.xlsx", [("P&L", 1.0, 1, 1, "Revenue", None, None)]).to_dict()
+    del data["unit"]
+
+    assert NumberTable.from_dict(data).record(0)["value"] == 1.0
+
+
+def test_column_letters():
+    assert [col_num_to_letter(column) for column in (1, 26, 27, 702, 16384)] == ["A", "Z", "AA", "ZZ", "XFD"]
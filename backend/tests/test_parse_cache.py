@@ -0,0 +1,52 @@
+import os
+import time
+
+import numpy as np
+
+from excel_parser import ExcelParser
+from parse_cache import ParseCache, hash_file
+
+
+def test_parsed_workbook_round_trips(tmp_path, sample_files):
+    _, model = sample_files
+    cache = ParseCache(str(tmp_path / "cache"))
+    parsed = ExcelParser().parse_workbook(model)
+    key = cache.make_key("excel", hash_file(model), "test")
+
+    assert cache.get(key) is None
+    cache.put(key, parsed)
+    cached = cache.get(key)
+
+    np.testing.assert_array_equal(cached["numbers"].value, parsed["numbers"].value)
+    assert cached["numbers"].record(0) == parsed["numbers"].record(0)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_keys_change_with_content_and_version(tmp_path, sample_files):
+    deck, model = sample_files
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    assert cache.make_key("ppt", hash_file(deck), "5") != cache.make_key("ppt", hash_file(model), "5")
+    assert cache.make_key("ppt", hash_file(deck), "5") != cache.make_key("ppt", hash_file(deck), "6")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=2500)
+    cache.put("old", b"x" * 1000)
+    cache.put("recent", b"y" * 1000)
+    past = time.time() - 60
+    os.utime(cache._path("old"), (past, past))
+    cache.put("new", b"z" * 1000)
+
+    assert cache.get("old") is None
+    assert cache.get("recent") == b"y" * 1000
+    assert cache.stats()["evictions"] == 1
+
+
+def test_corrupt_entries_are_misses(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.put("key", {"a": 1})
+    with open(cache._path("key"), "wb") as f:
+        f.write(b"\xc1")
+
+    assert cache.get("key") is None
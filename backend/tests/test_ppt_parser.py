@@ -0,0 +1,141 @@
+from io import BytesIO
+
+import pytest
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from ppt_parser import PPTParser
+
+A_NAMESPACE = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+
+def deck_bytes(prs) -> bytes:
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def blank_slide(prs):
+    return prs.slides.add_slide(prs.slide_layouts[6])
+
+
+def add_text(shapes, text, top=1):
+    textbox = shapes.add_textbox(Inches(1), Inches(top), Inches(6), Inches(1))
+    textbox.text_frame.text = text
+    return textbox
+
+
+def test_shape_without_preset_geometry_is_parsed():
+    # A p:sp with no preset geometry and no txBox flag has no shape_type in python-pptx
+    prs = Presentation()
+    shape = add_text(blank_slide(prs).shapes, "Revenue of ₹1,234 Cr grew 12.5% to 56")._element
+    shape.nvSpPr.cNvSpPr.attrib.pop("txBox", None)
+    for geometry in shape.spPr.findall(f"{A_NAMESPACE}prstGeom"):
+        shape.spPr.remove(geometry)
+
+    slides = PPTParser().parse_presentation(deck_bytes(prs))
+
+    assert [n["raw_text"] for n in slides[0]["numbers"]] == ["₹1,234 Cr", "12.5%", "56"]
+
+
+def test_group_members_are_parsed():
+    prs = Presentation()
+    group = blank_slide(prs).shapes.add_group_shape()
+    add_text(group.shapes, "Deposits 4,500")
+    inner = group.shapes.add_group_shape()
+    add_text(inner.shapes, "Advances 3,200", top=2)
+
+    numbers = PPTParser().parse_presentation(deck_bytes(prs))[0]["numbers"]
+
+    assert [n["parsed_value"] for n in numbers] == [4500.0, 3200.0]
+
+
+def chart_deck(values, notes=None) -> bytes:
+    prs = Presentation()
+    slide = blank_slide(prs)
+    chart_data = CategoryChartData()
+    chart_data.categories = ["FY2023", "FY2024"]
+    chart_data.add_series("Revenue", values)
+    graphic = slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(1), Inches(1), Inches(6), Inches(4),
+                                     chart_data)
+    graphic.chart.has_title = True
+    graphic.chart.chart_title.text_frame.text = "Group revenue"
+    if notes:
+        slide.notes_slide.notes_text_frame.text = notes
+    return deck_bytes(prs)
+
+
+def test_chart_values_are_written_in_full():
+    numbers = PPTParser().parse_presentation(chart_deck([1234567.891, 1200000]))[0]["numbers"]
+
+    assert [(n["raw_text"], n["parsed_value"]) for n in numbers] == [("1234567.891", 1234567.891),
+                                                                    ("1200000", 1200000.0)]
+    assert numbers[0]["context"] == "Group revenue Revenue FY2023"
+    assert numbers[1]["chart_position"] == "Revenue, FY2024"
+
+
+def test_charts_and_notes_can_be_left_out():
+    deck = chart_deck([10, 20], notes="Mention the 12% margin")
+
+    assert len(PPTParser().parse_presentation(deck)[0]["numbers"]) == 3
+    assert PPTParser(include_charts=False, include_notes=False).parse_presentation(deck)[0]["numbers"] == []
+
+
+def test_speaker_notes_are_flagged():
+    numbers = PPTParser().parse_presentation(chart_deck([10, 20], notes="Mention the 12% margin"))[0]["numbers"]
+
+    assert numbers[-1]["raw_text"] == "12%"
+    assert numbers[-1]["speaker_notes"] is True
+
+
+def test_fingerprint_covers_chart_values_and_notes():
+    def fingerprint(deck):
+        return PPTParser().parse_presentation(deck)[0]["fingerprint"]
+
+    base = fingerprint(chart_deck([10, 20], notes="Margin 12%"))
+
+    assert fingerprint(chart_deck([10, 20], notes="Margin 12%")) == base
+    assert fingerprint(chart_deck([10, 21], notes="Margin 12%")) != base
+    assert fingerprint(chart_deck([10, 20], notes="Margin 13%")) != base
+
+    parser = PPTParser()
+    number = {"raw_text": "12%", "parsed_value": 12.0, "context": "Margin 12%", "type": "percentage"}
+    assert parser._slide_fingerprint([number]) != parser._slide_fingerprint([dict(number, speaker_notes=True)])
+    assert parser._slide_fingerprint([dict(number, chart_position="Margin, FY2023")]) != \
+        parser._slide_fingerprint([dict(number, chart_position="Margin, FY2024")])
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Revenue ₹1,234 Cr", [("₹1,234 Cr", 12340000000.0, "currency")]),
+    ("Rs. 5.5 lakhs and INR 3 crore", [("Rs. 5.5 lakhs", 550000.0, "currency"), ("INR 3 crore", 30000000.0, "currency")]),
+    ("Margin 12.5% on $2.4bn", [("12.5%", 12.5, "percentage"), ("$2.4bn", 2400000000.0, "currency")]),
+    ("Users grew 3k to 1.5 mn", [("3k", 3000.0, "metric"), ("1.5 mn", 1500000.0, "metric")]),
+    ("Market share .75 of 40 stores in Mumbai", [(".75", 0.75, "number"), ("40", 40.0, "number")]),
+    ("Cost 10 Crs", [("10 Crs", 100000000.0, "metric")]),
+])
+def test_number_tokens(text, expected):
+    numbers = PPTParser()._extract_numbers_from_text(text)
+
+    assert [(n["raw_text"], n["parsed_value"], n["type"]) for n in numbers] == expected
+
+
+def test_each_span_is_extracted_once():
+    numbers = PPTParser()._extract_numbers_from_text("₹1,234.5 Cr")
+
+    assert len(numbers) == 1
+    assert numbers[0]["position"] == 0
+
+
+def test_text_repeated_in_several_shapes_is_parsed_once():
+    prs = Presentation()
+    slide = blank_slide(prs)
+    add_text(slide.shapes, "Revenue ₹1,234 Cr")
+    add_text(slide.shapes, "Revenue ₹1,234 Cr", top=2)
+    add_text(slide.shapes, "Profit ₹210 Cr", top=3)
+
+    parsed = PPTParser().parse_presentation(deck_bytes(prs))[0]
+
+    assert [n["raw_text"] for n in parsed["numbers"]] == ["₹1,234 Cr", "₹210 Cr"]
+    assert parsed["text_content"] == ["Revenue ₹1,234 Cr", "Profit ₹210 Cr"]
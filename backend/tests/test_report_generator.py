@@ -0,0 +1,55 @@
+import csv
+from io import BytesIO, StringIO
+
+import openpyxl
+import pytest
+
+from report_generator import ReportGenerator
+
+RESULTS = [
+    {"slide": 1, "text": "₹1,250 Cr", "status": "Match", "ppt_value": 12500000000.0, "excel_value": 12500000000.0,
+     "suggested_fix": None, "excel_file": "model.xlsx", "excel_sheet": "P&L", "cell": "C3",
+     "reasoning": "Values match within tolerance.", "context": "Revenue", "confidence": 0.95},
+    {"slide": 1, "text": "18.5%", "status": "Mismatch", "ppt_value": 18.5, "excel_value": 16.2,
+     "suggested_fix": "16.2%", "excel_file": "model.xlsx", "excel_sheet": "P&L", "cell": "B4",
+     "reasoning": "Number mismatch detected.", "context": "EBITDA margin", "confidence": 0.8},
+    {"slide": 2, "text": "42", "status": "Untraceable", "ppt_value": 42.0, "excel_value": None,
+     "suggested_fix": None, "excel_file": None, "excel_sheet": None, "cell": None,
+     "reasoning": "No matching data found in Excel sheets", "context": "", "confidence": 0.0},
+]
+
+
+def test_csv_report_streams_every_row_once():
+    chunks = list(ReportGenerator().iter_csv_report(RESULTS, rows_per_chunk=2))
+
+    rows = list(csv.reader(StringIO("".join(chunks))))
+    assert len(chunks) == 2
+    assert rows[0][:3] == ["Slide_Number", "PPT_Text", "Status"]
+    assert [row[2] for row in rows[1:]] == ["Match", "Mismatch", "Untraceable"]
+
+
+def test_xlsx_report_marks_statuses_and_comments():
+    workbook = openpyxl.load_workbook(BytesIO(ReportGenerator().generate_xlsx_report(RESULTS)))
+
+    results = workbook["Audit Results"]
+    assert results["C2"].comment is None
+    assert results["C3"].comment.text == "Number mismatch detected."
+    assert results["C3"].fill.fgColor.rgb.endswith("F08080")  # lightcoral
+    summary = [row for row in workbook["Slide Summary"].iter_rows(min_row=2, values_only=True)]
+    assert summary == [(1, 2, 1, 1, 0, "50.0%"), (2, 1, 0, 0, 1, "0.0%")]
+
+
+def test_pdf_report_spans_several_tables():
+    pdf = ReportGenerator().generate_pdf_report(RESULTS * 50, rows_per_table=20)
+
+    assert pdf.startswith(b"%PDF")
+
+
+def test_parquet_report_round_trips():
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pq.read_table(BytesIO(ReportGenerator().generate_parquet_report(RESULTS)))
+
+    assert table.column("Status").to_pylist() == ["Match", "Mismatch", "Untraceable"]
+    assert table.column("Excel_Value").to_pylist() == [12500000000.0, 16.2, None]
+    assert table.schema.field("Slide_Number").type == "int32"
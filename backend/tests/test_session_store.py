@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+import pytest
+
+from number_table import NumberTableBuilder
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore, create_session_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class PartialStore(SessionStore):
+        def exists(self, session_id):
+            return False
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_fields_round_trip(store):
+    builder = NumberTableBuilder("model.xlsx")
+    builder.add(1234.5, 2, 3, builder.sheet_id("P&L"), "Revenue")
+    store.set("s1", "excel_data", {"model.xlsx": {"numbers": builder.build()}})
+    store.set("s1", "audit_results", [{"status": "Match", "cell": "C2"}])
+
+    assert store.exists("s1")
+    assert store.get("s1", "audit_results") == [{"status": "Match", "cell": "C2"}]
+    numbers = store.get("s1", "excel_data")["model.xlsx"]["numbers"]
+    assert numbers.record(0)["cell_reference"] == "C2"
+    np.testing.assert_array_equal(numbers.value, [1234.5])
+    assert store.get("s1", "missing") is None
+    assert store.get("other", "audit_results") is None
+
+
+def test_delete(store):
+    store.set("s1", "audit_results", [])
+    store.delete("s1")
+
+    assert not store.exists("s1")
+    assert store.get("s1", "audit_results") is None
+
+
+def test_expired_sessions_are_dropped(store):
+    store.ttl_seconds = 0.01
+    store.set("s1", "audit_results", [])
+    time.sleep(0.05)
+
+    assert not store.exists("s1")
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_sessions=2)
+    store.set("a", "field", 1)
+    store.set("b", "field", 2)
+    store.get("a", "field")
+    store.set("c", "field", 3)
+
+    assert store.exists("a") and store.exists("c")
+    assert not store.exists("b")
+
+
+def test_create_session_store_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("SESSION_BACKEND", "sqlite")
+    monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "store" / "sessions.db"))
+    assert isinstance(create_session_store(), SQLiteSessionStore)
+
+    monkeypatch.setenv("SESSION_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        create_session_store()
@@ -0,0 +1,102 @@
+import os
+import pstats
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from telemetry import ProfilingMiddleware, Telemetry, profiled_thread, telemetry, traced_call, traced_result
+
+
+def parse_slides(count):
+    """Stands in for parser work done in a worker process"""
+    for slide in range(count):
+        with telemetry.span("ppt.slide", slide=slide):
+            telemetry.increment("numbers_found", 2, source="ppt")
+    return count
+
+
+@pytest.fixture
+def clean_telemetry():
+    telemetry.reset()
+    yield telemetry
+    telemetry.reset()
+
+
+def test_counters_and_spans_render_in_the_prometheus_format():
+    recorder = Telemetry()
+    recorder.increment("matches", status="Match")
+    recorder.increment("matches", 2, status="Match")
+    recorder.increment("matches", status='Odd "label"\n')
+    recorder.record_span("excel.sheet", 0.25, sheet="P&L")
+    with recorder.span("excel.sheet", sheet="Ratios") as span:
+        span["cells"] = 12
+
+    lines = recorder.render_prometheus({"parse_cache_hits": 4}).splitlines()
+
+    assert lines[:3] == [
+        "# TYPE deck_audit_matches_total counter",
+        'deck_audit_matches_total{status="Match"} 3',
+        'deck_audit_matches_total{status="Odd \\"label\\"\\n"} 1',
+    ]
+    assert 'deck_audit_stage_seconds_count{stage="excel.sheet"} 2' in lines
+    assert 'deck_audit_stage_seconds_max{stage="excel.sheet"} 0.250000' in lines
+    assert lines[-2:] == ["# TYPE deck_audit_parse_cache_hits gauge", "deck_audit_parse_cache_hits 4"]
+    assert recorder.recent_spans[-1]["cells"] == 12 and recorder.recent_spans[-1]["sheet"] == "Ratios"
+
+
+def test_capture_keeps_a_threads_records_apart():
+    recorder = Telemetry()
+    with recorder.capture() as captured:
+        recorder.increment("searches")
+        recorder.record_span("match", 0.1)
+
+    assert recorder.counters == {} and recorder.timings == {}
+    assert captured.snapshot()["counters"] == [["searches", [], 1]]
+
+    recorder.merge(captured.snapshot())
+    recorder.merge(captured.snapshot())
+    assert recorder.counters[("searches", ())] == 2
+    assert recorder.timings["match"][0] == 2
+
+
+def test_worker_process_telemetry_is_merged_into_the_parent(clean_telemetry):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(traced_call, parse_slides, count) for count in (2, 3)]
+        assert [traced_result(future.result()) for future in futures] == [2, 3]
+
+    assert telemetry.counters[("numbers_found", (("source", "ppt"),))] == 10
+    assert telemetry.timings["ppt.slide"][0] == 5
+    assert sorted(span["slide"] for span in telemetry.recent_spans) == [0, 0, 1, 1, 2]
+
+
+def test_traced_call_with_a_profiler_returns_its_stats():
+    result, snapshot = traced_call(parse_slides, 1, profiler="cprofile")
+
+    assert result == 1
+    assert any(function == "parse_slides" for _, _, function in snapshot["profile"])
+
+
+def test_profiled_request_dumps_a_profile(tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    api = FastAPI()
+
+    @api.get("/work")
+    def work():
+        # A sync route runs in the threadpool, which profiles it as part of the request
+        with profiled_thread():
+            return {"slides": parse_slides(3)}
+
+    api.add_middleware(ProfilingMiddleware, profile_dir=str(tmp_path))
+    client = TestClient(api)
+
+    assert "x-profile-path" not in client.get("/work").headers
+    response = client.get("/work", headers={"X-Profile": "1"})
+
+    path = response.headers["x-profile-path"]
+    assert os.path.dirname(path) == str(tmp_path)
+    assert re.fullmatch(r"\d{8}_\d{6}_work_[0-9a-f]{8}\.prof", os.path.basename(path))
+    assert any(function == "parse_slides" for _, _, function in pstats.Stats(path).stats)
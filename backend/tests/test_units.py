@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+from conftest import workbook_bytes
+from excel_parser import ExcelParser
+from matcher import NumberMatcher
+from number_table import NumberTableBuilder
+from units import SheetUnits, detect_unit
+
+
+@pytest.mark.parametrize("text, unit", [
+    ("All figures in ₹ Crore", "crore"),
+    ("₹ Lacs", "lakh"),
+    ("(Rs. Cr)", "crore"),
+    ("USD '000", "thousand"),
+    ("Revenue in millions", "million"),
+    ("EBITDA margin (%)", "percent"),
+    ("Loans (INR bn)", "billion"),
+    ("FY24 (₹ Cr)", "crore"),
+    ("₹ in Lacs", "lakh"),
+    ("Crorepati scheme", None),
+    ("Dr/Cr", None),
+    ("Amount, Cr", None),
+    ("Revenue", None),
+    ("Amounts in crore " + "x" * 60, None),
+])
+def test_detect_unit(text, unit):
+    assert detect_unit(text) == unit
+
+
+def test_row_unit_beats_column_unit_beats_sheet_unit():
+    units = SheetUnits()
+    units.observe_row(1, ["All figures in ₹ Lacs", None, ""])
+    units.observe_row(2, ["Line item", "FY2024", "USD Mn"])
+    assert (units.unit_for(2), units.unit_for(3)) == ("lakh", "million")
+
+    units.observe_row(3, ["Margin (%)", 12.5, 13.1])
+    assert (units.unit_for(2), units.unit_for(3)) == ("percent", "percent")
+
+    units.observe_row(4, ["Revenue", 520, 6.5])
+    assert (units.unit_for(2), units.unit_for(3)) == ("lakh", "million")
+
+
+def test_title_below_the_header_rows_is_not_a_sheet_unit():
+    units = SheetUnits(header_rows=2)
+    units.observe_row(3, ["Figures in crore"])
+    units.observe_row(4, ["Revenue", 10, 20])
+
+    assert units.unit_for(2) is None
+
+
+def test_unlabelled_header_ends_a_column_unit():
+    units = SheetUnits()
+    units.observe_row(1, ["Line item", "FY24 (₹ Cr)"])
+    units.observe_row(2, ["Revenue", 1250])
+    assert units.unit_for(2) == "crore"
+
+    units.observe_row(3, ["Operating metrics", "FY24"])
+    units.observe_row(4, ["Headcount", 1500])
+    assert units.unit_for(2) is None
+
+
+# A later block headed plain "FY24", and a debit/credit label left of a figure
+BLOCKS = [
+    ["Line item", "FY24 (₹ Cr)"],
+    ["Revenue", 1250],
+    [],
+    ["Operating metrics", "FY24"],
+    ["Headcount", 1500],
+    ["Dr/Cr", 320],
+]
+
+
+def test_both_parser_paths_end_units_at_new_blocks():
+    parsed = ExcelParser().parse_workbook(workbook_bytes(BLOCKS), filename="model.xlsx")["numbers"]
+    builder = NumberTableBuilder("model.xlsx")
+    ExcelParser()._parse_sheet_pandas(pd.DataFrame(BLOCKS), "P&L", builder)
+
+    for table in (parsed, builder.build()):
+        values = {table.cell_reference(i): (float(table.value[i]), table.record(i).get("unit"))
+                  for i in range(len(table)) if table.original_text[i] < 0}
+        assert values == {"B2": (12500000000.0, "crore"), "B5": (1500.0, None), "B6": (320.0, None)}
+
+
+def test_parser_scales_numbers_and_keeps_them_as_written():
+    rows = [["₹ Lacs"], ["Branch", "FY2024"], ["Pune", 520], ["Share (%)", 12.5]]
+    parsed = ExcelParser().parse_workbook(workbook_bytes(rows), filename="branches.xlsx")
+    table = parsed["numbers"]
+    numbers = {number["cell_reference"]: number for number in map(table.record, range(len(table)))}
+
+    assert (numbers["B3"]["value"], numbers["B3"]["raw_value"], numbers["B3"]["unit"]) == (52000000.0, 520.0, "lakh")
+    assert numbers["B4"]["value"] == 12.5 and "unit" not in numbers["B4"]
+
+
+@pytest.mark.parametrize("raw_text, parsed_value", [("₹5.2 Cr", 52000000.0), ("520", 520.0)])
+def test_matcher_finds_scaled_cells_in_absolute_or_sheet_units(raw_text, parsed_value):
+    rows = [["₹ Lacs"], ["Branch", "FY2024"], ["Pune", 520]]
+    parsed = ExcelParser().parse_workbook(workbook_bytes(rows), filename="branches.xlsx")
+    ppt_data = [{"slide_number": 1, "numbers": [
+        {"raw_text": raw_text, "parsed_value": parsed_value, "context": "Pune FY2024", "type": "number",
+         "slide_number": 1}
+    ]}]
+
+    result = NumberMatcher().match_numbers(ppt_data, {"branches.xlsx": parsed})[0]
+
+    assert (result["status"], result["cell"], result["ppt_value"]) == ("Match", "B3", parsed_value)
+    assert "(cell reads 520, in lakhs)" in result["reasoning"]
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+import pytest
+
+from upload_spool import SpooledUpload, UploadTooLarge, spool_upload
+
+DATA = bytes(range(256)) * 40  # 10 KB
+
+
+class SlowStream(BytesIO):
+    """Returns at most 300 bytes per read, like a network upload"""
+
+    def read(self, size=-1):
+        return super().read(300)
+
+
+def test_small_upload_stays_in_memory():
+    upload = spool_upload(BytesIO(DATA), "deck.pptx", memory_bytes=len(DATA))
+
+    assert upload.source() == DATA
+    assert upload.path is None
+    assert (upload.size, upload.sha256) == (len(DATA), hashlib.sha256(DATA).hexdigest())
+
+
+def test_large_upload_rolls_over_to_a_temp_file_with_its_extension():
+    upload = spool_upload(SlowStream(DATA), "../../etc/model.xlsx", memory_bytes=1000)
+    path = upload.source()
+
+    assert upload.filename == "model.xlsx"
+    assert path == upload.path and path.endswith(".xlsx")
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    assert upload.sha256 == hashlib.sha256(DATA).hexdigest()
+
+    upload.close()
+    assert not os.path.exists(path)
+    upload.close()
+
+
+def test_oversized_upload_is_rejected_and_cleaned_up(monkeypatch):
+    created = []
+    rollover = SpooledUpload._rollover
+    monkeypatch.setattr(SpooledUpload, "_rollover", lambda self: rollover(self) or created.append(self.path))
+
+    with pytest.raises(UploadTooLarge, match="model.xlsx is larger than the 5000 byte upload limit"):
+        spool_upload(SlowStream(DATA), "model.xlsx", memory_bytes=1000, max_bytes=5000)
+
+    assert len(created) == 1 and not os.path.exists(created[0])
+
+
+def test_in_memory_server_spool_is_read_in_place():
+    spooled = tempfile.SpooledTemporaryFile(max_size=len(DATA) + 1)
+    spooled.write(DATA)
+    spooled.seek(0)
+
+    upload = spool_upload(spooled, "deck.pptx", memory_bytes=1000)
+
+    assert upload.source() == DATA and upload.path is None
+    assert upload._buffer is None and upload._file is None  # Nothing was copied while hashing
+    assert upload.sha256 == hashlib.sha256(DATA).hexdigest()
+    upload.close()
+    assert not spooled.closed
+
+
+def test_rolled_over_server_spool_is_copied_to_a_named_file():
+    spooled = tempfile.SpooledTemporaryFile(max_size=100)
+    spooled.write(DATA)
+    spooled.seek(0)
+
+    upload = spool_upload(spooled, "model.xlsx", memory_bytes=1000)
+
+    assert upload.source().endswith(".xlsx")
+    upload.close()
+
+
+def test_file_on_disk_is_parsed_by_its_own_path(tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(DATA)
+
+    with open(path, "rb") as f:
+        upload = spool_upload(f, "model.xlsx", memory_bytes=1000)
+        assert upload.source() == str(path)
+        assert upload.size == len(DATA)
+        upload.close()
+
+    assert path.exists()
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from matcher import NumberMatcher
+from value_index import ValueIndex
+
+
+def test_candidates_cover_every_value_within_tolerance():
+    rng = random.Random(0)
+    values = [rng.choice([-1, 1]) * rng.uniform(0, 1e6) for _ in range(2000)] + [0.0, 0.0, 1e-9, 125.0, 131.25]
+    index = ValueIndex(values, 0.05)
+    matcher = NumberMatcher()
+
+    for query in values[:200] + [0.0, 125.0, -3.5, 1e12]:
+        expected = [i for i, value in enumerate(values) if matcher._numbers_match(query, value)]
+        candidates = index.candidates(query)
+        assert [i for i in candidates if matcher._numbers_match(query, values[i])] == expected
+        assert candidates == sorted(candidates)
+
+
+def test_tolerance_boundary_is_kept():
+    # Relative to the larger value, 131.25 is within 5% of 125 and 131.6 is not
+    index = ValueIndex([100.0, 125.0, 131.25, 131.6, -125.0], 0.05)
+
+    assert index.candidates(125.0) == [1, 2]
+    assert index.candidates(-125.0) == [4]
+
+
+def test_tolerance_must_be_a_fraction():
+    with pytest.raises(ValueError):
+        ValueIndex([1.0], 1.0)
@@ -0,0 +1,91 @@
+import re
+from typing import Dict, Optional, Sequence
+
+# Scale of each canonical unit; "percent" marks explicitly unscaled rows and columns
+UNIT_SCALES = {
+    "thousand": 1000,
+    "lakh": 100000,  # 1 Lakh = 100,000
+    "million": 1000000,
+    "crore": 10000000,  # 1 Crore = 10 Million
+    "billion": 1000000000,
+    "percent": 1,
+}
+
+UNIT_ALIASES = {
+    "thousand": "thousand", "thousands": "thousand", "'000": "thousand", "'000s": "thousand", "000s": "thousand",
+    "lakh": "lakh", "lakhs": "lakh", "lac": "lakh", "lacs": "lakh",
+    "million": "million", "millions": "million", "mn": "million",
+    "crore": "crore", "crores": "crore", "cr": "crore", "crs": "crore",
+    "billion": "billion", "billions": "billion", "bn": "billion",
+}
+
+# A scale word that is the whole label after any currency ("₹ Lacs", "USD '000"), ends it after "in"
+# ("Revenue in millions", "All figures in ₹ Crore") or is in brackets ("(Rs. Cr)", "FY24 (₹ Cr)").
+# Scale words elsewhere, as in "Dr/Cr", are not units.
+UNIT_LABEL_PATTERN = re.compile(r"""
+    (?:^|(?<=\s)in\s+|(?P<bracket>[(\[]))\s*
+    (?:(?:₹|\$|€|rs\.?|inr|usd|eur)\s*)?(?:in\s+)?
+    (?P<unit>crores?|crs?|lakhs?|lacs?|millions?|mn|billions?|bn|thousands?|'000s?|000s)
+    \s*(?(bracket)[)\]]|\.?\s*$)
+""", re.IGNORECASE | re.VERBOSE)
+
+PERCENT_LABEL_PATTERN = re.compile(r"%|\bpercent", re.IGNORECASE)
+
+# Longer texts are notes or sentences rather than headers
+MAX_LABEL_LENGTH = 60
+
+
+def detect_unit(text: str) -> Optional[str]:
+    """Return the canonical unit a header or label declares, or None"""
+    if len(text) > MAX_LABEL_LENGTH:
+        return None
+    if PERCENT_LABEL_PATTERN.search(text):
+        return "percent"
+    match = UNIT_LABEL_PATTERN.search(text)
+    return UNIT_ALIASES[match.group("unit").lower()] if match else None
+
+
+class SheetUnits:
+    """Tracks the units in force while a sheet is read top to bottom.
+
+    A unit in a row's only cell within the first ``header_rows`` rows (a
+    title such as "All figures in ₹ Lacs") applies to the whole sheet. Any
+    other labelled cell applies down its column, until a header row (one
+    without numbers) puts unlabelled text in that column, and to the right
+    along its row. The row's unit wins over the column's, which wins over
+    the sheet's.
+    """
+
+    def __init__(self, header_rows: int = 10):
+        self.header_rows = header_rows
+        self.sheet_unit: Optional[str] = None
+        self.column_units: Dict[int, str] = {}
+        self.row_units: Dict[int, str] = {}  # Columns of the current row holding a unit label
+
+    def observe_row(self, row_number: int, row_values: Sequence) -> None:
+        """Read the unit labels of a row before its numbers are looked up"""
+        self.row_units = {}
+        labels = {
+            column: unit for column, value in enumerate(row_values, start=1)
+            if isinstance(value, str) and (unit := detect_unit(value))
+        }
+        if row_number <= self.header_rows and len(labels) == 1 and \
+                sum(1 for value in row_values if value is not None and value != "") == 1:
+            self.sheet_unit = next(iter(labels.values()))
+            return
+        if not any(isinstance(value, (int, float)) and not isinstance(value, bool) for value in row_values):
+            # A header row starts a new block: its text cells without a unit end their column's unit
+            for column, value in enumerate(row_values, start=1):
+                if isinstance(value, str) and value.strip() and column not in labels:
+                    self.column_units.pop(column, None)
+        for column, unit in labels.items():
+            self.column_units[column] = unit
+            self.row_units[column] = unit
+
+    def unit_for(self, column: int) -> Optional[str]:
+        """Return the unit of a numeric cell in the current row"""
+        row_unit = None
+        for label_column, unit in self.row_units.items():
+            if label_column < column:
+                row_unit = unit  # Nearest label to the left wins
+        return row_unit or self.column_units.get(column) or self.sheet_unit
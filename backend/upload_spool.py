@@ -0,0 +1,126 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from typing import BinaryIO, Optional, Tuple, Union
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class SpooledUpload:
+    """An uploaded file read in one pass, hashing it and counting its bytes on the way.
+
+    Uploads the server already holds in memory, or in a file with a path,
+    are read in place and not copied (see ``spool_upload``). Others are
+    copied: small files stay in memory; once a file grows past
+    ``memory_bytes`` it rolls over to a named temporary file with the
+    upload's extension, so parsers in other processes can open it by path.
+    ``close`` removes it.
+    """
+
+    def __init__(self, filename: str, memory_bytes: int = 32 * 1024 * 1024, max_bytes: Optional[int] = None):
+        self.filename = os.path.basename(filename)  # Never trust client-supplied directories
+        self.memory_bytes = memory_bytes
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.path: Optional[str] = None  # Set once the file has rolled over to disk
+        self._digest = hashlib.sha256()
+        self._buffer: Optional[BytesIO] = BytesIO()
+        self._file: Optional[BinaryIO] = None
+        self._in_place: Optional[BinaryIO] = None  # Source read in place rather than copied
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        self._count(chunk)
+        if self._file is None and self.size > self.memory_bytes:
+            self._rollover()
+        (self._file or self._buffer).write(chunk)
+
+    def copy_from(self, source: BinaryIO, chunk_size: int = 1024 * 1024) -> "SpooledUpload":
+        """Read a file object to the end into the spool"""
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            self.write(chunk)
+        return self
+
+    def read_in_place(self, source: BinaryIO, path: Optional[str] = None,
+                      chunk_size: int = 1024 * 1024) -> "SpooledUpload":
+        """Hash and size-check a file object without copying it; parsers then read it, or ``path``, directly"""
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            self._count(chunk)
+        source.seek(0)
+        self._in_place = source
+        self._buffer = None
+        self.path = path
+        return self
+
+    def source(self) -> Union[str, bytes]:
+        """What parsers read: a path once on disk, otherwise the bytes"""
+        if self._file is not None:
+            self._file.flush()
+            return self.path
+        if self._in_place is not None:
+            if self.path is not None:
+                return self.path
+            # Worker processes need the bytes, as open file objects cannot be pickled
+            self._in_place.seek(0)
+            return self._in_place.read()
+        return self._buffer.getvalue()
+
+    def close(self) -> None:
+        """Release the buffer and delete the temporary file, if any; sources read in place are left open"""
+        self._buffer = None
+        self._in_place = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _count(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise UploadTooLarge(f"{self.filename} is larger than the {self.max_bytes} byte upload limit")
+        self._digest.update(chunk)
+
+    def _rollover(self) -> None:
+        suffix = os.path.splitext(self.filename)[1]
+        self._file = tempfile.NamedTemporaryFile(prefix="deck_audit_upload_", suffix=suffix, delete=False)
+        self.path = self._file.name
+        self._file.write(self._buffer.getbuffer())
+        self._buffer = None
+
+
+def _readable_in_place(source: BinaryIO) -> Tuple[bool, Optional[str]]:
+    """Whether a file object can be read where it is, and its path if it is a file on disk.
+
+    Starlette spools form uploads in a SpooledTemporaryFile: while in memory
+    its bytes are used as they are. Once rolled over it is an unnamed temp
+    file that other processes cannot open, so it is copied like any stream.
+    """
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return True, name
+    if isinstance(source, tempfile.SpooledTemporaryFile) and not getattr(source, "_rolled", True):
+        return True, None
+    return False, None
+
+
+def spool_upload(source: BinaryIO, filename: str, memory_bytes: int = 32 * 1024 * 1024,
+                 max_bytes: Optional[int] = None) -> SpooledUpload:
+    """Read an upload's file object into a SpooledUpload, in place when possible, cleaning up if reading fails"""
+    upload = SpooledUpload(filename, memory_bytes, max_bytes)
+    try:
+        in_place, path = _readable_in_place(source)
+        if in_place:
+            return upload.read_in_place(source, path)
+        return upload.copy_from(source)
+    except BaseException:
+        upload.close()
+        raise
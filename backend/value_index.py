@@ -0,0 +1,44 @@
+import numpy as np
+from typing import List, Sequence
+
+
+class ValueIndex:
+    """Sorted index over numeric values for tolerance-window lookups"""
+
+    def __init__(self, values: Sequence[float], tolerance: float):
+        if not 0 <= tolerance < 1:
+            raise ValueError(f"Tolerance must be in [0, 1), got {tolerance}")
+
+        self.tolerance = tolerance
+        values = np.asarray(values, dtype=np.float64)
+        self.order = np.argsort(values, kind="stable")
+        self.sorted_values = values[self.order]
+
+    def __len__(self) -> int:
+        return len(self.sorted_values)
+
+    def candidates(self, value: float) -> List[int]:
+        """Return positions (in original order) of values that may match within tolerance.
+
+        A relative difference of at most ``tolerance`` against the larger
+        magnitude means the candidate must lie between ``value * (1 - tol)``
+        and ``value / (1 - tol)`` with the same sign. The window is widened by
+        a few ULPs so floating point rounding never drops a true match; callers
+        still confirm each candidate with the exact tolerance check.
+        """
+        if value == 0:
+            low = high = 0.0
+        else:
+            near = value * (1 - self.tolerance)
+            far = value / (1 - self.tolerance)
+            low, high = min(near, far), max(near, far)
+            slack = max(abs(low), abs(high)) * 1e-12
+            low, high = low - slack, high + slack
+
+        start = np.searchsorted(self.sorted_values, low, side="left")
+        end = np.searchsorted(self.sorted_values, high, side="right")
+        if start >= end:
+            return []
+
+        # Preserve the original scan order so tie-breaking is unchanged
+        return np.sort(self.order[start:end]).tolist()
@@ -14,7 +14,9 @@ const AuditDashboard = ({ sessionId, auditData, onAuditComplete, onReset }) => {
     setError(null);
 
     try {
-      const response = await axios.post('/audit');
+      const response = await axios.post('/audit', null, {
+        params: { session_id: sessionId }
+      });
       setAuditStatus('completed');
       onAuditComplete(response.data);
     } catch (err) {
@@ -28,6 +30,7 @@ const AuditDashboard = ({ sessionId, auditData, onAuditComplete, onReset }) => {
   const downloadReport = async (format) => {
     try {
       const response = await axios.get(`/download-report/${format}`, {
+        params: { session_id: sessionId },
         responseType: 'blob'
       });
 
@@ -149,6 +152,10 @@ const AuditDashboard = ({ sessionId, auditData, onAuditComplete, onReset }) => {
                 <Download className="icon" />
                 Download CSV Report
               </button>
+              <button onClick={() => downloadReport('xlsx')} className="download-btn xlsx">
+                <Download className="icon" />
+                Download Excel Report
+              </button>
             </div>
           </div>
 
@@ -135,6 +135,12 @@ const AuditResults = ({ results }) => {
                     <strong>Sheet:</strong> {result.excel_sheet}<br />
                     <strong>Cell:</strong> {result.cell}
                   </p>
+                  {result.lineage && result.lineage.length > 0 && (
+                    <p className="lineage">
+                      <strong>Formula:</strong> {result.lineage[0].formula}<br />
+                      <strong>Inputs:</strong> {result.lineage[0].precedents.join(', ')}
+                    </p>
+                  )}
                 </div>
               )}
 
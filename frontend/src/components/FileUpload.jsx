@@ -35,7 +35,9 @@ const FileUpload = ({ onFilesUploaded }) => {
     accept: {
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
       'application/vnd.ms-excel': ['.xls'],
-      'application/vnd.openxmlformats-officedocument.spreadsheetml.template': ['.xltx']
+      'application/vnd.openxmlformats-officedocument.spreadsheetml.template': ['.xltx'],
+      'text/csv': ['.csv'],
+      'text/tab-separated-values': ['.tsv']
     },
     multiple: true
   });
@@ -116,7 +118,7 @@ const FileUpload = ({ onFilesUploaded }) => {
             <div className="upload-prompt">
               <Upload className="icon" />
               <p>{isExcelDragActive ? 'Drop the files here' : 'Drag & drop Excel files here, or click to select'}</p>
-              <p className="file-types">Supports: .xlsx, .xls • Multiple files allowed</p>
+              <p className="file-types">Supports: .xlsx, .xls, .csv, .tsv • Multiple files allowed</p>
             </div>
           </div>
 